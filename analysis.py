@@ -0,0 +1,305 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Метрики фигур: количество самопересечений, ограничивающий прямоугольник, площадь и длина кривой.
+
+Запуск (таблица метрик для соотношений частот 1..N с проверкой по формуле 2ab - a - b):
+    python analysis.py --max-freq 6 --phase 0.23 --resolution 20000 --workers 4
+"""
+
+import argparse
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+
+import numpy as np
+
+from lissajousgen import LissajousGenerator, find_period, parse_phase
+
+METRICS = ("crossings", "bbox", "area", "length")
+
+
+def bounding_box(*values):
+    """
+    Ограничивающий прямоугольник (параллелепипед) кривой
+    :return: tuple (x_min, x_max, y_min, y_max[, z_min, z_max])
+    """
+
+    return tuple(float(bound) for coord in values for bound in (np.min(coord), np.max(coord)))
+
+
+def arc_length(*values):
+    """
+    Длина ломаной по массивам координат [x, y] или [x, y, z]
+    """
+
+    steps = np.diff(np.asarray(values, dtype=float), axis=1)
+    return float(np.sum(np.sqrt(np.einsum('ij,ij->j', steps, steps))))
+
+
+def enclosed_area(x, y, scanlines=2048):
+    """
+    Площадь области, охватываемой замкнутой кривой, по правилу ненулевого индекса (nonzero winding).
+    Площадь самопересекающейся кривой по формуле Гаусса учитывала бы петли со знаком и кратностью
+    обхода; здесь область каждой петли считается один раз. Вычисление - методом сканирующих прямых:
+    на каждой горизонтали y_k находятся пересечения со всеми отрезками (направление отрезка
+    даёт +1 или -1 к индексу), суммируется длина участков с ненулевым индексом.
+    Незамкнутая кривая замыкается отрезком от последней точки к первой
+    :param x: Координаты x
+        :type x: numpy.ndarray
+    :param y: Координаты y
+        :type y: numpy.ndarray
+    :param scanlines: Количество сканирующих прямых (погрешность ~ 1 / scanlines ** 2 для гладких кривых)
+        :type scanlines: int
+    :return: float
+    """
+
+    x = np.append(np.asarray(x, dtype=float), x[0])
+    y = np.append(np.asarray(y, dtype=float), y[0])
+    y_min, y_max = y.min(), y.max()
+    if y_max <= y_min:
+        return 0.
+
+    step = (y_max - y_min) / scanlines
+    # номер сканирующей прямой y_k = y_min + (k + 0.5) * step, лежащей не ниже точки
+    level = (y - y_min) / step - 0.5
+    first = np.ceil(np.minimum(level[:-1], level[1:])).astype(np.int64)
+    last = np.ceil(np.maximum(level[:-1], level[1:])).astype(np.int64)
+    counts = last - first
+    segments = np.repeat(np.arange(len(counts)), counts)
+    lines = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+    x0, y0, x1, y1 = x[segments], y[segments], x[segments + 1], y[segments + 1]
+    cross_y = y_min + (lines + 0.5) * step
+    cross_x = x0 + (cross_y - y0) * (x1 - x0) / (y1 - y0)
+    direction = np.where(y1 > y0, 1, -1)
+
+    order = np.lexsort((cross_x, lines))
+    lines, cross_x, direction = lines[order], cross_x[order], direction[order]
+    # на замкнутой кривой сумма направлений по каждой прямой равна нулю,
+    # поэтому накопленная сумма по всем прямым сразу - индекс справа от пересечения
+    winding = np.cumsum(direction)
+    inside = (winding[:-1] != 0) & (lines[:-1] == lines[1:])
+    return float(np.sum(np.diff(cross_x)[inside]) * step)
+
+
+def _candidate_pairs(x, y, cell_size):
+    """
+    Пары отрезков, ограничивающие прямоугольники которых попадают в общую ячейку равномерной сетки.
+    Размер ячейки не меньше проекции любого отрезка, поэтому отрезок занимает не больше 2x2 ячеек
+    :return: (first, second) - индексы несоседних отрезков, first < second, без повторов
+    """
+
+    count = len(x) - 1
+    col = np.floor((x - x.min()) / cell_size).astype(np.int64)
+    row = np.floor((y - y.min()) / cell_size).astype(np.int64)
+    rows = int(row.max()) + 2
+
+    col_lo, col_hi = np.minimum(col[:-1], col[1:]), np.maximum(col[:-1], col[1:])
+    row_lo, row_hi = np.minimum(row[:-1], row[1:]), np.maximum(row[:-1], row[1:])
+    cells, segments = [], []
+    for d_col, d_row in ((0, 0), (1, 0), (0, 1), (1, 1)):
+        mask = (col_lo + d_col <= col_hi) & (row_lo + d_row <= row_hi)
+        index = np.flatnonzero(mask)
+        cells.append((col_lo[index] + d_col) * rows + row_lo[index] + d_row)
+        segments.append(index)
+
+    cells, segments = np.concatenate(cells), np.concatenate(segments)
+    order = np.argsort(cells, kind='stable')
+    cells, segments = cells[order], segments[order]
+
+    keys = [np.empty(0, dtype=np.int64)]
+    shift = 1
+    while shift < len(cells):
+        same = np.flatnonzero(cells[:-shift] == cells[shift:])
+        if not len(same):
+            break
+        first, second = segments[same], segments[same + shift]
+        # большинство пар в ячейке - соседние отрезки кривой, они отбрасываются до удаления повторов
+        apart = np.abs(first - second) > 1
+        first, second = first[apart], second[apart]
+        keys.append(np.minimum(first, second) * count + np.maximum(first, second))
+        shift += 1
+
+    keys = np.sort(np.concatenate(keys))
+    keys = keys[np.append(True, keys[1:] != keys[:-1])] if len(keys) else keys
+    return keys // count, keys % count
+
+
+def self_intersections(x, y, cell_size=None):
+    """
+    Точки самопересечения ломаной. Кандидаты отбираются пространственным хэшированием отрезков
+    (равномерная сетка), затем все пары проверяются векторно.
+    Соседние отрезки (в том числе первый и последний у замкнутой кривой) не проверяются.
+    Пересечение учитывается при параметрах [0, 1) на обоих отрезках, поэтому пересечение
+    в вершине считается один раз. Вырожденные кривые, проходящие один путь в обе стороны,
+    дают наложения отрезков, а не пересечения, и осмысленного результата не имеют
+    :param x: Координаты x
+        :type x: numpy.ndarray
+    :param y: Координаты y
+        :type y: numpy.ndarray
+    :param cell_size: Размер ячейки сетки. None - наибольшая проекция отрезка на ось
+        :type cell_size: float
+    :return: numpy.ndarray формы (k, 2) - координаты пересечений
+    """
+
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    count = len(x) - 1
+    if count < 3:
+        return np.empty((0, 2))
+
+    dx, dy = np.diff(x), np.diff(y)
+    longest = max(float(np.max(np.abs(dx))), float(np.max(np.abs(dy))))
+    extent = max(float(np.ptp(x)), float(np.ptp(y)), 1e-300)
+    cell_size = max(cell_size or longest, extent * 1e-9)
+    first, second = _candidate_pairs(x, y, cell_size)
+
+    closed = x[0] == x[-1] and y[0] == y[-1]
+    keep = second - first > 1
+    if closed:
+        keep &= (first != 0) | (second != count - 1)
+    first, second = first[keep], second[keep]
+
+    denominator = dx[first] * dy[second] - dy[first] * dx[second]
+    offset_x, offset_y = x[second] - x[first], y[second] - y[first]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        along_first = (offset_x * dy[second] - offset_y * dx[second]) / denominator
+        along_second = (offset_x * dy[first] - offset_y * dx[first]) / denominator
+    hit = (denominator != 0) & (along_first >= 0) & (along_first < 1) & (along_second >= 0) & (along_second < 1)
+
+    along = along_first[hit]
+    return np.column_stack((x[first[hit]] + along * dx[first[hit]], y[first[hit]] + along * dy[first[hit]]))
+
+
+def curve_metrics(values, scanlines=2048):
+    """
+    Метрики кривой. Пересечения и площадь - для проекции на плоскость XY,
+    прямоугольник и длина - по всем координатам
+    :param values: Массивы координат [x, y] или [x, y, z] (LissajousGenerator.get_values)
+        :type values: list
+    :return: dict с ключами METRICS
+    """
+
+    x, y = values[0], values[1]
+    return {"crossings": len(self_intersections(x, y)), "bbox": bounding_box(*values),
+            "area": enclosed_area(x, y, scanlines), "length": arc_length(*values)}
+
+
+def expected_crossings(freq_x, freq_y, phase='0.23'):
+    """
+    Количество самопересечений фигуры Лиссажу с рациональным соотношением частот a : b
+    (a и b взаимно просты): 2ab - a - b.
+    Формула неприменима к вырожденным фигурам (b * ph_x - a * ph_y = (b - a) / 2 по модулю 1),
+    которые проходят один путь в обе стороны
+    :param phase: Сдвиг фаз в формате generate_figure
+        :type phase: str
+    :return: int или None, если соотношение не приводится к небольшим целым или фигура вырождена
+    """
+
+    if not freq_x or not freq_y:
+        return None
+    ratio = Fraction(float(freq_x) / float(freq_y)).limit_denominator(1000)
+    if abs(ratio - float(freq_x) / float(freq_y)) > 1e-9:
+        return None
+
+    a, b = ratio.numerator, ratio.denominator
+    phases = parse_phase(phase)
+    offset = (b * phases[0] - a * phases[1] - (b - a) / 2) % 1
+    if min(offset, 1 - offset) < 1e-6:
+        return None
+    return 2 * a * b - a - b
+
+
+def figure_values(params, generator):
+    """
+    Координаты фигуры для анализа: ровно один период (sampling='period'), если он существует,
+    иначе отрезок [-length*pi, length*pi]. При нескольких периодах кривая накладывалась бы на себя
+    """
+
+    generator.generate_figure(**dict(params, sampling='period'))
+    return generator.get_values()
+
+
+_worker_generator = None
+
+
+def analyze_job(job):
+    """
+    Задача для пула процессов: генерация и анализ фигур. Генератор создаётся один раз на процесс
+    :param job: (params_list, resolution, scanlines)
+        :type job: tuple
+    :return: list из dict метрик
+    """
+
+    global _worker_generator
+
+    params_list, resolution, scanlines = job
+    if _worker_generator is None:
+        _worker_generator = LissajousGenerator(cache_size=0)
+    _worker_generator.set_resolution(resolution)
+    return [curve_metrics(figure_values(params, _worker_generator), scanlines) for params in params_list]
+
+
+def analyze_batch(params_list, resolution=20000, workers=None, chunk_size=8, scanlines=2048):
+    """
+    Метрики для набора фигур в пуле процессов
+    :param params_list: Параметры фигур (аргументы generate_figure)
+        :type params_list: list
+    :param resolution: Количество точек в кривой
+        :type resolution: int
+    :param workers: Количество процессов. None - по числу ядер, 1 - в текущем процессе
+        :type workers: int
+    :param chunk_size: Количество фигур в одной задаче
+        :type chunk_size: int
+    :return: list из dict метрик в порядке params_list
+    """
+
+    jobs = [(params_list[start:start + chunk_size], resolution, scanlines)
+            for start in range(0, len(params_list), chunk_size)]
+    if workers == 1 or len(jobs) <= 1:
+        results = map(analyze_job, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(analyze_job, jobs))
+    return [metrics for chunk in results for metrics in chunk]
+
+
+def ratio_table(max_freq, phase='0.23'):
+    """
+    Параметры фигур для взаимно простых соотношений частот 1..max_freq
+    """
+
+    return [{"freq_x": float(fx), "freq_y": float(fy), "phase": phase}
+            for fx in range(1, max_freq + 1) for fy in range(1, max_freq + 1)
+            if find_period((fx, fy))[1] == (fx, fy)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-freq', type=int, default=6)
+    parser.add_argument('--phase', default='0.23', help='сдвиг фаз (невырожденный для проверки по формуле)')
+    parser.add_argument('--resolution', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=None, help='количество процессов (по умолчанию - число ядер)')
+    args = parser.parse_args(argv)
+
+    params_list = ratio_table(args.max_freq, args.phase)
+    start = time.perf_counter()
+    results = analyze_batch(params_list, resolution=args.resolution, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    mismatches = 0
+    print(f'{"a:b":>6} {"пересеч.":>9} {"2ab-a-b":>8} {"площадь":>9} {"длина":>9}')
+    for params, metrics in zip(params_list, results):
+        expected = expected_crossings(params["freq_x"], params["freq_y"], params["phase"])
+        mismatch = expected is not None and expected != metrics["crossings"]
+        mismatches += mismatch
+        print(f'{params["freq_x"]:>3.0f}:{params["freq_y"]:<2.0f} {metrics["crossings"]:>9} {str(expected):>8} '
+              f'{metrics["area"]:>9.4f} {metrics["length"]:>9.3f}{"  !" if mismatch else ""}')
+    print(f'Фигур: {len(results)}, несовпадений: {mismatches}, {elapsed:.2f} с')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import time
+
+from collections import deque
+
+import numpy as np
+
+from PyQt5 import QtCore
+
+from instrumentation import PROFILER
+from lissajousgen import LissajousGenerator, sweep_params
+
+
+class FrameRing:
+    """
+    Кольцевой буфер заранее сгенерированных кадров фиксированной ёмкости.
+    Память выделяется один раз: массив формы (capacity, dims, resolution)
+    """
+
+    def __init__(self, capacity, dims, resolution, dtype=np.float64):
+        """
+        :param capacity: Максимальное количество кадров
+            :type capacity: int
+        :param dims: Количество координат кадра (2 - 2D, 3 - 3D)
+            :type dims: int
+        :param resolution: Количество точек в кадре
+            :type resolution: int
+        """
+
+        self.frames = np.empty((capacity, dims, resolution), dtype=dtype)
+        self.capacity = capacity
+        self._head = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def free(self):
+        return self.capacity - self._count
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    def push_batch(self, coords):
+        """
+        Добавление пакета кадров (результат LissajousGenerator.generate_batch)
+        :param coords: [x, y] или [x, y, z], массивы формы (N, resolution)
+            :type coords: list
+        :return: Количество добавленных кадров (не больше свободного места)
+        """
+
+        count = min(coords[0].shape[0], self.free())
+        slots = (self._head + self._count + np.arange(count)) % self.capacity
+        for dim, coord in enumerate(coords):
+            self.frames[slots, dim] = coord[:count]
+        self._count += count
+        return count
+
+    def pop(self):
+        """
+        Извлечение следующего кадра. Возвращаются копии: слот будет перезаписан при пополнении
+        :return: list [x, y] или [x, y, z] либо None, если буфер пуст
+        """
+
+        if not self._count:
+            return None
+
+        frame = list(self.frames[self._head].copy())
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+        return frame
+
+
+class SweepAnimator(QtCore.QObject):
+    """
+    Анимация фигуры: изменение сдвига фазы X (sweep='phase') или частоты X (sweep='frequency')
+    по таймеру с заданной частотой кадров.
+    Следующие кадры генерируются заранее пакетами (generate_batch) в кольцевой буфер,
+    кадр выводится обновлением линии с блиттингом (LissajousWindow.draw_values).
+    Опоздания таймера учитываются как пропущенные кадры; если кадр не укладывается в бюджет,
+    разрешение уменьшается, при запасе по времени - возвращается к исходному
+    """
+
+    stats_changed = QtCore.pyqtSignal(dict)
+
+    def __init__(self, window, fps=30, sweep='phase', step=0.01, buffer_size=64, batch_size=8,
+                 min_resolution=200, clock=time.perf_counter):
+        """
+        :param window: Окно, в котором выводятся кадры
+            :type window: LissajousWindow
+        :param fps: Целевая частота кадров
+            :type fps: float
+        :param sweep: Изменяемый параметр - 'phase' или 'frequency'
+            :type sweep: str
+        :param step: Приращение параметра за кадр
+            :type step: float
+        :param buffer_size: Ёмкость кольцевого буфера, кадров
+            :type buffer_size: int
+        :param batch_size: Количество кадров, генерируемых за один вызов generate_batch
+            :type batch_size: int
+        :param min_resolution: Нижняя граница адаптивного разрешения
+            :type min_resolution: int
+        :param clock: Источник времени в секундах (для учёта опозданий и стоимости кадра)
+            :type clock: callable
+        """
+
+        super().__init__(window)
+        self.window = window
+        self.fps = fps
+        self.sweep = sweep
+        self.step = step
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.min_resolution = min_resolution
+        self.clock = clock
+
+        self.generator = LissajousGenerator(cache_size=0, time_cache_size=1)
+        self.ring = None
+        # буферы прежних разрешений, кадры которых ещё не выведены (в порядке генерации)
+        self._draining = deque()
+        self.settings = None
+        self.mode = '2d'
+        self.target_resolution = 0
+
+        self.frames = 0
+        self.dropped = 0
+        self._next_index = 0
+        self._last_tick = None
+        self._frame_cost = None
+        self._shown = deque(maxlen=int(fps) + 1)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+
+    @property
+    def interval(self):
+        return 1. / self.fps
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def start(self, settings, mode='2d', resolution=1000):
+        """
+        Запуск анимации
+        :param settings: Начальные параметры фигуры (аргументы generate_figure)
+            :type settings: dict
+        :param mode: Режим - 2D/3D
+            :type mode: str
+        :param resolution: Исходное (максимальное) количество точек в кадре
+            :type resolution: int
+        """
+
+        self.settings = dict(settings)
+        self.mode = mode
+        self.target_resolution = resolution
+        self.frames = 0
+        self.dropped = 0
+        self._next_index = 0
+        self._last_tick = None
+        self._frame_cost = None
+        self._shown.clear()
+        self._draining.clear()
+        self.ring = None
+        self.set_resolution(resolution)
+        self.fill(self.buffer_size)
+        self.timer.start(max(int(round(self.interval * 1000)), 1))
+
+    def stop(self):
+        self.timer.stop()
+
+    def set_resolution(self, resolution):
+        """
+        Смена разрешения кадров. Уже сгенерированные кадры выводятся до конца
+        (в том числе при нескольких сменах подряд), следующие генерируются в новый буфер
+        """
+
+        self.generator.set_resolution(resolution)
+        if self.ring is not None and len(self.ring):
+            self._draining.append(self.ring)
+        self.ring = FrameRing(self.buffer_size, 2 + (self.mode == '3d'), resolution)
+
+    def frame_params(self, indices):
+        """
+        Параметры generate_batch для кадров с номерами indices
+        :param indices: Номера кадров
+            :type indices: numpy.ndarray
+        :return: dict
+        """
+
+        return sweep_params(dict(self.settings, mode=self.mode), indices, self.sweep, self.step)
+
+    def fill(self, count):
+        """
+        Генерация следующих кадров в буфер пакетами по batch_size
+        :param count: Количество кадров (ограничивается свободным местом)
+            :type count: int
+        :return: Количество добавленных кадров
+        """
+
+        count = min(count, self.ring.free())
+        added = 0
+        while added < count:
+            size = min(self.batch_size, count - added)
+            indices = np.arange(self._next_index, self._next_index + size)
+            with PROFILER.stage('animation_batch'):
+                coords = self.generator.generate_batch(**self.frame_params(indices))
+            added += self.ring.push_batch(coords)
+            self._next_index += size
+        return added
+
+    def tick(self):
+        """
+        Вывод очередного кадра и пополнение буфера в оставшееся до следующего кадра время
+        """
+
+        now = self.clock()
+        if self._last_tick is not None:
+            late = int((now - self._last_tick) / self.interval + 0.5) - 1
+            self.dropped += max(late, 0)
+        self._last_tick = now
+
+        if self._draining:
+            frame = self._draining[0].pop()
+            if not len(self._draining[0]):
+                self._draining.popleft()
+        else:
+            frame = self.ring.pop()
+
+        if frame is None:
+            self.dropped += 1
+            self.fill(self.batch_size)
+            return
+
+        self.window.draw_values(frame)
+        self.frames += 1
+        self._shown.append(self.clock())
+
+        if self.ring.free() >= self.batch_size:
+            self.fill(self.batch_size)
+
+        self._adapt(self.clock() - now)
+
+        if self.frames % max(int(self.fps // 2), 1) == 0:
+            self.stats_changed.emit(self.stats())
+
+    def _adapt(self, cost):
+        """
+        Подстройка разрешения по сглаженному времени такта (вывод кадра и пополнение буфера)
+        """
+
+        self._frame_cost = cost if self._frame_cost is None else 0.8 * self._frame_cost + 0.2 * cost
+        resolution = self.generator.get_resolution()
+
+        if self._frame_cost > 0.9 * self.interval and resolution > self.min_resolution:
+            self.set_resolution(max(int(resolution * 0.75), self.min_resolution))
+            self._frame_cost = None
+        elif self._frame_cost < 0.4 * self.interval and resolution < self.target_resolution:
+            self.set_resolution(min(int(resolution * 1.25) + 1, self.target_resolution))
+            self._frame_cost = None
+
+    def stats(self):
+        """
+        :return: dict - выведено кадров, пропущено кадров, текущее разрешение, фактический FPS
+        """
+
+        shown = self._shown
+        fps = (len(shown) - 1) / (shown[-1] - shown[0]) if len(shown) > 1 and shown[-1] > shown[0] else 0.
+        return {"frames": self.frames, "dropped": self.dropped,
+                "resolution": self.generator.get_resolution(), "fps": fps}
@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Сравнение способов вычисления sin на равномерной сетке (kernels.KERNELS): время генерации
+фигуры (generate_figure) и максимальная абсолютная погрешность относительно sin с расширенной
+точностью (numpy.longdouble) на той же идеальной сетке.
+
+Запуск:
+    python benchmarks/kernels.py [--repeat 5] [--points 1000 100000 1000000] [--freqs 1 3 99]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# модули приложения импортируются из корня репозитория, поэтому - после дополнения sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kernels import KERNELS, phasor_error_bound, wave  # noqa: E402
+from lissajousgen import LissajousGenerator  # noqa: E402
+
+PHASE = 0.37
+
+
+def generate_time(kernel, points, freq, length, repeat):
+    """
+    Среднее время generate_figure (2D, без кэша фигур), мс
+    """
+
+    generator = LissajousGenerator(resolution=points, cache_size=0)
+    generator.generate_figure(freq, freq + 1, phase=str(PHASE), length=length, kernel=kernel)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        generator.generate_figure(freq, freq + 1, phase=str(PHASE), length=length, kernel=kernel)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def max_error(kernel, points, freq, length):
+    """
+    Максимальная абсолютная погрешность sin(freq * t + phase) на сетке np.linspace(-length*pi, length*pi)
+    относительно вычисления с расширенной точностью
+    :return: (погрешность, наибольший модуль угла)
+    """
+
+    t = np.linspace(-length * np.pi, length * np.pi, points)
+    start, stop = np.longdouble(t[0]), np.longdouble(t[-1])
+    exact_t = start + np.arange(points, dtype=np.longdouble) * ((stop - start) / (points - 1))
+    angle = np.longdouble(freq) * exact_t + np.longdouble(PHASE * np.pi)
+    out = wave(np.empty(points), t, freq, PHASE * np.pi, 'sin', kernel)
+    return float(np.max(np.abs(out - np.sin(angle)))), float(np.max(np.abs(angle)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--freqs', type=float, nargs='+', default=[1., 3., 99.])
+    parser.add_argument('--length', type=float, default=10)
+    args = parser.parse_args()
+
+    header = ''.join(f'{kernel + ", ms":>12}{kernel + " err":>12}' for kernel in KERNELS)
+    print(f'{"points":>10}{"freq":>6}{header}{"bound":>10}{"speedup":>9}')
+    for points in args.points:
+        for freq in args.freqs:
+            row, times = '', []
+            for kernel in KERNELS:
+                elapsed = generate_time(kernel, points, freq, args.length, args.repeat)
+                error, angle = max_error(kernel, points, freq, args.length)
+                times.append(elapsed)
+                row += f'{elapsed:>12.2f}{error:>12.1e}'
+            bound = phasor_error_bound(angle)
+            print(f'{points:>10}{freq:>6g}{row}{bound:>10.1e}{times[0] / times[1]:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
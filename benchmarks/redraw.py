@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Замер времени перерисовки фигуры в LissajousWindow: полный путь (пересоздание линии,
+tight_layout, полная отрисовка холста) против инкрементального (set_data + blitting).
+
+Запуск:
+    python benchmarks/redraw.py [--repeat 20] [--points 1000 100000 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+# модули приложения импортируются из корня репозитория, поэтому - после дополнения sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import PyQt5.QtWidgets as Qt  # noqa: E402
+
+from main_lissajous import LissajousWindow  # noqa: E402
+
+
+def full_redraw(window, settings):
+    """
+    Прежний путь отрисовки: новая линия, сетка, tight_layout и полная отрисовка холста
+    """
+
+    for line in list(window._fig.axes.lines):
+        line.remove()
+    window._fig.line = None
+    window.generator.generate_figure(**settings)
+    window._fig.axes.plot(*window.generator.get_values(), **window.get_settings(params=False))
+    window.plot_radio_grid_func()
+    window._fig.axes.figure.tight_layout()
+    window._fig.draw()
+
+
+def incremental_redraw(window, settings):
+    window.plot_lissajous_figure(settings)
+
+
+def measure(window, func, repeat):
+    settings = [dict(window.get_settings(), phase=phase) for phase in ('0.5', '0.25')]
+    for item in settings:
+        func(window, item)
+
+    start = time.perf_counter()
+    for i in range(repeat):
+        func(window, settings[i % 2])
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--points', type=int, nargs='+', default=[1000, 100000, 1000000])
+    args = parser.parse_args()
+
+    app = Qt.QApplication(sys.argv)
+    window = LissajousWindow()
+    # замеряется только отрисовка: генерация синхронная, без растеризации
+    window.settings["generation"]["async_threshold"] = float('inf')
+    window.settings["render"]["raster_threshold"] = float('inf')
+    window.show()
+    app.processEvents()
+
+    print(f'{"points":>10} {"full, ms":>10} {"incremental, ms":>16} {"speedup":>8}')
+    for points in args.points:
+        window.generator.set_resolution(points)
+        full = measure(window, full_redraw, args.repeat)
+        window._fig.axes.cla()
+        window._fig.reset_artists()
+        incremental = measure(window, incremental_redraw, args.repeat)
+        print(f'{points:>10} {full:>10.2f} {incremental:>16.2f} {full / incremental:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
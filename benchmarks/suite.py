@@ -0,0 +1,258 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Набор бенчмарков генерации, отрисовки и запуска приложения.
+Работает без дисплея (Qt offscreen, matplotlib Agg), результаты сохраняются в JSON.
+С --baseline результаты сравниваются с эталоном; времена эталона пересчитываются
+по калибровочной нагрузке (calibrate), поэтому эталон с другой машины сравним приблизительно.
+
+Запуск:
+    python benchmarks/suite.py --quick
+    python benchmarks/suite.py --output bench.json
+    python benchmarks/suite.py --quick --baseline benchmarks/baseline.json --threshold 0.2
+    python benchmarks/suite.py --quick --output benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from unittest.mock import patch
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# matplotlib и Qt импортируются после выбора бэкендов, модули приложения - после дополнения sys.path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib  # noqa: E402
+import numpy as np  # noqa: E402
+
+import PyQt5.QtWidgets as Qt  # noqa: E402
+
+from lissajousgen import LissajousGenerator  # noqa: E402
+
+RESOLUTIONS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+QUICK_RESOLUTIONS = [10 ** 3, 10 ** 4, 10 ** 5]
+
+
+COLD_START = """
+import time
+start = time.perf_counter()
+import sys
+import PyQt5.QtWidgets as Qt
+app = Qt.QApplication(sys.argv)
+from main_lissajous import LissajousWindow
+window = LissajousWindow()
+print(time.perf_counter() - start)
+"""
+
+
+def timeit(func, repeat, setup=None):
+    """
+    Замер времени выполнения func
+    :param func: Замеряемая функция без аргументов
+        :type func: callable
+    :param repeat: Количество замеров
+        :type repeat: int
+    :param setup: Функция, вызываемая перед каждым замером (не входит во время)
+        :type setup: callable
+    :return: dict с медианой, минимумом и количеством замеров в мс
+    """
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "repeat": repeat}
+
+
+def repeat_for(resolution, repeat):
+    return max(1, repeat if resolution <= 10 ** 5 else repeat // 5)
+
+
+def bench_generate(resolutions, repeat):
+    results = {}
+    for mode in ('2d', '3d'):
+        for resolution in resolutions:
+            generator = LissajousGenerator(resolution=resolution, cache_size=0, time_cache_size=0)
+            results[f'generate/{mode}/{resolution}'] = timeit(
+                lambda: generator.generate_figure(3, 2, freq_z=1, mode=mode), repeat_for(resolution, repeat))
+    return results
+
+
+def bench_window(window, resolutions, repeat):
+    results = {}
+    settings = window.get_settings()
+    phases = iter(['0.5', '0.25'] * 1000)
+
+    for dimension in (False, True):
+        window.checkBox_3D.setChecked(dimension)
+        window.update_plt()
+        for resolution in resolutions:
+            window.generator.set_resolution(resolution)
+            results[f'plot/{["2d", "3d"][dimension]}/{resolution}'] = timeit(
+                lambda: window.plot_lissajous_figure(dict(settings, phase=next(phases))),
+                repeat_for(resolution, repeat), setup=window.generator.clear_cache)
+
+    window.generator.set_resolution(window.settings["generation"]["resolution"])
+
+    def switch():
+        window.checkBox_3D.setChecked(not window.checkBox_3D.isChecked())
+        window.update_plt()
+
+    results['update_plt/switch'] = timeit(switch, repeat)
+    window.checkBox_3D.setChecked(False)
+    window.update_plt()
+    return results
+
+
+def bench_presets(window, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'preset.json')
+        with patch.object(window, 'files_handler', return_value=path):
+            results['preset/save'] = timeit(window.save_json_button_handler, repeat)
+            results['preset/load'] = timeit(window.load_file_handler, repeat)
+    return results
+
+
+def bench_startup(window_cls, repeat):
+    results = {'startup/window': timeit(window_cls, repeat)}
+
+    samples = []
+    for _ in range(max(1, repeat // 2)):
+        output = subprocess.run([sys.executable, '-c', COLD_START], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]) * 1000)
+    results['startup/cold'] = {"median_ms": statistics.median(samples), "min_ms": min(samples),
+                               "repeat": len(samples)}
+    return results
+
+
+def calibrate(repeat=10):
+    """
+    Калибровочная нагрузка - мера скорости машины: sin и умножение массива из 10^6 элементов
+    и цикл интерпретатора (как в генерации и отрисовке)
+    :return: Медиана времени в мс
+    """
+
+    values = np.linspace(0., 100., 10 ** 6)
+
+    def work():
+        np.sin(values * 1.5)
+        sum(i * i for i in range(10 ** 5))
+
+    return timeit(work, repeat)["median_ms"]
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {"commit": commit, "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S'),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "numpy": np.__version__, "matplotlib": matplotlib.__version__}
+
+
+def compare(results, baseline, threshold, scale=1.):
+    """
+    Сравнение с эталоном по медиане
+    :param results: Текущие результаты
+        :type results: dict
+    :param baseline: Эталонные результаты
+        :type baseline: dict
+    :param threshold: Допустимое относительное замедление (0.2 = 20%)
+        :type threshold: float
+    :param scale: Отношение скорости эталонной машины к текущей (калибровка): времена эталона умножаются на него
+        :type scale: float
+    :return: list имён замедлившихся бенчмарков
+    """
+
+    regressions = []
+    print(f'{"benchmark":<28} {"baseline, ms":>13} {"current, ms":>12} {"change":>8}')
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            print(f'{name:<28} {"-":>13} {result["median_ms"]:>12.3f} {"new":>8}')
+            continue
+
+        expected = reference["median_ms"] * scale
+        change = result["median_ms"] / expected - 1
+        mark = ' !' if change > threshold else ''
+        print(f'{name:<28} {expected:>13.3f} {result["median_ms"]:>12.3f} {change:>+7.1%}{mark}')
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='файл для сохранения результатов (JSON)')
+    parser.add_argument('--baseline', help='эталонные результаты для сравнения (JSON)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='допустимое замедление, доля')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--quick', action='store_true', help='разрешения до 1e5')
+    parser.add_argument('--filter', default='', help='запускать группы, имя которых содержит строку')
+    args = parser.parse_args()
+
+    resolutions = QUICK_RESOLUTIONS if args.quick else RESOLUTIONS
+
+    app = Qt.QApplication(sys.argv)  # noqa: F841 - приложение существует до создания окна
+    from main_lissajous import LissajousWindow
+
+    window = LissajousWindow()
+    # замеряется синхронный путь, без фоновых потоков
+    window.settings["generation"]["async_threshold"] = float('inf')
+
+    groups = {
+        'generate': lambda: bench_generate(resolutions, args.repeat),
+        'plot': lambda: bench_window(window, resolutions, args.repeat),
+        'preset': lambda: bench_presets(window, args.repeat),
+        'startup': lambda: bench_startup(LissajousWindow, args.repeat),
+    }
+
+    results = {}
+    for name, group in groups.items():
+        if args.filter in name:
+            results.update(group())
+
+    report = {"meta": dict(metadata(), calibration_ms=calibrate()), "results": results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as write_file:
+            json.dump(report, write_file, indent=2)
+
+    if not args.baseline:
+        for name, result in sorted(results.items()):
+            print(f'{name:<28} {result["median_ms"]:>12.3f} ms')
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as open_file:
+        baseline = json.load(open_file)
+
+    reference = baseline["meta"].get("calibration_ms")
+    scale = report["meta"]["calibration_ms"] / reference if reference else 1.
+    print(f'Калибровка: эталон {f"{reference:.3f}" if reference else "-"} мс, '
+          f'текущая {report["meta"]["calibration_ms"]:.3f} мс, времена эталона x{scale:.2f}')
+    regressions = compare(results, baseline["results"], args.threshold, scale)
+    if regressions:
+        print(f'\nЗамедление больше {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
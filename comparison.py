@@ -0,0 +1,202 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from matplotlib.collections import LineCollection
+from matplotlib.transforms import AffineDeltaTransform
+
+from lissajousgen import LissajousGenerator
+
+# matplotlib < 3.6 принимает преобразование смещений как transOffset
+OFFSET_TRANSFORM = 'offset_transform' if hasattr(LineCollection, 'set_offset_transform') else 'transOffset'
+
+CELL_KEYS = ("freq_x", "freq_y", "phase", "length", "a", "b")
+
+
+def ratio_params(rows, cols, phase='0.5', length=1):
+    """
+    Параметры сетки соотношений частот: в ячейке (row, col) freq_x = col + 1, freq_y = row + 1.
+    При целых частотах length=1 - ровно один период, больше точек на кривую не нужно
+    :return: list словарей параметров ячеек построчно
+    """
+
+    return [{"freq_x": float(col + 1), "freq_y": float(row + 1), "phase": phase, "length": length}
+            for row in range(rows) for col in range(cols)]
+
+
+def cell_key(params):
+    params = dict({"phase": '0.5', "length": 10, "a": 1, "b": 1}, **params)
+    return tuple(params[key] for key in CELL_KEYS)
+
+
+class ComparisonGrid:
+    """
+    Сетка rows x cols 2D-фигур на одних осях.
+    Все кривые - один LineCollection: вершины ячеек хранятся в общем массиве (rows * cols, resolution, 2)
+    в координатах ячейки, а положение ячейки задаётся смещением (offsets) коллекции.
+    Кривые генерируются одним вызовом generate_batch; при изменении параметров
+    пересчитываются только ячейки, параметры которых изменились
+    """
+
+    def __init__(self, axes, rows, cols, params=None, resolution=500, style=None, cell_scale=0.42,
+                 generator=None):
+        """
+        :param axes: Оси matplotlib
+            :type axes: matplotlib.axes.Axes
+        :param rows: Количество строк
+            :type rows: int
+        :param cols: Количество столбцов
+            :type cols: int
+        :param params: Параметры ячеек построчно (аргументы generate_figure). По умолчанию - ratio_params
+            :type params: list
+        :param resolution: Количество точек в кривой
+            :type resolution: int
+        :param style: Параметры отображения (color, linewidth)
+            :type style: dict
+        :param cell_scale: Половина размера фигуры относительно шага сетки
+            :type cell_scale: float
+        """
+
+        self.axes = axes
+        self.style = dict(style or {"color": 'midnightblue', "linewidth": 1})
+        self.cell_scale = cell_scale
+        self.generator = generator or LissajousGenerator(resolution=resolution, cache_size=0, time_cache_size=1)
+        self.generator.set_resolution(resolution)
+
+        self.rows = self.cols = 0
+        self.params = []
+        self.vertices = np.empty((0, resolution, 2))
+        self.collection = None
+        self.generated = 0
+
+        axes.set_aspect('equal')
+        axes.axis('off')
+        self.set_layout(rows, cols, params)
+
+    def _keys(self):
+        return [cell_key(params) for params in self.params]
+
+    def set_layout(self, rows, cols, params=None):
+        """
+        Смена размера сетки. Кривые с теми же параметрами переносятся из прежней сетки без генерации
+        :return: list индексов сгенерированных ячеек
+        """
+
+        old = {key: index for index, key in enumerate(self._keys())}
+        old_vertices = self.vertices
+
+        self.rows, self.cols = rows, cols
+        self.params = [dict(cell) for cell in (params or ratio_params(rows, cols))]
+        self.vertices = np.empty((rows * cols, self.generator.get_resolution(), 2))
+
+        missing = []
+        for index, key in enumerate(self._keys()):
+            if key in old and old_vertices.shape[1] == self.vertices.shape[1]:
+                self.vertices[index] = old_vertices[old[key]]
+            else:
+                missing.append(index)
+        self._generate(missing)
+
+        if self.collection is not None:
+            self.collection.remove()
+        self.collection = self.cells_collection(range(rows * cols))
+        self.axes.add_collection(self.collection)
+        self.axes.set_xlim(-0.5, cols - 0.5)
+        self.axes.set_ylim(-0.5, rows - 0.5)
+        return missing
+
+    def cells_collection(self, indices):
+        """
+        LineCollection из кривых ячеек indices со смещениями ячеек.
+        Для всех ячеек - основная коллекция сетки, для части - временная коллекция для перерисовки
+        только изменившихся ячеек
+        """
+
+        indices = list(indices)
+        collection = LineCollection(list(self.vertices[indices]), offsets=self.offsets()[indices],
+                                    transform=AffineDeltaTransform(self.axes.transData),
+                                    **{OFFSET_TRANSFORM: self.axes.transData}, **self.style)
+        collection.set_figure(self.axes.figure)
+        return collection
+
+    def offsets(self):
+        """
+        Центры ячеек в координатах данных: столбец - x, первая строка сверху
+        """
+
+        col, row = np.meshgrid(np.arange(self.cols), np.arange(self.rows))
+        return np.column_stack((col.ravel(), (self.rows - 1 - row).ravel())).astype(float)
+
+    def _generate(self, indices):
+        """
+        Пакетная генерация кривых ячеек indices в общий массив вершин
+        """
+
+        if not len(indices):
+            return
+
+        cells = [dict({"phase": '0.5', "length": 10, "a": 1, "b": 1}, **self.params[i]) for i in indices]
+        x, y = self.generator.generate_batch(**{key: [cell[key] for cell in cells] for key in CELL_KEYS})
+        scale = self.cell_scale / np.maximum(np.array([[cell["a"], cell["b"]] for cell in cells], dtype=float), 1e-12)
+        self.vertices[indices, :, 0] = x * scale[:, 0:1]
+        self.vertices[indices, :, 1] = y * scale[:, 1:2]
+        self.generated += len(indices)
+
+    def update(self, params):
+        """
+        Новые параметры всех ячеек (тот же размер сетки). Пересчитываются и передаются
+        в коллекцию только изменившиеся ячейки
+        :param params: Параметры ячеек построчно
+            :type params: list
+        :return: list индексов изменённых ячеек
+        """
+
+        keys = self._keys()
+        self.params = [dict(cell) for cell in params]
+        changed = [index for index, key in enumerate(self._keys()) if key != keys[index]]
+        self._generate(changed)
+
+        paths = self.collection.get_paths()
+        for index in changed:
+            paths[index].vertices = self.vertices[index]
+        if changed:
+            self.collection.stale = True
+        return changed
+
+    def set_cell(self, row, col, **changes):
+        """
+        Изменение параметров одной ячейки
+        """
+
+        params = [dict(cell) for cell in self.params]
+        params[row * self.cols + col].update(changes)
+        return self.update(params)
+
+    def set_common(self, **changes):
+        """
+        Изменение параметров всех ячеек (например, общего сдвига фаз)
+        """
+
+        return self.update([dict(cell, **changes) for cell in self.params])
+
+    def set_style(self, color=None, linewidth=None):
+        if color is not None:
+            self.collection.set_color(color)
+        if linewidth is not None:
+            self.collection.set_linewidth(linewidth)
+        self.style.update({key: value for key, value in (("color", color), ("linewidth", linewidth))
+                           if value is not None})
+
+    def cell_at(self, x, y):
+        """
+        Ячейка под точкой (координаты данных)
+        :return: (row, col) или None
+        """
+
+        col, row = int(round(x)), self.rows - 1 - int(round(y))
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None
+
+    def cell_params(self, row, col):
+        return dict(self.params[row * self.cols + col])
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from matplotlib.transforms import Bbox, TransformedBbox
+
+import PyQt5.QtWidgets as Qt
+from PyQt5 import QtCore
+
+from comparison import ComparisonGrid, ratio_params
+
+
+class ComparisonWindow(Qt.QWidget):
+    """
+    Окно сравнения: сетка фигур с соотношениями частот (col + 1) : (row + 1) на одном холсте.
+    Коллекция кривых помечена как animated: при полной отрисовке кэшируется фон,
+    а при изменении части ячеек перерисовываются только их области (restore_region + blit).
+    Двойной щелчок по ячейке передаёт её параметры в основное окно (cell_selected)
+    """
+
+    cell_selected = QtCore.pyqtSignal(dict)
+
+    # доля изменившихся ячеек, начиная с которой выполняется полная перерисовка
+    full_redraw_share = 0.25
+
+    def __init__(self, settings, style, rows=8, cols=8, resolution=500, parent=None):
+        """
+        :param settings: Параметры фигуры основного окна (phase, length)
+            :type settings: dict
+        :param style: Параметры отображения (color, linewidth)
+            :type style: dict
+        """
+
+        super().__init__(parent)
+        self.setWindowTitle('Сравнение фигур')
+
+        self.rows_spinbox = Qt.QSpinBox()
+        self.rows_spinbox.setRange(1, 30)
+        self.rows_spinbox.setValue(rows)
+        self.cols_spinbox = Qt.QSpinBox()
+        self.cols_spinbox.setRange(1, 30)
+        self.cols_spinbox.setValue(cols)
+        self.phase_spinbox = Qt.QDoubleSpinBox()
+        self.phase_spinbox.setRange(0., 2.)
+        self.phase_spinbox.setSingleStep(0.05)
+        self.phase_spinbox.setValue(float(str(settings.get("phase", '0.5')).split()[0]))
+        self.length_spinbox = Qt.QSpinBox()
+        self.length_spinbox.setRange(1, 100)
+        self.length_spinbox.setValue(1)
+
+        self.figure = Figure(figsize=(6, 6), frameon=True)
+        self.canvas = FigureCanvas(self.figure)
+        axes = self.figure.add_axes([0, 0, 1, 1])
+        self.grid = ComparisonGrid(axes, rows, cols, self.cell_params(rows, cols), resolution=resolution,
+                                   style=style)
+        self.grid.collection.set_animated(True)
+        self._background = None
+
+        controls = Qt.QHBoxLayout()
+        for label, widget in (('Строки', self.rows_spinbox), ('Столбцы', self.cols_spinbox),
+                              ('Сдвиг фаз', self.phase_spinbox), ('Длина', self.length_spinbox)):
+            controls.addWidget(Qt.QLabel(label))
+            controls.addWidget(widget)
+        layout = Qt.QVBoxLayout(self)
+        layout.addLayout(controls)
+        layout.addWidget(self.canvas)
+
+        self.rows_spinbox.valueChanged.connect(self.layout_changed_handler)
+        self.cols_spinbox.valueChanged.connect(self.layout_changed_handler)
+        self.phase_spinbox.valueChanged.connect(self.common_changed_handler)
+        self.length_spinbox.valueChanged.connect(self.common_changed_handler)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('button_press_event', self._on_press)
+
+    def cell_params(self, rows, cols):
+        return ratio_params(rows, cols, phase=str(self.phase_spinbox.value()), length=self.length_spinbox.value())
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.grid.axes.bbox)
+        self.grid.axes.draw_artist(self.grid.collection)
+
+    def _on_press(self, event):
+        if not event.dblclick or event.inaxes is None:
+            return
+
+        cell = self.grid.cell_at(event.xdata, event.ydata)
+        if cell is not None:
+            self.cell_selected.emit(self.grid.cell_params(*cell))
+
+    def layout_changed_handler(self):
+        rows, cols = self.rows_spinbox.value(), self.cols_spinbox.value()
+        self.grid.set_layout(rows, cols, self.cell_params(rows, cols))
+        self.grid.collection.set_animated(True)
+        self.canvas.draw_idle()
+
+    def common_changed_handler(self):
+        changed = self.grid.set_common(phase=str(self.phase_spinbox.value()), length=self.length_spinbox.value())
+        self.redraw_cells(changed)
+
+    def set_style(self, color=None, linewidth=None):
+        self.grid.set_style(color, linewidth)
+        self.canvas.draw_idle()
+
+    def cell_bbox(self, index):
+        """
+        Область ячейки в пикселях холста
+        """
+
+        col, row = self.grid.offsets()[index]
+        return TransformedBbox(Bbox([[col - 0.5, row - 0.5], [col + 0.5, row + 0.5]]), self.grid.axes.transData)
+
+    def redraw_cells(self, indices):
+        """
+        Перерисовка ячеек indices: восстановление фона их областей и отрисовка
+        временной коллекции только из изменившихся кривых. Фигуры не выходят за свои ячейки,
+        поэтому соседние ячейки не затрагиваются
+        """
+
+        if not len(indices):
+            return
+        if self._background is None or len(indices) > self.full_redraw_share * len(self.grid.params):
+            self.canvas.draw_idle()
+            return
+
+        bboxes = [self.cell_bbox(index) for index in indices]
+        for bbox in bboxes:
+            self.canvas.restore_region(self._background, bbox=bbox)
+        self.grid.axes.draw_artist(self.grid.cells_collection(indices))
+        for bbox in bboxes:
+            self.canvas.blit(bbox)
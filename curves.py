@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Описание параметрических кривых суммами произведений гармоник и их вычисление.
+
+Кривая - кортеж осей (x, y[, z]); ось - кортеж слагаемых; слагаемое - амплитуда и произведение
+гармоник func(freq * t + phase), func - 'sin' или 'cos'. Амплитуда, частота и фаза - число
+или имя параметра генератора (freq_x, freq_y, freq_z, phase_x, phase_y, phase_z, a, b, c);
+фазы - в радианах. Пример - фигура Лиссажу с гармоникой по X:
+    ((term('a', harmonic('sin', 'freq_x', 'phase_x')), term(0.3, harmonic('sin', 5., 0.))),
+     (term('b', harmonic('sin', 'freq_y', 'phase_y')),))
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from kernels import wave
+
+FUNCTIONS = {"sin": np.sin, "cos": np.cos}
+
+
+def harmonic(func, freq, phase=0.):
+    """
+    Множитель func(freq * t + phase)
+    :param func: 'sin' или 'cos'
+        :type func: str
+    :param freq: Частота - число или имя параметра
+        :type freq: float, str
+    :param phase: Фаза в радианах - число или имя параметра
+        :type phase: float, str
+    :return: tuple
+    """
+
+    if func not in FUNCTIONS:
+        raise ValueError(f'Неизвестная функция {func}, доступны: {", ".join(FUNCTIONS)}')
+    return func, freq, phase
+
+
+def term(amp, *factors):
+    """
+    Слагаемое amp * factor_1 * factor_2 * ...
+    :param amp: Амплитуда - число или имя параметра
+        :type amp: float, str
+    :param factors: Множители harmonic(...)
+    :return: tuple
+    """
+
+    if not factors:
+        raise ValueError('Слагаемое должно содержать хотя бы одну гармонику')
+    return amp, tuple(factors)
+
+
+# x = a * sin(freq_x * t + phase_x), y = b * sin(freq_y * t + phase_y), z = c * sin(freq_z * t);
+# фаза по z пока не используется
+LISSAJOUS = ((term('a', harmonic('sin', 'freq_x', 'phase_x')),),
+             (term('b', harmonic('sin', 'freq_y', 'phase_y')),),
+             (term('c', harmonic('sin', 'freq_z')),))
+
+# x = a * cos(freq_x * t + phase_x) * cos(t), y = b * cos(freq_y * t + phase_y) * sin(t),
+# z = c * sin(freq_z * t + phase_z)
+ROSE = ((term('a', harmonic('cos', 'freq_x', 'phase_x'), harmonic('cos', 1.)),),
+        (term('b', harmonic('cos', 'freq_y', 'phase_y'), harmonic('sin', 1.)),),
+        (term('c', harmonic('sin', 'freq_z', 'phase_z')),))
+
+CURVES = {"lissajous": LISSAJOUS, "rose": ROSE}
+
+
+def get_curve(curve):
+    """
+    Описание кривой по имени встроенной кривой (CURVES) или само описание
+    """
+
+    if isinstance(curve, str):
+        try:
+            return CURVES[curve]
+        except KeyError:
+            raise ValueError(f'Неизвестная кривая {curve}, доступны: {", ".join(CURVES)}') from None
+    return tuple(tuple((amp, tuple(tuple(factor) for factor in factors)) for amp, factors in axis) for axis in curve)
+
+
+def resolve(value, params):
+    return params[value] if isinstance(value, str) else value
+
+
+class CurvePlan:
+    """
+    План вычисления кривой. Одинаковые гармоники (например, sin(t) и cos(t) в нескольких осях)
+    вычисляются один раз. Первая гармоника единственного слагаемого оси, если больше
+    нигде не используется, вычисляется сразу в массив оси, остальные - в рабочие массивы,
+    которые переиспользуются между вызовами. Для одной гармоники на ось (фигура Лиссажу)
+    рабочие массивы не нужны, и последовательность операций та же, что t * freq + phase -> sin -> * amp
+    """
+
+    def __init__(self, curve):
+        """
+        :param curve: Описание кривой (оси, слагаемые, гармоники)
+            :type curve: tuple
+        """
+
+        self.curve = curve
+        self.factors = []
+        index = {}
+        self.axes = []
+        for axis in curve:
+            terms = []
+            for amp, factors in axis:
+                indices = []
+                for factor in factors:
+                    if factor not in index:
+                        index[factor] = len(self.factors)
+                        self.factors.append(factor)
+                    indices.append(index[factor])
+                terms.append((amp, tuple(indices)))
+            self.axes.append(tuple(terms))
+
+        # имена параметров, от которых зависит кривая
+        values = [value for axis in curve for amp, factors in axis
+                  for value in (amp,) + tuple(value for _, freq, phase in factors for value in (freq, phase))]
+        self.names = tuple(sorted({value for value in values if isinstance(value, str)}))
+
+        uses = np.bincount([i for axis in self.axes for _, indices in axis for i in indices],
+                           minlength=len(self.factors))
+        # номер гармоники, вычисляемой сразу в массив оси, или None
+        self.direct = [terms[0][1][0] if len(terms) == 1 and uses[terms[0][1][0]] == 1 else None
+                       for terms in self.axes]
+        direct = set(self.direct)
+        self.shared = [i for i in range(len(self.factors)) if i not in direct]
+        self.needs_temp = any(len(terms) > 1 for terms in self.axes)
+
+    @property
+    def dims(self):
+        return len(self.axes)
+
+    def frequencies(self, params):
+        """
+        Частоты гармоник плана (для поиска периода)
+        """
+
+        return [resolve(freq, params) for _, freq, _ in self.factors]
+
+    def half_period_signs(self, harmonics):
+        """
+        Знаки осей при сдвиге на половину периода: гармоника с кратностью n меняет знак при нечётном n,
+        слагаемое - по сумме кратностей множителей. Ось с разными знаками слагаемых не симметрична
+        :param harmonics: Кратности частот гармоник (find_period для frequencies)
+            :type harmonics: tuple
+        :return: list из 1.0/-1.0 по осям или None, если хотя бы одна ось не симметрична
+        """
+
+        signs = []
+        for terms in self.axes:
+            parity = {sum(harmonics[i] for i in indices) % 2 for _, indices in terms}
+            if len(parity) > 1:
+                return None
+            signs.append(-1. if parity.pop() else 1.)
+        return signs
+
+    def _work(self, shape, dtype, work):
+        count = len(self.shared) + self.needs_temp
+        if work is None or len(work) != count or (count and (work[0].shape != shape or work[0].dtype != dtype)):
+            work = [np.empty(shape, dtype=dtype) for _ in range(count)]
+        return work
+
+    @staticmethod
+    def _fill(out, t, factor, params, kernel):
+        """
+        Вычисление func(freq * t + phase) на месте (kernels.wave)
+        """
+
+        func, freq, phase = factor
+        return wave(out, t, resolve(freq, params), resolve(phase, params), func, kernel)
+
+    def evaluate(self, t, params, out, work=None, kernel='numpy'):
+        """
+        Вычисление кривой на сетке времени
+        :param t: Сетка времени (для пакета - форма (N, resolution))
+            :type t: numpy.ndarray
+        :param params: Значения параметров (числа или массивы, совместимые с t по форме)
+            :type params: dict
+        :param out: Массивы осей формы t.shape
+            :type out: list
+        :param work: Рабочие массивы предыдущего вызова (переиспользуются при той же форме)
+            :type work: list
+        :param kernel: Способ вычисления гармоник (kernels.KERNELS); 'phasor' - только для равномерной сетки
+            :type kernel: str
+        :return: list рабочих массивов для следующего вызова
+        """
+
+        work = self._work(out[0].shape, out[0].dtype, work)
+        buffers = dict(zip(self.shared, work))
+        for index, buffer in buffers.items():
+            self._fill(buffer, t, self.factors[index], params, kernel)
+        temp = work[-1] if self.needs_temp else None
+
+        for axis, terms, direct in zip(out, self.axes, self.direct):
+            for number, (amp, indices) in enumerate(terms):
+                target = axis if number == 0 else temp
+                if direct is not None:
+                    source = self._fill(target, t, self.factors[direct], params, kernel)
+                else:
+                    source = buffers[indices[0]]
+                for index in indices[1:]:
+                    np.multiply(source, buffers[index], out=target)
+                    source = target
+
+                amp = resolve(amp, params)
+                if isinstance(amp, np.ndarray) or amp != 1:
+                    np.multiply(source, amp, out=target)
+                    source = target
+                if number:
+                    np.add(axis, source, out=axis)
+                elif source is not axis:
+                    axis[...] = source
+        return work
+
+
+def compile_curve(curve, dims=None):
+    """
+    План вычисления кривой (кэшируется по имени или описанию кривой)
+    :param curve: Имя встроенной кривой или описание
+        :type curve: str, tuple
+    :param dims: Количество вычисляемых осей (2 или 3). None - все оси описания
+        :type dims: int
+    :return: CurvePlan
+    """
+
+    if not isinstance(curve, (str, tuple)):
+        curve = get_curve(curve)
+    return _compile(curve, dims)
+
+
+@lru_cache(maxsize=64)
+def _compile(curve, dims):
+    curve = get_curve(curve)
+    if dims is not None and dims > len(curve):
+        raise ValueError(f'Кривая задаёт {len(curve)} оси, требуется {dims}')
+    return CurvePlan(curve[:dims])
@@ -1,4 +1,5 @@
 #!/usr/bin/python3
 # -*- coding: utf-8 -*-
 
-pyinstaller --onefile --icon=files/lissajous.ico --noconsole main_lissajous.py
\ No newline at end of file
+pyuic5 main_window.ui -o ui_main_window.py
+pyinstaller --onefile --icon=files/lissajous.ico --noconsole main_lissajous.py
@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Экспорт анимации фигуры (изменение сдвига фазы X или частоты X) в MP4 (ffmpeg) или GIF (Pillow).
+Кадры отрисовываются в нескольких процессах (matplotlib Agg) и по порядку передаются кодировщику.
+
+Запуск:
+    python export_video.py files/presets/preset.json sweep.mp4 --frames 300 --fps 30 --workers 4
+    python export_video.py files/presets/preset.json sweep.gif --sweep frequency --step 0.005
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from lissajousgen import LissajousGenerator, sweep_params
+
+
+class FFmpegEncoder:
+    """
+    Кодирование кадров RGB в видео внешней программой ffmpeg (кадры передаются через stdin)
+    """
+
+    def __init__(self, path, width, height, fps, ffmpeg=None):
+        if width % 2 or height % 2:
+            raise ValueError(f'Размер кадра {width}x{height}: для libx264 (yuv420p) ширина и высота '
+                             f'должны быть чётными, измените размер или dpi')
+        ffmpeg = ffmpeg or shutil.which('ffmpeg')
+        if ffmpeg is None:
+            raise RuntimeError('ffmpeg не найден, сохраните анимацию в GIF')
+
+        self.process = subprocess.Popen(
+            [ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+             '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+        self.frame_bytes = width * height * 3
+
+    def write(self, frame):
+        if len(frame) != self.frame_bytes:
+            raise ValueError(f'Размер кадра {len(frame)} байт, ожидается {self.frame_bytes}')
+        self.process.stdin.write(frame)
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait():
+            raise RuntimeError(f'ffmpeg завершился с кодом {self.process.returncode}')
+
+
+class GifEncoder:
+    """
+    Запись анимированного GIF по мере поступления кадров (GifImagePlugin.getheader/getdata):
+    кадры не накапливаются, память не зависит от длины анимации.
+    Кадры приходят уже с палитрой (1 байт на пиксель); палитра первого кадра - глобальная,
+    у каждого кадра записывается своя
+    """
+
+    def __init__(self, path, width, height, fps):
+        self.path = path
+        self.duration = int(round(1000 / fps))
+        self._file = None
+
+    def write(self, frame):
+        from PIL import GifImagePlugin
+
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+            header, _ = GifImagePlugin.getheader(frame, info={"loop": 0, "duration": self.duration})
+            self._file.write(b''.join(header))
+        self._file.write(b''.join(GifImagePlugin.getdata(frame, duration=self.duration, include_color_table=True)))
+
+    def close(self):
+        if self._file is not None:
+            self._file.write(b';')
+            self._file.close()
+        self._file = None
+
+
+FORMATS = (".mp4", ".gif")
+
+_worker_state = {}
+
+
+def frame_size(size, dpi):
+    """
+    Размер кадра в пикселях. Берётся у холста Agg, как в render_frames: при нецелом size * dpi
+    холст округляет размер иначе, чем int(size * dpi)
+    :return: (width, height)
+    """
+
+    return FigureCanvasAgg(Figure(figsize=size, dpi=dpi)).get_width_height()
+
+
+def _frame_canvas(is_3d, style, size, dpi, limits):
+    """
+    Фигура с линией, общая для всех кадров процесса: кадр меняет только данные линии
+    """
+
+    key = (is_3d, tuple(sorted(style.items())), size, dpi, limits)
+    if _worker_state.get("key") != key:
+        from render_presets import make_axes
+
+        figure = Figure(figsize=size, dpi=dpi, frameon=True)
+        canvas = FigureCanvasAgg(figure)
+        axes = make_axes(figure, is_3d)
+        line, = axes.plot(*[[0.]] * (2 + is_3d), **style)
+        axes.set_xlim(-limits[0], limits[0])
+        axes.set_ylim(-limits[1], limits[1])
+        if is_3d:
+            axes.set_zlim(-limits[2], limits[2])
+        figure.tight_layout()
+        _worker_state.update(key=key, canvas=canvas, line=line)
+    return _worker_state["canvas"], _worker_state["line"]
+
+
+def render_frames(job):
+    """
+    Задача для пула процессов: генерация (generate_batch) и отрисовка последовательных кадров
+    :param job: (settings, indices, sweep, step, style, resolution, size, dpi, gif)
+        :type job: tuple
+    :return: list кадров - bytes RGB для ffmpeg или PIL.Image с палитрой для GIF
+    """
+
+    settings, indices, sweep, step, style, resolution, size, dpi, gif = job
+    is_3d = settings.get("mode") == '3d'
+
+    generator = _worker_state.get("generator")
+    if generator is None:
+        generator = _worker_state["generator"] = LissajousGenerator(cache_size=0)
+    generator.set_resolution(resolution)
+    coords = generator.generate_batch(**sweep_params(settings, indices, sweep, step))
+
+    limits = tuple(1.05 * settings.get(key, 1) for key in ('a', 'b', 'c'))
+    canvas, line = _frame_canvas(is_3d, style, size, dpi, limits)
+
+    frames = []
+    for i in range(len(indices)):
+        line.set_data(coords[0][i], coords[1][i])
+        if is_3d:
+            line.set_3d_properties(coords[2][i])
+        canvas.draw()
+        rgb = np.asarray(canvas.buffer_rgba())[..., :3]
+        if gif:
+            from PIL import Image
+
+            frames.append(Image.fromarray(rgb).quantize(colors=64))
+        else:
+            frames.append(rgb.tobytes())
+    return frames
+
+
+def export_sweep(path, settings, style, frames=300, fps=30, sweep='phase', step=0.01, resolution=1000,
+                 size=(5, 4), dpi=100, workers=None, chunk_frames=8, queue_size=None, ffmpeg=None):
+    """
+    Экспорт анимации в файл. Формат определяется расширением (.mp4 или .gif)
+    :param path: Путь к файлу
+        :type path: str
+    :param settings: Параметры исходной фигуры (аргументы generate_figure, в том числе mode)
+        :type settings: dict
+    :param style: Параметры отображения (LissajousWindow.get_settings(params=False))
+        :type style: dict
+    :param frames: Количество кадров
+        :type frames: int
+    :param fps: Частота кадров
+        :type fps: int
+    :param sweep: Изменяемый параметр - 'phase' или 'frequency'
+        :type sweep: str
+    :param step: Приращение параметра за кадр
+        :type step: float
+    :param resolution: Количество точек в кривой
+        :type resolution: int
+    :param size: Размер кадра в дюймах
+        :type size: tuple
+    :param dpi: Разрешение кадра
+        :type dpi: int
+    :param workers: Количество процессов. None - по числу ядер, 1 - в текущем процессе.
+                    Процессы запускаются методом spawn: экспорт из окна выполняется в потоке QThreadPool,
+                    а fork при работающих потоках Qt небезопасен
+        :type workers: int
+    :param chunk_frames: Количество кадров в одной задаче процесса
+        :type chunk_frames: int
+    :param queue_size: Максимальное количество задач в работе. По умолчанию - 2 на процесс.
+                       Ограничивает память: готовые кадры ждут кодировщика не дольше этой очереди
+        :type queue_size: int
+    :param ffmpeg: Путь к ffmpeg. По умолчанию ищется в PATH
+        :type ffmpeg: str
+    :return: dict со сводкой: frames, elapsed, fps (кадров в секунду экспорта)
+    """
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f'Неподдерживаемый формат {extension}, доступны: {", ".join(FORMATS)}')
+
+    width, height = frame_size(tuple(size), dpi)
+    if extension == '.gif':
+        encoder = GifEncoder(path, width, height, fps)
+    else:
+        encoder = FFmpegEncoder(path, width, height, fps, ffmpeg)
+
+    def chunk_job(first):
+        indices = np.arange(first, min(first + chunk_frames, frames))
+        return (dict(settings), indices, sweep, step, dict(style), resolution, tuple(size), dpi,
+                extension == '.gif')
+
+    start = time.perf_counter()
+    try:
+        if workers == 1:
+            for first in range(0, frames, chunk_frames):
+                for frame in render_frames(chunk_job(first)):
+                    encoder.write(frame)
+        else:
+            workers = workers or os.cpu_count() or 1
+            queue_size = queue_size or 2 * workers
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                pending = deque()
+                for first in range(0, frames, chunk_frames):
+                    if len(pending) >= queue_size:
+                        for frame in pending.popleft().result():
+                            encoder.write(frame)
+                    pending.append(executor.submit(render_frames, chunk_job(first)))
+                while pending:
+                    for frame in pending.popleft().result():
+                        encoder.write(frame)
+    finally:
+        encoder.close()
+    elapsed = time.perf_counter() - start
+
+    return {"frames": frames, "elapsed": elapsed, "fps": frames / elapsed if elapsed else 0.}
+
+
+def main(argv=None):
+    from presets import figure_params, figure_style, load_preset
+    from settings import SETTINGS_MPL
+
+    animation = SETTINGS_MPL["animation"]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('preset', help='пресет фигуры (*.json)')
+    parser.add_argument('output', help='файл анимации (*.mp4, *.gif)')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--fps', type=int, default=animation["fps"])
+    parser.add_argument('--sweep', default=animation["sweep"], choices=['phase', 'frequency'])
+    parser.add_argument('--step', type=float, default=animation["step"])
+    parser.add_argument('--resolution', type=int, default=SETTINGS_MPL["generation"]["resolution"])
+    parser.add_argument('--size', type=float, nargs=2, default=(5, 4), help='размер кадра в дюймах')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help='количество процессов (по умолчанию - число ядер)')
+    parser.add_argument('--ffmpeg', default=None, help='путь к ffmpeg (по умолчанию - из PATH)')
+    args = parser.parse_args(argv)
+
+    preset = load_preset(args.preset)
+    summary = export_sweep(args.output, figure_params(preset), figure_style(preset), frames=args.frames,
+                           fps=args.fps, sweep=args.sweep, step=args.step, resolution=args.resolution,
+                           size=tuple(args.size), dpi=args.dpi, workers=args.workers, ffmpeg=args.ffmpeg)
+    print(f'Кадров: {summary["frames"]}, время: {summary["elapsed"]:.2f} с, {summary["fps"]:.1f} кадров/с')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
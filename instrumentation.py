@@ -0,0 +1,204 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import json
+import os
+import threading
+import time
+
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+
+
+NULL_STAGE = nullcontext()
+
+
+class _Stage:
+    """
+    Контекстный менеджер замера одного этапа
+    """
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Instrumentation:
+    """
+    Именованные таймеры и счётчики этапов обновления фигуры.
+    Выключенный профилировщик возвращает общий пустой контекст (NULL_STAGE)
+    и ничего не записывает, поэтому замеры можно оставлять в коде
+    """
+
+    def __init__(self, enabled=False, history=256, max_events=20000):
+        """
+        :param enabled: Включить запись замеров
+            :type enabled: bool
+        :param history: Количество последних замеров каждого этапа для last/avg/p95
+            :type history: int
+        :param max_events: Количество последних событий для экспорта трассы
+            :type max_events: int
+        """
+
+        self.enabled = enabled
+        self.history = history
+        self.origin = time.perf_counter()
+        self.durations = {}
+        self.counters = {}
+        self.events = deque(maxlen=max_events)
+        self.frames = deque(maxlen=history)
+
+    def reset(self):
+        self.origin = time.perf_counter()
+        self.durations.clear()
+        self.counters.clear()
+        self.events.clear()
+        self.frames.clear()
+
+    def stage(self, name):
+        """
+        Замер этапа: with PROFILER.stage('draw'): ...
+        :param name: Имя этапа
+            :type name: str
+        """
+
+        if not self.enabled:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name):
+        """
+        Декоратор замера функции как этапа name
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Stage(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, start, end):
+        """
+        Запись замера этапа (время в секундах perf_counter)
+        """
+
+        durations = self.durations.get(name)
+        if durations is None:
+            durations = self.durations.setdefault(name, deque(maxlen=self.history))
+        durations.append(end - start)
+        self.events.append((name, start, end, threading.get_ident()))
+
+    def count(self, name, value):
+        """
+        Запись значения счётчика (например, количества точек)
+        """
+
+        if self.enabled:
+            self.counters[name] = value
+            self.events.append((name, time.perf_counter(), value, None))
+
+    def frame(self):
+        """
+        Отметка выведенного кадра для расчёта FPS
+        """
+
+        if self.enabled:
+            self.frames.append(time.perf_counter())
+
+    def fps(self, window=1.0):
+        """
+        Количество кадров за последние window секунд, пересчитанное в кадры в секунду
+        """
+
+        now = time.perf_counter()
+        recent = [moment for moment in self.frames if now - moment <= window]
+        if len(recent) < 2:
+            return 0.
+        return (len(recent) - 1) / max(recent[-1] - recent[0], 1e-9)
+
+    def stats(self):
+        """
+        Статистика этапов в миллисекундах
+        :return: dict {этап: {"last", "avg", "p95", "count"}}
+        """
+
+        result = {}
+        for name, durations in list(self.durations.items()):
+            values = sorted(durations)
+            if not values:
+                continue
+            result[name] = {
+                "last": durations[-1] * 1000,
+                "avg": sum(values) / len(values) * 1000,
+                "p95": values[min(int(0.95 * len(values)), len(values) - 1)] * 1000,
+                "count": len(values)
+            }
+        return result
+
+    def summary(self, stages=None):
+        """
+        Строка для строки состояния: этапы (last/avg/p95, мс), счётчики и FPS
+        :param stages: Порядок вывода этапов. По умолчанию - все в порядке первого замера
+            :type stages: list
+        """
+
+        stats = self.stats()
+        parts = [f'{name} {item["last"]:.1f}/{item["avg"]:.1f}/{item["p95"]:.1f}'
+                 for name, item in ((name, stats.get(name)) for name in (stages or stats)) if item]
+        parts += [f'{name} {value}' for name, value in self.counters.items()]
+        parts.append(f'FPS {self.fps():.1f}')
+        return ' | '.join(parts)
+
+    def export_json(self, path):
+        """
+        Сохранение статистики этапов, счётчиков и FPS в JSON
+        """
+
+        data = {"stages": self.stats(), "counters": dict(self.counters), "fps": self.fps()}
+        with open(path, 'w', encoding='utf-8') as write_file:
+            json.dump(data, write_file, indent=2)
+
+    def export_chrome_trace(self, path):
+        """
+        Сохранение событий в формате Chrome trace (chrome://tracing, Perfetto)
+        """
+
+        pid = os.getpid()
+        trace = []
+        for name, start, end, thread in list(self.events):
+            if thread is None:
+                trace.append({"name": name, "ph": "C", "ts": (start - self.origin) * 1e6,
+                              "pid": pid, "args": {name: end}})
+            else:
+                trace.append({"name": name, "ph": "X", "ts": (start - self.origin) * 1e6,
+                              "dur": (end - start) * 1e6, "pid": pid, "tid": thread})
+        with open(path, 'w', encoding='utf-8') as write_file:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, write_file)
+
+    def export(self, path):
+        """
+        Экспорт по расширению файла: *.trace.json и *.trace - Chrome trace, иначе - статистика JSON
+        """
+
+        if path.endswith(('.trace.json', '.trace')):
+            self.export_chrome_trace(path)
+        else:
+            self.export_json(path)
+
+
+PROFILER = Instrumentation()
@@ -2,20 +2,266 @@
 # -*- coding: utf-8 -*-
 import numpy as np
 import time
+import tracemalloc
+
+from collections import OrderedDict
+from fractions import Fraction
+from math import gcd
+
+from curves import compile_curve
+from instrumentation import PROFILER
+
+
+def parse_phase(phase):
+    """
+    Разбор строки сдвига фаз в массив из трёх значений (ph_x, ph_y, ph_z).
+    Недостающие значения дополняются нулями
+    :param phase: Сдвиг фаз. Формат x.xx для X, Y, Z
+        :type phase: str
+    :return: numpy.ndarray формы (3,)
+    """
+
+    phases = np.array([float(ph) for ph in phase.split()], dtype=float)
+    phases.resize((3,), refcheck=False)
+    return phases
+
+
+def parse_phases(phase, count):
+    """
+    Приведение сдвигов фаз для пакетной генерации к массиву формы (count, 3)
+    :param phase: строка (общая для всех фигур), последовательность строк,
+                  число или массив ph_x формы (count,), массив формы (count, k), k <= 3
+        :type phase: str, list, numpy.ndarray
+    :param count: Количество фигур в пакете
+        :type count: int
+    :return: numpy.ndarray формы (count, 3)
+    """
+
+    if isinstance(phase, str):
+        return np.broadcast_to(parse_phase(phase), (count, 3))
+
+    phase = np.asarray(phase)
+    if phase.dtype.kind in 'US':
+        return np.array([parse_phase(ph) for ph in phase.ravel()]).reshape(count, 3)
+
+    phase = np.asarray(phase, dtype=float).reshape(-1, 1) if phase.ndim < 2 else np.asarray(phase, dtype=float)
+    phases = np.zeros((phase.shape[0], 3))
+    phases[:, :phase.shape[1]] = phase
+    return np.broadcast_to(phases, (count, 3))
+
+
+def sweep_params(settings, indices, sweep='phase', step=0.01):
+    """
+    Параметры generate_batch для кадров анимации: сдвиг фазы X (sweep='phase')
+    или частота X (sweep='frequency') увеличивается на step за кадр
+    :param settings: Параметры исходной фигуры (аргументы generate_figure)
+        :type settings: dict
+    :param indices: Номера кадров
+        :type indices: numpy.ndarray
+    :param sweep: Изменяемый параметр - 'phase' или 'frequency'
+        :type sweep: str
+    :param step: Приращение параметра за кадр
+        :type step: float
+    :return: dict
+    """
+
+    params = dict(settings)
+    offset = np.asarray(indices) * step
+    if sweep == 'frequency':
+        params["freq_x"] = params["freq_x"] + offset
+    else:
+        phases = parse_phases(params.get("phase", '0.5'), len(offset)).copy()
+        phases[:, 0] = (phases[:, 0] + offset) % 2
+        params["phase"] = phases
+    return params
+
+
+def curve_params(freq_x, freq_y, freq_z, phases, a, b, c):
+    """
+    Значения параметров кривой (curves.compile_curve) для аргументов generate_figure
+    :param phases: Сдвиги фаз (ph_x, ph_y, ph_z) в единицах pi - числа или столбцы массива для пакета
+        :type phases: tuple
+    :return: dict
+    """
+
+    phase_x, phase_y, phase_z = (np.pi * ph for ph in phases)
+    return {"freq_x": freq_x, "freq_y": freq_y, "freq_z": freq_z, "phase_x": phase_x, "phase_y": phase_y,
+            "phase_z": phase_z, "a": a, "b": b, "c": c}
+
+
+def find_period(freqs, tolerance=1e-9, max_denominator=10 ** 5, max_harmonic=1000):
+    """
+    Поиск общего периода колебаний с заданными частотами.
+    Частоты приближаются рациональными числами, после чего f_i = n_i * f0 с целыми n_i
+    :param freqs: Частоты колебаний (нулевые частоты не влияют на период)
+        :type freqs: iterable of float
+    :param tolerance: Допустимая относительная погрешность рационального приближения
+        :type tolerance: float
+    :param max_denominator: Максимальный знаменатель приближения
+        :type max_denominator: int
+    :param max_harmonic: Максимальная кратность n_i. Большие кратности (почти иррациональные
+                         соотношения) считаются непериодическими
+        :type max_harmonic: int
+    :return: (period, harmonics) - период и кортеж кратностей n_i, либо None
+    """
+
+    fractions = []
+    for freq in freqs:
+        freq = abs(float(freq))
+        fraction = Fraction(freq).limit_denominator(max_denominator)
+        if abs(freq - fraction) > tolerance * freq:
+            return None
+        fractions.append(fraction)
+
+    nonzero = [fr for fr in fractions if fr]
+    if not nonzero:
+        return None
+
+    numerator, denominator = 0, 1
+    for fr in nonzero:
+        numerator = gcd(numerator, fr.numerator)
+        denominator = denominator * fr.denominator // gcd(denominator, fr.denominator)
+    base = Fraction(numerator, denominator)
+
+    harmonics = tuple(int(fr / base) for fr in fractions)
+    if max(harmonics) > max_harmonic:
+        return None
+
+    return 2 * np.pi / float(base), harmonics
+
+
+class LRUCache:
+    """
+    Ограниченный кэш массивов с вытеснением давно неиспользуемых записей (LRU).
+    Значение - массив numpy или кортеж массивов. Сохранённые массивы доступны только для чтения
+    """
+
+    def __init__(self, max_items=16, max_bytes=None):
+        """
+        :param max_items: Максимальное количество записей. 0 - кэш отключён
+            :type max_items: int
+        :param max_bytes: Максимальный суммарный объём массивов в байтах. None - без ограничения
+            :type max_bytes: int
+        """
+
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _nbytes(value):
+        return sum(arr.nbytes for arr in value) if isinstance(value, tuple) else value.nbytes
+
+    def get(self, key):
+        """
+        Возврат значения по ключу (или None) с учётом статистики попаданий
+        :param key: Ключ записи
+            :type key: hashable
+        """
+
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        """
+        Сохранение значения. Массивы переводятся в режим только для чтения
+        :param key: Ключ записи
+            :type key: hashable
+        :param value: Массив или кортеж массивов
+            :type value: numpy.ndarray, tuple
+        :return: сохранённое значение
+        """
+
+        for arr in (value if isinstance(value, tuple) else (value,)):
+            arr.flags.writeable = False
+
+        size = self._nbytes(value)
+        if not self.max_items or (self.max_bytes is not None and size > self.max_bytes):
+            return value
+
+        if key in self._data:
+            self._bytes -= self._nbytes(self._data.pop(key))
+        self._data[key] = value
+        self._bytes += size
+
+        while len(self._data) > self.max_items or (self.max_bytes is not None and self._bytes > self.max_bytes):
+            _, evicted = self._data.popitem(last=False)
+            self._bytes -= self._nbytes(evicted)
+            self.evictions += 1
+
+        return value
+
+    def clear(self):
+        """
+        Очистка кэша (статистика сохраняется)
+        """
+
+        self._data.clear()
+        self._bytes = 0
+
+    def info(self):
+        """
+        Статистика кэша
+        :return: dict с ключами hits, misses, evictions, items, bytes
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "items": len(self._data), "bytes": self._bytes}
 
 
 class LissajousGenerator:
     """
-    Генерирует фигуры Лиссажу с заданными параметрами
+    Генерирует фигуры Лиссажу с заданными параметрами.
+    Координаты вычисляются планом кривой (curves.compile_curve): фигура Лиссажу - встроенная кривая
+    'lissajous', также доступна 'rose' и произвольные суммы произведений гармоник
     """
 
-    def __init__(self, resolution=1000):
+    def __init__(self, resolution=1000, cache_size=16, cache_bytes=64 * 2 ** 20, time_cache_size=8,
+                 dtype=np.float64, reuse_buffers=False, track_memory=False):
+        """
+        :param resolution: Количество точек в кривой
+            :type resolution: int
+        :param cache_size: Количество фигур в кэше. 0 - кэширование отключено
+            :type cache_size: int
+        :param cache_bytes: Ограничение объёма кэша фигур в байтах
+            :type cache_bytes: int
+        :param time_cache_size: Количество сеток времени (np.linspace) в кэше
+            :type time_cache_size: int
+        :param dtype: Тип элементов массивов координат (np.float32 вдвое экономит память)
+            :type dtype: numpy.dtype
+        :param reuse_buffers: Заполнять собственные предвыделенные массивы x, y, z вместо создания новых.
+                              Массивы перезаписываются при следующей генерации, кэш фигур не используется
+            :type reuse_buffers: bool
+        :param track_memory: Замерять пиковый объём выделенной памяти за вызов (tracemalloc),
+                             результат - в last_peak_bytes
+            :type track_memory: bool
+        """
+
         self._resolution = resolution
+        self._dtype = np.dtype(dtype)
+        self._reuse_buffers = reuse_buffers
+        self._buffers = []
+        self._work = (None, None)
+        self.track_memory = track_memory
+        self.last_peak_bytes = None
         self.x = None
         self.y = None
         self.z = None
 
-    def update_values(self, x, y, z):
+        self.figure_cache = LRUCache(max_items=cache_size, max_bytes=cache_bytes)
+        self.time_cache = LRUCache(max_items=time_cache_size, max_bytes=cache_bytes)
+
+    def update_values(self, x, y, z=None):
         """
         Функция обновления массивов координат x, y.
         Введена временная задержка
@@ -36,6 +282,13 @@ class LissajousGenerator:
         coords = [self.x, self.y, self.z]
         return coords[:2] if self.z is None else coords
 
+    def get_resolution(self):
+        """
+        Возврат количества точек в кривой
+        """
+
+        return self._resolution
+
     def set_resolution(self, resolution):
         """
         Установка количества точек в кривой
@@ -45,8 +298,81 @@ class LissajousGenerator:
 
         self._resolution = resolution
 
+    def cache_info(self):
+        """
+        Статистика попаданий/промахов кэшей фигур и сеток времени
+        :return: dict {"figures": {...}, "time": {...}}
+        """
+
+        return {"figures": self.figure_cache.info(), "time": self.time_cache.info()}
+
+    def clear_cache(self):
+        """
+        Очистка кэшей фигур и сеток времени
+        """
+
+        self.figure_cache.clear()
+        self.time_cache.clear()
+
+    def time_grid(self, length):
+        """
+        Сетка времени [-length*pi, length*pi] из resolution точек (кэшируется)
+        :param length: Длина отрисовки фигуры
+            :type length: float
+        :return: numpy.ndarray (только для чтения)
+        """
+
+        key = (float(length), self._resolution, self._dtype.str)
+        t = self.time_cache.get(key)
+        if t is None:
+            t = self.time_cache.put(key, np.linspace(-length * np.pi, length * np.pi, self._resolution,
+                                                     dtype=self._dtype))
+        return t
+
+    def period_grid(self, period):
+        """
+        Первая половина сетки времени одного периода: t_k = k * period / (resolution - 1)
+        :param period: Период фигуры
+            :type period: float
+        :return: numpy.ndarray (только для чтения) из (resolution - 1) // 2 точек
+        """
+
+        key = ('period', float(period), self._resolution, self._dtype.str)
+        t = self.time_cache.get(key)
+        if t is None:
+            t = np.arange((self._resolution - 1) // 2) * (period / (self._resolution - 1))
+            t = self.time_cache.put(key, t.astype(self._dtype, copy=False))
+        return t
+
+    def _output_arrays(self, count):
+        """
+        Массивы для записи координат: собственные предвыделенные буферы (reuse_buffers)
+        либо новые массивы
+        :param count: Количество осей (2 или 3)
+            :type count: int
+        :return: list из numpy.ndarray
+        """
+
+        if not self._reuse_buffers:
+            return [np.empty(self._resolution, dtype=self._dtype) for _ in range(count)]
+
+        if len(self._buffers) < count or self._buffers[0].shape != (self._resolution,) \
+                or self._buffers[0].dtype != self._dtype:
+            self._buffers = [np.empty(self._resolution, dtype=self._dtype) for _ in range(max(count, 3))]
+        return self._buffers[:count]
+
+    def _evaluate(self, plan, t, params, out, kernel='numpy'):
+        """
+        Вычисление кривой в массивы out. Рабочие массивы плана сохраняются до следующего вызова
+        """
+
+        work = self._work[1] if self._work[0] is plan else None
+        self._work = (plan, plan.evaluate(t, params, out, work, kernel))
+        return out
+
+    @PROFILER.timed('generate_figure')
     def generate_figure(self, freq_x, freq_y, freq_z=1, phase='0.5', a=1, b=1, c=1,
-                        length=10, mode='2d'):
+                        length=10, mode='2d', sampling='fixed', curve='lissajous', kernel='numpy'):
         """
         Функция генерирует фигуру (массивы x и y координат точек) с заданными частотами.
         :param freq_x: Частота массива x
@@ -67,24 +393,213 @@ class LissajousGenerator:
             :type b: int
         :param mode: Режим - 2D/3D
             :type b: str
+        :param sampling: 'fixed' - отрезок [-length*pi, length*pi],
+                         'period' - ровно один период замкнутой кривой (length не используется).
+                         Для иррациональных соотношений частот используется 'fixed'
+            :type sampling: str
+        :param curve: Кривая - имя встроенной (curves.CURVES: 'lissajous', 'rose') или описание
+            :type curve: str, tuple
+        :param kernel: Способ вычисления sin/cos (kernels.KERNELS): 'numpy' - в каждой точке,
+                       'phasor' - поворотом фазора по блокам, быстрее при больших resolution,
+                       погрешность - kernels.phasor_error_bound
+            :type kernel: str
+        """
+
+        if not self.track_memory:
+            self._generate(freq_x, freq_y, freq_z, phase, a, b, c, length, mode, sampling, curve, kernel)
+            return
+
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        try:
+            self._generate(freq_x, freq_y, freq_z, phase, a, b, c, length, mode, sampling, curve, kernel)
+        finally:
+            self.last_peak_bytes = tracemalloc.get_traced_memory()[1] - base
+            if started:
+                tracemalloc.stop()
+
+    def _generate(self, freq_x, freq_y, freq_z, phase, a, b, c, length, mode, sampling, curve, kernel):
+        plan = compile_curve(curve, 2 + (mode == '3d'))
+        params = curve_params(freq_x, freq_y, freq_z, parse_phase(phase), a, b, c)
+
+        period = None
+        if sampling == 'period' and self._resolution > 2:
+            period = find_period(plan.frequencies(params))
+
+        key = None
+        if not self._reuse_buffers:
+            key = (plan.curve, kernel, tuple(float(params[name]) for name in plan.names),
+                   ('period', period[0]) if period else float(length), self._resolution, self._dtype.str)
+            cached = self.figure_cache.get(key)
+            if cached is not None:
+                self.update_values(*cached)
+                return
+
+        out = self._output_arrays(plan.dims)
+        if period:
+            self._generate_period(out, plan, params, *period, kernel)
+        else:
+            self._evaluate(plan, self.time_grid(length), params, out, kernel)
+
+        self.update_values(*(out if key is None else self.figure_cache.put(key, tuple(out))))
+
+    def _generate_period(self, out, plan, params, period, harmonics, kernel='numpy'):
+        """
+        Генерация ровно одного периода фигуры в массивы out.
+        Сдвиг на половину периода меняет знак гармоники с нечётной кратностью частоты
+        (sin(n*pi + u) = (-1)^n * sin(u)), поэтому при чётном числе интервалов и симметричных осях
+        (CurvePlan.half_period_signs) вычисляется только первая половина, а вторая получается отражением
+        :param out: Массивы координат
+            :type out: list
+        :param plan: План кривой
+            :type plan: curves.CurvePlan
+        :param params: Значения параметров кривой
+            :type params: dict
         """
 
-        dimension = {'2d': np.linspace(-length * np.pi, length * np.pi, self._resolution),
-                     '3d': np.linspace(-length * np.pi, length * np.pi, self._resolution)}
+        intervals = self._resolution - 1
+        signs = plan.half_period_signs(harmonics)
 
-        phases = np.array([float(ph) for ph in phase.split()], dtype=float)
-        phases.resize((3,), refcheck=False)
+        if intervals % 2 or signs is None:
+            t = (np.arange(self._resolution) * (period / intervals)).astype(self._dtype, copy=False)
+            self._evaluate(plan, t, params, out, kernel)
+            return
 
-        phi_x, phi_y, phi_z = phases
+        half = intervals // 2
+        self._evaluate(plan, self.period_grid(period), params, [coord[:half] for coord in out], kernel)
+        for coord, sign in zip(out, signs):
+            np.multiply(coord[:half], sign, out=coord[half:intervals])
+            coord[intervals] = coord[0]
 
-        t = dimension.get(mode, '2d')
-        x = a * np.sin(freq_x * t + np.pi * phi_x)
-        y = b * np.sin(freq_y * t + np.pi * phi_y)
-        z = c * np.sin(freq_z * t)
+    def iter_figure(self, freq_x, freq_y, freq_z=1, phase='0.5', a=1, b=1, c=1,
+                    length=10, mode='2d', chunk_size=2 ** 16, curve='lissajous', kernel='numpy'):
+        """
+        Потоковая генерация фигуры фиксированными порциями точек.
+        Объединение порций совпадает с результатом generate_figure(sampling='fixed'),
+        при этом в памяти одновременно находится только одна порция
+        :param chunk_size: Количество точек в порции
+            :type chunk_size: int
+        Остальные параметры - как у generate_figure
+        :return: генератор кортежей numpy.ndarray - (x, y) или (x, y, z)
+        """
+
+        plan = compile_curve(curve, 2 + (mode == '3d'))
+        params = curve_params(freq_x, freq_y, freq_z, parse_phase(phase), a, b, c)
+
+        # те же операции, что и в np.linspace: t_k = k * step + start, последняя точка - ровно stop
+        start, stop = -length * np.pi, length * np.pi
+        step = (stop - start) / (self._resolution - 1) if self._resolution > 1 else 0.
 
-        # rose curve
-        # x = a * np.cos(freq_x * t + np.pi * phi_x) * np.cos(t)
-        # y = b * np.cos(freq_y * t + np.pi * phi_y) * np.sin(t)
-        # z = c * np.sin(freq_z * t + np.pi * phi_z)
+        for first in range(0, self._resolution, chunk_size):
+            t = np.arange(first, min(first + chunk_size, self._resolution), dtype=float)
+            t *= step
+            t += start
+            if first + t.shape[0] == self._resolution and self._resolution > 1:
+                t[-1] = stop
+            t = t.astype(self._dtype, copy=False)
+
+            yield tuple(self._evaluate(plan, t, params, [np.empty(t.shape[0], dtype=self._dtype)
+                                                         for _ in range(plan.dims)], kernel))
+
+    def export_figure(self, path, freq_x, freq_y, freq_z=1, phase='0.5', a=1, b=1, c=1,
+                      length=10, mode='2d', chunk_size=2 ** 16, curve='lissajous', kernel='numpy'):
+        """
+        Потоковая запись фигуры в файл .npy через отображение в память (numpy.memmap).
+        Массив в файле имеет форму (2 или 3, resolution): строки - координаты x, y[, z].
+        Расход памяти не зависит от resolution
+        :param path: Путь к файлу .npy
+            :type path: str
+        Остальные параметры - как у iter_figure
+        :return: путь к файлу
+        """
+
+        dims = 2 + (mode == '3d')
+        coords = np.lib.format.open_memmap(path, mode='w+', dtype=self._dtype, shape=(dims, self._resolution))
+
+        first = 0
+        for chunk in self.iter_figure(freq_x, freq_y, freq_z, phase, a, b, c, length, mode, chunk_size, curve,
+                                      kernel):
+            coords[:, first:first + chunk[0].shape[0]] = chunk
+            first += chunk[0].shape[0]
+
+        coords.flush()
+        del coords
+        return path
+
+    def generate_batch(self, freq_x, freq_y, freq_z=1, phase='0.5', a=1, b=1, c=1,
+                       length=10, mode='2d', chunk_size=None, curve='lissajous', kernel='numpy'):
+        """
+        Пакетная генерация фигур для сетки параметров за один проход (numpy broadcasting).
+        Все параметры, кроме mode и chunk_size, принимают скаляр или массив длины N.
+        Результат совпадает с последовательными вызовами generate_figure с параметрами - числами Python
+        (в том числе при dtype=float32: операции выполняются в тех же типах),
+        внутреннее состояние (x, y, z) генератора не изменяется.
+        :param freq_x: Частоты массива x
+            :type freq_x: float, numpy.ndarray
+        :param freq_y: Частоты массива y
+            :type freq_y: float, numpy.ndarray
+        :param freq_z: Частоты массива z
+            :type freq_z: float, numpy.ndarray
+        :param phase: Сдвиги фаз (см. parse_phases)
+            :type phase: str, list, numpy.ndarray
+        :param a: Амплитуды колебания x
+            :type a: float, numpy.ndarray
+        :param b: Амплитуды колебания y
+            :type b: float, numpy.ndarray
+        :param c: Амплитуды колебания z
+            :type c: float, numpy.ndarray
+        :param length: Длины отрисовки фигур
+            :type length: float, numpy.ndarray
+        :param mode: Режим - 2D/3D
+            :type mode: str
+        :param chunk_size: Количество фигур, обрабатываемых за раз (ограничение пиковой памяти).
+                           None - весь пакет сразу
+            :type chunk_size: int
+        :param curve: Кривая - имя встроенной или описание (см. generate_figure)
+            :type curve: str, tuple
+        :param kernel: Способ вычисления sin/cos (см. generate_figure)
+            :type kernel: str
+        :return: list из numpy.ndarray формы (N, resolution) - [x, y] или [x, y, z]
+        """
+
+        # число фигур задают и массивы параметров, и последовательность фаз (по одной на фигуру)
+        phase_shape = () if isinstance(phase, str) else np.shape(phase)[:1]
+        freq_x, freq_y, freq_z, a, b, c, length, _ = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(v, dtype=float)) for v in (freq_x, freq_y, freq_z, a, b, c, length)),
+            np.empty(phase_shape or (1,)))
+        count = freq_x.shape[0]
+        phases = parse_phases(phase, count)
+
+        plan = compile_curve(curve, 2 + (mode == '3d'))
+        coords = [np.empty((count, self._resolution), dtype=self._dtype) for _ in range(plan.dims)]
+        chunk_size = chunk_size or count
+
+        for start in range(0, count, chunk_size):
+            rows = slice(start, start + chunk_size)
+            span = length[rows] * np.pi
+            # сетка времени - как time_grid: linspace в float64 с приведением к dtype
+            t = np.linspace(-span, span, self._resolution, axis=1).astype(self._dtype, copy=False)
+
+            # типы операндов - как в generate_figure: частоты и амплитуды (числа Python) вычисляются в dtype,
+            # сдвиги фаз (numpy.float64 из parse_phase) - в float64
+            fx, fy, fz, ax, ay, az = (value[rows, None].astype(self._dtype, copy=False)
+                                      for value in (freq_x, freq_y, freq_z, a, b, c))
+            params = curve_params(fx, fy, fz, (phases[rows, 0:1], phases[rows, 1:2], phases[rows, 2:3]), ax, ay, az)
+            self._evaluate(plan, t, params, [coord[rows] for coord in coords], kernel)
+
+        return coords
+
+
+def load_figure(path):
+    """
+    Открытие фигуры, сохранённой export_figure, без копирования в память
+    :param path: Путь к файлу .npy
+        :type path: str
+    :return: list из numpy.memmap - [x, y] или [x, y, z] (только для чтения)
+    """
 
-        self.update_values(x, y, [None, z][mode == '3d'])
+    return list(np.load(path, mmap_mode='r'))
@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+def decimate(x, y, extent, width, height, subpixel=2):
+    """
+    Упрощение кривой до различимого на экране уровня детализации.
+    Координаты переводятся в ячейки пиксельной сетки (с шагом 1/subpixel пикселя);
+    из каждой серии подряд идущих точек в одной ячейке остаются только первая и последняя.
+    Смещение любой точки упрощённой кривой от исходной не превышает размера ячейки.
+    Крайние точки по x и y сохраняются всегда, поэтому границы фигуры не меняются
+    :param x: массив координат x
+        :type x: numpy.ndarray
+    :param y: массив координат y
+        :type y: numpy.ndarray
+    :param extent: Видимая область (x_min, x_max, y_min, y_max)
+        :type extent: tuple
+    :param width: Ширина области отображения в пикселях
+        :type width: int
+    :param height: Высота области отображения в пикселях
+        :type height: int
+    :param subpixel: Количество ячеек на пиксель по каждой оси
+        :type subpixel: int
+    :return: (x, y, index) - упрощённые массивы и индексы сохранённых точек
+    """
+
+    count = len(x)
+    if count <= 2:
+        return x, y, np.arange(count)
+
+    x_min, x_max, y_min, y_max = extent
+    columns = max(int(width * subpixel), 1)
+    rows = max(int(height * subpixel), 1)
+
+    cell_x = np.floor((np.asarray(x) - x_min) * (columns / (x_max - x_min))).astype(np.int64)
+    cell_y = np.floor((np.asarray(y) - y_min) * (rows / (y_max - y_min))).astype(np.int64)
+    # точки за пределами области схлопываются в пограничные ячейки
+    np.clip(cell_x, -1, columns, out=cell_x)
+    np.clip(cell_y, -1, rows, out=cell_y)
+    cell_x *= rows + 2
+    cell_x += cell_y
+    cell = cell_x
+
+    changed = cell[1:] != cell[:-1]
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    keep[1:] |= changed
+    keep[:-1] |= changed
+    keep[[np.argmin(x), np.argmax(x), np.argmin(y), np.argmax(y)]] = True
+
+    index = np.flatnonzero(keep)
+    return x[index], y[index], index
+
+
+def simplify(x, y, tolerance):
+    """
+    Упрощение ломаной алгоритмом Дугласа-Пекера.
+    Каждая отброшенная точка отстоит от отрезка, заменившего её участок, не больше чем на tolerance
+    (расстояние до отрезка, а не до прямой, поэтому оценка верна и для замкнутых кривых).
+    Первая и последняя точки сохраняются
+    :param x: массив координат x
+        :type x: numpy.ndarray
+    :param y: массив координат y
+        :type y: numpy.ndarray
+    :param tolerance: Допустимое отклонение в единицах координат
+        :type tolerance: float
+    :return: (x, y, index) - упрощённые массивы и индексы сохранённых точек
+    """
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    count = len(x)
+    if count <= 2:
+        return x, y, np.arange(count)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        seg_x, seg_y = x[last] - x[first], y[last] - y[first]
+        dx = x[first + 1:last] - x[first]
+        dy = y[first + 1:last] - y[first]
+        length_sq = seg_x * seg_x + seg_y * seg_y
+        if length_sq > 0:
+            t = dx * seg_x
+            t += dy * seg_y
+            t /= length_sq
+            np.clip(t, 0., 1., out=t)
+            dx -= t * seg_x
+            dy -= t * seg_y
+        dx *= dx
+        dy *= dy
+        dx += dy
+
+        farthest = int(np.argmax(dx))
+        if dx[farthest] > tolerance_sq:
+            middle = first + 1 + farthest
+            keep[middle] = True
+            stack.append((first, middle))
+            stack.append((middle, last))
+
+    index = np.flatnonzero(keep)
+    return x[index], y[index], index
@@ -4,20 +4,23 @@
 import json
 import os
 import sys
+import time
 
 import numpy as np
 
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas, \
     NavigationToolbar2QT as NavigationToolbar
-from mpl_toolkits.mplot3d.axes3d import Axes3D
+from matplotlib.figure import Figure
 
 import PyQt5.QtWidgets as Qt
-from PyQt5 import uic, QtGui, QtCore
+from PyQt5 import QtGui, QtCore
 
+from instrumentation import PROFILER
 from lissajousgen import LissajousGenerator
 
+# окончание импортов модуля (шкала time.perf_counter); момент запуска процесса определяет StartupProfiler
+STARTUP_TIMES = {"imports": time.perf_counter()}
+
 
 def check_paths():
     """
@@ -50,20 +53,361 @@ def validation_form(form):
 
 
 class MplCanvas(FigureCanvas):
+    """
+    Холст matplotlib с постоянной линией фигуры.
+    Линия помечена как animated: при полной отрисовке кэшируется фон осей,
+    а при обновлении данных перерисовывается только линия поверх фона (blitting).
+    Если задан lod_subpixel, 2D-линия упрощается до разрешения холста (lod.decimate);
+    полные массивы хранятся в full_values.
+    В режиме mode='fast3d' вместо Axes3D используются 2D-оси: 3D-кривая проецируется (projection.Projector)
+    и отображается как 2D-линия. Вращение - перетаскиванием мышью, масштаб - колесом
+    """
+
+    lod_subpixel = None
+    # реестр обратных вызовов осей, к которому подключён refresh_view, и номера подключений
+    _limit_callbacks = (None, ())
 
-    def __init__(self, canvas_fig=None, mode=None, width=5, height=4):
-        fig = plt.Figure(figsize=(width, height), frameon=True)
+    def __init__(self, canvas_fig=None, mode=None, width=5, height=4, aspect=(1.5, 1.2, 1.2, 1)):
+        fig = Figure(figsize=(width, height), frameon=True)
         super(MplCanvas, self).__init__(fig)
         if canvas_fig:
             canvas_fig.figure.clf()
-            canvas_fig.axes = canvas_fig.figure.add_subplot(111, projection=mode)
-            if mode is not None:
+            if mode == '3d':
+                # mplot3d загружается только при первом включении 3D
+                from mpl_toolkits.mplot3d.axes3d import Axes3D
+            canvas_fig.axes = canvas_fig.figure.add_subplot(111, projection=None if mode == 'fast3d' else mode)
+            if mode == '3d':
                 canvas_fig.axes.get_proj = lambda: np.dot(Axes3D.get_proj(canvas_fig.axes),
-                                                          np.diag([1.5, 1.2, 1.2, 1]))
+                                                          np.diag(aspect))
                 canvas_fig.axes.view_init(elev=90., azim=-90)
+            canvas_fig.reset_artists()
+            if mode == 'fast3d':
+                from projection import Projector
+
+                canvas_fig.projector = Projector(elev=90., azim=-90, aspect=aspect)
+                canvas_fig.axes.set_aspect('equal', adjustable='box')
             self.axes = canvas_fig.axes.figure.get_axes()
         else:
             self.axes = fig.add_subplot(111)
+            self.reset_artists()
+            self.mpl_connect('draw_event', self._on_draw)
+            self.mpl_connect('resize_event', self._on_resize)
+            self.mpl_connect('button_press_event', self._on_press)
+            self.mpl_connect('motion_notify_event', self._on_motion)
+            self.mpl_connect('scroll_event', self._on_scroll)
+
+    def reset_artists(self):
+        """
+        Сброс состояния после пересоздания осей: линия, фон и разметка будут построены заново
+        """
+
+        self.line = None
+        self.image = None
+        self.projector = None
+        self._drag = None
+        self.full_values = None
+        self.grid_state = None
+        self.layout_dirty = True
+        self._background = None
+        self._image_args = None
+        self._raster = None
+        self._updating = False
+
+        # подключение к новым осям (или после axes.cla(), который заменяет реестр) - один раз
+        registry, _ = self._limit_callbacks
+        if registry is not self.axes.callbacks:
+            self._limit_callbacks = (self.axes.callbacks,
+                                     [self.axes.callbacks.connect(signal, self.refresh_view)
+                                      for signal in ('xlim_changed', 'ylim_changed')])
+
+    def _on_draw(self, event):
+        """
+        Обработчик полной отрисовки: кэширование фона и отрисовка линии поверх него
+        """
+
+        if event is not None and event.canvas is not self:
+            return
+
+        self._background = self.copy_from_bbox(self.axes.bbox)
+        if self.line is not None:
+            self.axes.draw_artist(self.line)
+
+    def _on_resize(self, event):
+        """
+        Обработчик изменения размера: фон устарел, разметку нужно пересчитать
+        """
+
+        self._background = None
+        self.layout_dirty = True
+        self.refresh_view()
+
+    def _on_press(self, event):
+        self._drag = (event.x, event.y) if self.projector is not None and event.button == 1 else None
+
+    def _on_motion(self, event):
+        """
+        Вращение 3D-кривой (fast3d) перетаскиванием: перепроецирование и блиттинг линии
+        """
+
+        if self._drag is None or self.line is None or event.button != 1:
+            return
+
+        x, y = self._drag
+        self._drag = (event.x, event.y)
+        self.projector.rotate(-(event.x - x) * 0.5, -(event.y - y) * 0.5)
+        self.show_projection()
+        self.redraw()
+
+    def _on_scroll(self, event):
+        """
+        Масштабирование 3D-кривой (fast3d) колесом мыши
+        """
+
+        if self.projector is None or self.line is None:
+            return
+
+        self.projector.zoom *= 1.1 ** event.step
+        self.set_projection_limits()
+        self.show_projection()
+        self.redraw(full=True)
+
+    def show_projection(self):
+        """
+        Проекция 3D-кривой для текущего вида и обновление линии
+        """
+
+        self.full_values = self.projector.project()
+        self.line.set_data(*self._display_values(self.full_values, self.axes.get_xlim() + self.axes.get_ylim()))
+
+    def set_projection_limits(self):
+        """
+        Пределы осей по ограничивающей сфере проекции. Возвращает True, если пределы изменились
+        """
+
+        xlim, ylim = self.projector.limits()
+        if np.allclose(self.axes.get_xlim(), xlim) and np.allclose(self.axes.get_ylim(), ylim):
+            return False
+
+        updating, self._updating = self._updating, True
+        try:
+            self.axes.set_xlim(xlim)
+            self.axes.set_ylim(ylim)
+        finally:
+            self._updating = updating
+        return True
+
+    def _view_size(self):
+        return max(int(self.axes.bbox.width), 1), max(int(self.axes.bbox.height), 1)
+
+    def _display_values(self, values, extent=None):
+        """
+        Массивы для отображения: для 2D при включённом LOD - упрощённые до разрешения холста
+        :param values: Полные массивы координат
+            :type values: list
+        :param extent: Видимая область. По умолчанию - границы данных с полями autoscale
+            :type extent: tuple
+        """
+
+        if self.lod_subpixel is None or len(values) != 2:
+            return values
+
+        from lod import decimate
+        from rasterizer import data_extent
+
+        x, y, _ = decimate(values[0], values[1], extent or data_extent(values[0], values[1]),
+                           *self._view_size(), subpixel=self.lod_subpixel)
+        return [x, y]
+
+    def refresh_view(self, *args):
+        """
+        Пересчёт отображения под текущие размер холста и пределы осей (изменение размера, масштабирование):
+        повторное упрощение линии (LOD) или повторная растеризация изображения
+        """
+
+        if self._updating or self.full_values is None or len(self.full_values) != 2:
+            return
+
+        self._updating = True
+        try:
+            if self.image is not None:
+                self.update_image(self.full_values, *self._image_args,
+                                  extent=self.axes.get_xlim() + self.axes.get_ylim())
+            elif self.line is not None and self.lod_subpixel is not None:
+                self.line.set_data(*self._display_values(self.full_values,
+                                                         self.axes.get_xlim() + self.axes.get_ylim()))
+        finally:
+            self._updating = False
+
+    def update_line(self, values, style):
+        """
+        Обновление данных и стиля постоянной линии фигуры (без создания новых объектов)
+        :param values: Массивы координат [x, y] или [x, y, z]
+            :type values: list
+        :param style: Параметры отображения (color, linewidth)
+            :type style: dict
+        :return: True, если пределы осей изменились и нужна полная перерисовка
+        """
+
+        if self.projector is not None and len(values) == 3:
+            return self._update_projection(values, style)
+
+        self.full_values = values = [np.asarray(coord) for coord in values]
+        display = self._display_values(values)
+
+        if self.line is None:
+            self.line, = self.axes.plot(*display, **style)
+            self.line.set_animated(True)
+            return True
+
+        self._updating = True
+        try:
+            return self._update_line(display, style)
+        finally:
+            self._updating = False
+
+    def _update_projection(self, values, style):
+        self.full_values = self.projector.set_data(values)
+        if self.line is None:
+            self.line, = self.axes.plot(*self.full_values, **style)
+            self.line.set_animated(True)
+        else:
+            self.line.set(**style)
+
+        full = self.set_projection_limits()
+        self.show_projection()
+        return full or self._background is None
+
+    def _update_line(self, values, style):
+        if self.image is not None:
+            self.image.remove()
+            self.image = None
+            self.line.set_visible(True)
+            self.line.set_data(values[0], values[1])
+            self.line.set(**style)
+            self.axes.relim()
+            self.axes.autoscale_view()
+            return True
+
+        self.line.set_data(values[0], values[1])
+        if len(values) > 2:
+            self.line.set_3d_properties(values[2])
+        self.line.set(**style)
+
+        if self._fits_view(values):
+            return False
+
+        if len(values) > 2:
+            self.axes.auto_scale_xyz(*values, had_data=False)
+        else:
+            self.axes.relim()
+            self.axes.autoscale_view()
+        return True
+
+    def update_image(self, values, style, antialias=False, extent=None):
+        """
+        Отображение 2D-фигуры растровым изображением плотности точек вместо линии.
+        Используется для кривых из миллионов точек, где axes.plot слишком медленный
+        :param values: Массивы координат [x, y]
+            :type values: list
+        :param style: Параметры отображения (color, linewidth)
+            :type style: dict
+        :param antialias: Сглаживание при растеризации
+            :type antialias: bool
+        :param extent: Растеризуемая область. По умолчанию - границы данных
+            :type extent: tuple
+        :return: True - требуется полная перерисовка
+        """
+
+        from rasterizer import data_extent, rasterize, shade
+
+        self.full_values = values
+        self._image_args = (style, antialias)
+        # буфер плотности переиспользуется, если изменился только стиль (цвет, толщина линии)
+        cached_values, bounds, cached_key, density = self._raster or (None, None, None, None)
+        if cached_values is not values[0]:
+            bounds = data_extent(values[0], values[1])
+        extent = extent or bounds
+        key = (extent, self._view_size(), antialias)
+        if cached_values is not values[0] or cached_key != key:
+            density = rasterize(values[0], values[1], *self._view_size(), extent=extent, antialias=antialias)
+            self._raster = (values[0], bounds, key, density)
+        rgba = shade(density, **style)
+
+        if self.line is not None:
+            self.line.set_visible(False)
+
+        if self.image is None:
+            self.image = self.axes.imshow(rgba, extent=extent, origin='lower', aspect='auto',
+                                          interpolation='nearest')
+        else:
+            self.image.set_data(rgba)
+            self.image.set_extent(extent)
+
+        updating, self._updating = self._updating, True
+        try:
+            self.axes.set_xlim(extent[:2])
+            self.axes.set_ylim(extent[2:])
+        finally:
+            self._updating = updating
+        return True
+
+    def _fits_view(self, values, fill=0.9):
+        """
+        Проверка, что новые данные помещаются в текущие пределы осей и занимают
+        не меньше доли fill от них. Тогда пределы (и фон) не меняются
+        """
+
+        limits = [self.axes.get_xlim(), self.axes.get_ylim()]
+        if len(values) > 2:
+            limits.append(self.axes.get_zlim())
+
+        for coord, (low, high) in zip(values, limits):
+            coord_min, coord_max = np.min(coord), np.max(coord)
+            if coord_min < low or coord_max > high or (coord_max - coord_min) < fill * (high - low):
+                return False
+        return True
+
+    def redraw(self, full=False):
+        """
+        Перерисовка холста. Без флага full и при наличии кэшированного фона
+        перерисовывается только линия
+        :param full: Флаг полной перерисовки
+            :type full: bool
+        """
+
+        if full or self._background is None:
+            with PROFILER.stage('draw'):
+                self.draw()
+            PROFILER.frame()
+            return
+
+        with PROFILER.stage('blit'):
+            self.restore_region(self._background)
+            self.axes.draw_artist(self.line)
+            self.blit(self.axes.bbox)
+        PROFILER.frame()
+
+    def print_figure(self, *args, full_resolution=True, **kwargs):
+        """
+        Сохранение фигуры в файл. Линия временно перестаёт быть animated,
+        иначе matplotlib исключит её из изображения
+        :param full_resolution: Сохранять полную кривую, а не упрощённую для экрана (LOD)
+            :type full_resolution: bool
+        """
+
+        if self.line is None:
+            return super().print_figure(*args, **kwargs)
+
+        display = self.line.get_data()
+        if full_resolution and self.full_values is not None and len(self.full_values) == 2:
+            self.line.set_data(*self.full_values)
+
+        self.line.set_animated(False)
+        try:
+            return super().print_figure(*args, **kwargs)
+        finally:
+            self.line.set_animated(True)
+            self.line.set_data(*display)
 
 
 class LissajousWindow(Qt.QMainWindow):
@@ -94,14 +438,30 @@ class LissajousWindow(Qt.QMainWindow):
         self.init_ui()
 
         self._fig = MplCanvas()
+        if self.settings["lod"]["enabled"]:
+            self._fig.lod_subpixel = self.settings["lod"]["subpixel"]
 
-        self.generator = LissajousGenerator()
+        self.generator = LissajousGenerator(resolution=self.settings["generation"]["resolution"])
+
+        self._thread_pool = QtCore.QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(1)
+        self._worker = None
+        self._request_id = 0
+        self._pending_key = None
+        self._shown = (None, None)
 
         layout = Qt.QVBoxLayout(self.groupBox)
         layout.addWidget(self._fig)
         # toolbar = NavigationToolbar(self._fig, self)
         # layout.addWidget(toolbar)
 
+        self._profiling_timer = QtCore.QTimer(self)
+        self._profiling_timer.setInterval(self.settings["profiling"]["overlay_ms"])
+        self._profiling_timer.timeout.connect(self.show_profiling)
+        Qt.QShortcut(QtGui.QKeySequence('Ctrl+Shift+P'), self, self.toggle_profiling)
+        Qt.QShortcut(QtGui.QKeySequence('Ctrl+Shift+E'), self, self.export_profiling_handler)
+        self.set_profiling(self.settings["profiling"]["enabled"])
+
         self.plot_lissajous_figure()
 
     def init_ui(self):
@@ -112,7 +472,7 @@ class LissajousWindow(Qt.QMainWindow):
         self.setStyleSheet("QLineEdit { border: 1px solid; border-color:#dcdcdc; border-radius: 4px;} "
                            "QLineEdit:focus{border:1px solid gray; }")
 
-        uic.loadUi(self.settings["paths"]["ui"], self)
+        self.load_ui()
         validation_form(self)
 
         self.freq_z_lineedit.setVisible(False)
@@ -137,6 +497,53 @@ class LissajousWindow(Qt.QMainWindow):
         self.load_json_button.clicked.connect(self.load_file_handler)
         self.lengthSlider.valueChanged.connect(self.length_change_handler)
 
+        self._animator = None
+        self.animation_button = Qt.QPushButton('Анимация')
+        self.animation_button.setCheckable(True)
+        self.formLayout.addRow(self.animation_button)
+        self.animation_button.toggled.connect(self.animation_button_handler)
+
+        self.video_button = Qt.QPushButton('Сохранить анимацию')
+        self.formLayout.addRow(self.video_button)
+        self.video_button.clicked.connect(self.save_video_button_handler)
+
+        self._comparison = None
+        self.comparison_button = Qt.QPushButton('Сравнение фигур')
+        self.formLayout.addRow(self.comparison_button)
+        self.comparison_button.clicked.connect(self.comparison_button_handler)
+
+        self._preset_browser = None
+        self.library_button = Qt.QPushButton('Библиотека пресетов')
+        self.formLayout.addRow(self.library_button)
+        self.library_button.clicked.connect(self.library_button_handler)
+
+        self._debounce_timer = QtCore.QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(self.settings["generation"]["debounce_ms"])
+        self._debounce_timer.timeout.connect(self.parameters_changed_handler)
+
+        for line_edit in (self.freq_x_lineedit, self.freq_y_lineedit, self.freq_z_lineedit, self.phase_lineedit):
+            line_edit.textEdited.connect(self._debounce_timer.start)
+        self.lengthSlider.valueChanged.connect(self._debounce_timer.start)
+
+    def load_ui(self):
+        """
+        Построение формы из модуля ui_main_window, скомпилированного pyuic5 при сборке (exe_gen.sh).
+        Если модуля нет, main_window.ui разбирается во время выполнения через uic.loadUi
+        """
+
+        try:
+            from ui_main_window import Ui_MainWindow
+        except ImportError:
+            from PyQt5 import uic
+            uic.loadUi(self.settings["paths"]["ui"], self)
+            return
+
+        ui = Ui_MainWindow()
+        ui.setupUi(self)
+        for name, widget in vars(ui).items():
+            setattr(self, name, widget)
+
     # def clearLayout(self, layout):
     #     while layout.count():
     #         child = layout.takeAt(0)
@@ -160,12 +567,17 @@ class LissajousWindow(Qt.QMainWindow):
             self.freq_z_lineedit.setVisible(True)
             self.label_5.setVisible(True)
 
-            MplCanvas(self._fig, mode='3d')
+            fast = self.generator.get_resolution() >= self.settings["render"]["fast_3d_threshold"]
+            MplCanvas(self._fig, mode=['3d', 'fast3d'][fast], aspect=self.settings["render"]["aspect_3d"])
         else:
             self.freq_z_lineedit.setVisible(False)
             self.label_5.setVisible(False)
             MplCanvas(self._fig)
 
+        if self._animator is not None and self._animator.is_running():
+            self.start_animation(self.get_settings())
+            return
+
         self.plot_lissajous_figure()
 
     def plot_button_click_handler(self):
@@ -189,6 +601,109 @@ class LissajousWindow(Qt.QMainWindow):
 
         self.plot_lissajous_figure(settings)
 
+    def parameters_changed_handler(self):
+        """
+        Функция обработки изменения параметров в полях ввода и слайдере (после задержки debounce).
+        Перестраивает фигуру по последнему набору параметров, если он корректен
+        """
+
+        try:
+            settings = self.get_settings()
+        except ValueError:
+            return
+
+        if self._animator is not None and self._animator.is_running():
+            self.start_animation(settings)
+            return
+
+        self.plot_lissajous_figure(settings)
+
+    def animation_button_handler(self, checked):
+        """
+        Функция обработки кнопки «Анимация»: запуск/остановка изменения фазы (или частоты) фигуры
+        """
+
+        if not checked:
+            if self._animator is not None:
+                self._animator.stop()
+            self.statusBar().clearMessage()
+            self.plot_lissajous_figure()
+            return
+
+        try:
+            settings = self.get_settings()
+        except ValueError:
+            self.animation_button.setChecked(False)
+            return
+
+        self.start_animation(settings)
+
+    def start_animation(self, settings):
+        """
+        Запуск анимации с параметрами settings (settings_mpl["animation"])
+        :param settings: словарь с параметрами фигуры
+            :type settings: dict
+        """
+
+        if self._animator is None:
+            from animation import SweepAnimator
+
+            animation = self.settings["animation"]
+            self._animator = SweepAnimator(self, fps=animation["fps"], sweep=animation["sweep"],
+                                           step=animation["step"], buffer_size=animation["buffer"],
+                                           batch_size=animation["batch"],
+                                           min_resolution=animation["min_resolution"])
+            self._animator.stats_changed.connect(self.animation_stats_handler)
+
+        if self._worker is not None:
+            self._worker.cancel()
+            self._request_id += 1
+            self._worker = None
+
+        self._animator.start(settings, mode=['2d', '3d'][self.checkBox_3D.isChecked()],
+                             resolution=self.generator.get_resolution())
+
+    def animation_stats_handler(self, stats):
+        """
+        Вывод состояния анимации в строку состояния
+        """
+
+        if not PROFILER.enabled:
+            self.statusBar().showMessage(f'FPS {stats["fps"]:.1f} | пропущено кадров {stats["dropped"]} | '
+                                         f'точек {stats["resolution"]}')
+
+    def save_video_button_handler(self):
+        """
+        Функция обработки нажатия кнопки «Сохранить анимацию».
+        Анимация текущей фигуры (settings_mpl["animation"]) сохраняется в фоне в MP4 или GIF
+        """
+
+        path, _ = Qt.QFileDialog.getSaveFileName(None, 'Сохранение анимации', self.settings["dirs"]["images"][2],
+                                                 'GIF(*.gif);;MP4(*.mp4)')
+        if not path:
+            return
+
+        from workers import VideoExportWorker
+
+        animation = self.settings["animation"]
+        settings = dict(self.get_settings(), mode=['2d', '3d'][self.checkBox_3D.isChecked()])
+        worker = VideoExportWorker(0, path, settings, self.get_settings(params=False),
+                                   frames=animation["export_frames"], fps=animation["fps"],
+                                   sweep=animation["sweep"], step=animation["step"],
+                                   resolution=self.generator.get_resolution())
+        worker.signals.finished.connect(self.video_saved_handler)
+        worker.signals.failed.connect(lambda request_id, message: self.statusBar().showMessage(
+            f'Ошибка сохранения анимации: {message}', 5000))
+        self.video_button.setEnabled(False)
+        worker.signals.finished.connect(lambda *args: self.video_button.setEnabled(True))
+        worker.signals.failed.connect(lambda *args: self.video_button.setEnabled(True))
+        self.statusBar().showMessage('Сохранение анимации...')
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def video_saved_handler(self, request_id, summary):
+        self.statusBar().showMessage(f'Анимация сохранена: {summary["frames"]} кадров, '
+                                     f'{summary["fps"]:.1f} кадров/с', 5000)
+
     def length_change_handler(self):
         """
         Функция обработки изменения длины фигуры
@@ -202,22 +717,23 @@ class LissajousWindow(Qt.QMainWindow):
         """
 
         if self.radio_grid.isChecked():
-            self._fig.axes.grid(b=True, linestyle=':', linewidth=1)
+            self._fig.axes.grid(True, linestyle=':', linewidth=1)
         else:
-            self._fig.axes.grid(b=False)
+            self._fig.axes.grid(False)
 
         self.check_axes()
 
+    @PROFILER.timed('check_axes')
     def check_axes(self):
         """
         Проверка флага включения сетки на графике и установка осей
         """
 
-        if self.radio_grid.isChecked():
+        if self.radio_grid.isChecked() and self._fig.projector is None:
             self._fig.axes.axis("on")
             self._fig.axes.set_xlabel('X', fontsize=10, color='black')
             self._fig.axes.set_ylabel('Y', fontsize=10, color='black')
-            if isinstance(self._fig.axes, Axes3D):
+            if self._fig.axes.name == '3d':
                 self._fig.axes.set_zlabel('Z', fontsize=10, color='black')
         else:
             self._fig.axes.axis("off")
@@ -244,6 +760,7 @@ class LissajousWindow(Qt.QMainWindow):
                             self.settings["color_map"].get(self.color_combobox.currentText(), 'Синий')][dict_val],
                   "linewidth": int(self.width_combobox.currentText())}
 
+    @PROFILER.timed('update')
     def plot_lissajous_figure(self, settings=None):
         """
         Функция отрисовки фигуры
@@ -254,22 +771,141 @@ class LissajousWindow(Qt.QMainWindow):
         if not isinstance(settings, dict):
             settings = self.get_settings()
 
-        self._fig.axes.lines.clear()
+        if self.generator.get_resolution() >= self.settings["generation"]["async_threshold"]:
+            self.request_figure(settings, mode=['2d', '3d'][self.checkBox_3D.isChecked()])
+            return
 
         if self.checkBox_3D.isChecked():
             self.generator.generate_figure(**settings, mode='3d')
         else:
             self.generator.generate_figure(**settings)
 
-        values = self.generator.get_values()
-        self._fig.axes.plot(*values,
-                            **self.get_settings(params=False))
+        self.draw_values(self.generator.get_values())
+
+    def request_figure(self, settings, mode='2d'):
+        """
+        Запуск генерации фигуры в фоновом потоке. Предыдущий запрос отменяется,
+        его результат будет отброшен
+        :param settings: словарь с параметрами фигуры
+            :type settings: dict
+        :param mode: Режим - 2D/3D
+            :type mode: str
+        """
+
+        key = (tuple(sorted(settings.items())), mode, self.generator.get_resolution())
+        if self._shown[0] == key:
+            self.draw_values(self._shown[1])
+            return
+
+        if self._worker is not None:
+            self._worker.cancel()
+
+        from workers import FigureWorker
+
+        self._request_id += 1
+        self._worker = FigureWorker(self._request_id, self.generator.get_resolution(), settings, mode)
+        self._pending_key = key
+        self._worker.signals.finished.connect(self.figure_ready_handler)
+        self._worker.signals.failed.connect(self.figure_failed_handler)
+        self._thread_pool.start(self._worker)
+
+    def figure_ready_handler(self, request_id, values):
+        """
+        Функция обработки завершения фоновой генерации. Устаревшие результаты отбрасываются
+        :param request_id: Номер запроса
+            :type request_id: int
+        :param values: Массивы координат
+            :type values: list
+        """
+
+        if request_id != self._request_id:
+            return
+
+        self._shown = (self._pending_key, values)
+        self._worker = None
+        self.draw_values(values)
+
+    def figure_failed_handler(self, request_id, message):
+        """
+        Функция обработки ошибки фоновой генерации
+        """
+
+        if request_id == self._request_id:
+            self._worker = None
+            self.statusBar().showMessage(f'Ошибка генерации: {message}', 5000)
 
-        self.plot_radio_grid_func()
+    def draw_values(self, values):
+        """
+        Отрисовка массивов координат на холсте
+        :param values: Массивы координат [x, y] или [x, y, z]
+            :type values: list
+        """
+
+        PROFILER.count('points', len(values[0]))
+
+        render_settings = self.settings["render"]
+        if len(values) == 2 and len(values[0]) >= render_settings["raster_threshold"]:
+            with PROFILER.stage('raster'):
+                full = self._fig.update_image(values, self.get_settings(params=False), render_settings["antialias"])
+        else:
+            with PROFILER.stage('plot'):
+                full = self._fig.update_line(values, self.get_settings(params=False))
+
+        if self._fig.grid_state != self.radio_grid.isChecked():
+            self.plot_radio_grid_func()
+            self._fig.grid_state = self.radio_grid.isChecked()
+            self._fig.layout_dirty = True
+
+        if self._fig.layout_dirty:
+            with PROFILER.stage('tight_layout'):
+                self._fig.axes.figure.tight_layout()
+            self._fig.layout_dirty = False
+            full = True
+
+        self._fig.redraw(full)
+
+    def set_profiling(self, enabled):
+        """
+        Включение/выключение замеров этапов и их вывода в строку состояния
+        :param enabled: Флаг включения
+            :type enabled: bool
+        """
+
+        PROFILER.enabled = enabled
+        if enabled:
+            PROFILER.reset()
+            self._profiling_timer.start()
+        else:
+            self._profiling_timer.stop()
+            self.statusBar().clearMessage()
+
+    def toggle_profiling(self):
+        """
+        Обработчик Ctrl+Shift+P
+        """
+
+        self.set_profiling(not PROFILER.enabled)
+
+    def show_profiling(self):
+        """
+        Вывод замеров в строку состояния: last/avg/p95 (мс) по этапам, количество точек и FPS
+        """
+
+        self.statusBar().showMessage(PROFILER.summary(self.settings["profiling"]["stages"]))
 
-        self._fig.axes.figure.tight_layout()
+    def export_profiling_handler(self):
+        """
+        Обработчик Ctrl+Shift+E: сохранение замеров в JSON или в формате Chrome trace
+        """
 
-        self._fig.draw()
+        path, selected = Qt.QFileDialog.getSaveFileName(None, 'Сохранение замеров', self.settings["paths"]["files"],
+                                                        'Chrome trace(*.trace.json);;JSON(*.json)')
+        if not path:
+            return
+        # формат определяется расширением (Instrumentation.export)
+        if selected.startswith('Chrome') and not path.endswith(('.trace.json', '.trace')):
+            path = os.path.splitext(path)[0] + '.trace.json'
+        PROFILER.export(path)
 
     def files_handler(self, mode='save', img=True):
         """
@@ -319,6 +955,47 @@ class LissajousWindow(Qt.QMainWindow):
 
         self.update_plt()
 
+    def comparison_button_handler(self):
+        """
+        Функция обработки нажатия кнопки «Сравнение фигур»: окно с сеткой соотношений частот.
+        Двойной щелчок по фигуре сетки переносит её параметры в основное окно
+        """
+
+        if self._comparison is None:
+            from comparison_window import ComparisonWindow
+
+            comparison = self.settings["comparison"]
+            self._comparison = ComparisonWindow(self.get_settings(), dict(self.get_settings(params=False), linewidth=1),
+                                                rows=comparison["rows"], cols=comparison["cols"],
+                                                resolution=comparison["resolution"])
+            self._comparison.cell_selected.connect(
+                lambda params: self.write_line_edit(dict(params, color=self.color_combobox.currentText(),
+                                                         linewidth=self.width_combobox.currentText())))
+
+        self._comparison.show()
+        self._comparison.raise_()
+
+    def library_button_handler(self):
+        """
+        Функция обработки нажатия кнопки «Библиотека пресетов».
+        При первом открытии создаётся панель и в библиотеку импортируется каталог пресетов
+        (settings_mpl["paths"]["files"])
+        """
+
+        if self._preset_browser is None:
+            from preset_browser import PresetBrowser
+            from preset_store import PresetStore
+
+            store = PresetStore(self.settings["paths"]["library"])
+            self._preset_browser = PresetBrowser(store, self)
+            self._preset_browser.preset_selected.connect(self.write_line_edit)
+            self._preset_browser.status_message.connect(self.statusBar().showMessage)
+            self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self._preset_browser)
+            self._preset_browser.import_directory(self.settings["paths"]["files"])
+            return
+
+        self._preset_browser.setVisible(not self._preset_browser.isVisible())
+
     def proportion_ratio_click_handler(self):
         """
         Функция обработки нажатия кнопки «Выровнять»
@@ -335,8 +1012,22 @@ class LissajousWindow(Qt.QMainWindow):
         """
 
         path = self.files_handler()
-        if path:
-            self._fig.print_figure(path)
+        if not path:
+            return
+
+        from vector_export import VECTOR_FORMATS, export_vector
+
+        vector = self.settings["vector"]
+        if vector["simplify"] and os.path.splitext(path)[1].lower() in VECTOR_FORMATS:
+            report = export_vector(self._fig, path, tolerance=vector["tolerance_pt"], compact=vector["compact_svg"],
+                                   compare=vector["compare"])
+            message = f'Точек: {report["points"]} -> {report["saved_points"]}, размер: {report["bytes"] // 1024} КБ'
+            if "raw_bytes" in report:
+                message += f' (без упрощения {report["raw_bytes"] // 1024} КБ)'
+            self.statusBar().showMessage(message, 10000)
+            return
+
+        self._fig.print_figure(path, full_resolution=self.settings["lod"]["export_full"])
 
     def load_file_handler(self):
         """
@@ -386,11 +1077,65 @@ class LissajousWindow(Qt.QMainWindow):
 #         self.dialog.show()
 
 
+class StartupProfiler(QtCore.QObject):
+    """
+    Замер времени запуска (--profile-startup): импорты, создание окна и первая отрисовка фигуры.
+    После первого события Paint холста выводит отчёт и завершает приложение
+    """
+
+    def __init__(self, app, window):
+        super().__init__(window)
+        self.app = app
+        STARTUP_TIMES["window"] = time.perf_counter()
+        window._fig.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Paint and "painted" not in STARTUP_TIMES:
+            STARTUP_TIMES["painted"] = time.perf_counter()
+            QtCore.QTimer.singleShot(0, self.report)
+        return False
+
+    @staticmethod
+    def process_start():
+        """
+        Момент запуска процесса в шкале time.perf_counter: учитывает загрузку интерпретатора,
+        чтение с диска и распаковку собранного exe. Нужен psutil
+        :return: float или None, если psutil не установлен
+        """
+
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return time.perf_counter() - (time.time() - psutil.Process().create_time())
+
+    def report(self):
+        start = self.process_start()
+        stages = ("imports", "window", "painted")
+        if start is None:
+            print('psutil не установлен: момент запуска процесса неизвестен, отсчёт - от окончания импортов',
+                  flush=True)
+            start, stages = STARTUP_TIMES["imports"], stages[1:]
+        for stage in stages:
+            print(f'{stage:<10} {(STARTUP_TIMES[stage] - start) * 1000:8.1f} ms', flush=True)
+        self.app.quit()
+
+
 if __name__ == "__main__":
+    if getattr(sys, 'frozen', False):
+        # процессы экспорта анимации (spawn) в собранном PyInstaller exe
+        import multiprocessing
+        multiprocessing.freeze_support()
     app = Qt.QApplication(sys.argv)
 
     main_window = LissajousWindow()
 
+    if '--profile-startup' in sys.argv:
+        profiler = StartupProfiler(app, main_window)
+
+    if '--profile' in sys.argv:
+        main_window.set_profiling(True)
+
     main_window.show()
 
     app.exec_()
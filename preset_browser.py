@@ -0,0 +1,225 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import os
+import time
+
+import PyQt5.QtWidgets as Qt
+from PyQt5 import QtCore, QtGui
+
+from workers import ThumbnailWorker
+
+
+class PresetListModel(QtCore.QAbstractListModel):
+    """
+    Модель списка пресетов с постраничной подгрузкой из PresetStore (canFetchMore/fetchMore).
+    Миниатюры запрашиваются только для отображаемых строк: сохранённые читаются из базы,
+    недостающие отрисовываются в пуле потоков (ThumbnailWorker), до готовности строка показывается без значка
+    """
+
+    def __init__(self, store, page_size=50, thumbnail_size=96, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self.thumbnail_size = thumbnail_size
+        self.filters = {}
+        self._records = []
+        self._total = 0
+        self._icons = {}
+        self._pending = set()
+        # matplotlib не потокобезопасен: миниатюры отрисовываются по одной
+        self.thread_pool = QtCore.QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+
+    def set_filters(self, **filters):
+        """
+        Новая выборка (ratio, is_3d, color - см. PresetStore.query)
+        """
+
+        self.beginResetModel()
+        self.filters = filters
+        self._records = []
+        self._total = self.store.count(**filters)
+        self.endResetModel()
+
+    def record(self, row):
+        return self._records[row]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._records)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and len(self._records) < self._total
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        records = self.store.query(limit=self.page_size, offset=len(self._records), **self.filters)
+        if not records:
+            self._total = len(self._records)
+            return
+
+        self.beginInsertRows(QtCore.QModelIndex(), len(self._records), len(self._records) + len(records) - 1)
+        self._records.extend(records)
+        self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        record = self._records[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return record["name"]
+        if role == QtCore.Qt.ToolTipRole:
+            return (f'{record["freq_x"]:g}:{record["freq_y"]:g}, фаза {record["phase"]}, '
+                    f'длина {record["length"]}{", 3D" if record["is_3d"] else ""}')
+        if role == QtCore.Qt.DecorationRole:
+            return self._icon(record)
+        return None
+
+    def _icon(self, record):
+        param_hash = record["param_hash"]
+        icon = self._icons.get(param_hash)
+        if icon is not None or param_hash in self._pending:
+            return icon
+
+        png = self.store.cached_thumbnail(record, size=self.thumbnail_size)
+        if png is not None:
+            return self._add_icon(param_hash, png)
+
+        self._pending.add(param_hash)
+        worker = ThumbnailWorker(record, self.thumbnail_size)
+        worker.signals.finished.connect(self.thumbnail_ready_handler)
+        worker.signals.failed.connect(self.thumbnail_failed_handler)
+        self.thread_pool.start(worker)
+        return None
+
+    def _add_icon(self, param_hash, png):
+        pixmap = QtGui.QPixmap()
+        pixmap.loadFromData(png, 'PNG')
+        icon = self._icons[param_hash] = QtGui.QIcon(pixmap)
+        return icon
+
+    def thumbnail_ready_handler(self, param_hash, png):
+        """
+        Миниатюра отрисована: сохранение в базе и обновление строк с этим пресетом
+        """
+
+        self._pending.discard(param_hash)
+        self.store.save_thumbnail(param_hash, self.thumbnail_size, png)
+        self._add_icon(param_hash, png)
+        for row, record in enumerate(self._records):
+            if record["param_hash"] == param_hash:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [QtCore.Qt.DecorationRole])
+
+    def thumbnail_failed_handler(self, param_hash, message):
+        self._pending.discard(param_hash)
+        self._icons[param_hash] = QtGui.QIcon()
+
+    def stop_thumbnails(self, timeout=30.):
+        """
+        Отмена ожидающих миниатюр и ожидание отрисовываемой.
+        QThreadPool.waitForDone (и деструктор пула) не отпускает GIL, который нужен задаче,
+        поэтому ожидание - циклом обработки событий
+        :param timeout: Максимальное время ожидания в секундах
+            :type timeout: float
+        """
+
+        self.thread_pool.clear()
+        finish = time.perf_counter() + timeout
+        while self.thread_pool.activeThreadCount() and time.perf_counter() < finish:
+            QtCore.QCoreApplication.processEvents()
+            time.sleep(0.01)
+
+
+class PresetBrowser(Qt.QDockWidget):
+    """
+    Панель библиотеки пресетов: фильтр по соотношению частот и 3D, список с миниатюрами.
+    Двойной щелчок по пресету испускает preset_selected
+    """
+
+    preset_selected = QtCore.pyqtSignal(dict)
+    # сообщение для строки состояния окна: текст и время показа, мс
+    status_message = QtCore.pyqtSignal(str, int)
+
+    def __init__(self, store, parent=None):
+        super().__init__('Библиотека пресетов', parent)
+        self.store = store
+        self.model = PresetListModel(store, parent=self)
+
+        self.ratio_lineedit = Qt.QLineEdit()
+        self.ratio_lineedit.setPlaceholderText('Соотношение, например 3:2')
+        self.dimension_combobox = Qt.QComboBox()
+        self.dimension_combobox.addItems(['2D и 3D', '2D', '3D'])
+        self.import_button = Qt.QPushButton('Импорт каталога')
+
+        self.view = Qt.QListView()
+        self.view.setViewMode(Qt.QListView.IconMode)
+        self.view.setResizeMode(Qt.QListView.Adjust)
+        self.view.setUniformItemSizes(True)
+        self.view.setIconSize(QtCore.QSize(self.model.thumbnail_size, self.model.thumbnail_size))
+        self.view.setModel(self.model)
+
+        filters = Qt.QHBoxLayout()
+        filters.addWidget(self.ratio_lineedit)
+        filters.addWidget(self.dimension_combobox)
+        layout = Qt.QVBoxLayout()
+        layout.addLayout(filters)
+        layout.addWidget(self.view)
+        layout.addWidget(self.import_button)
+        widget = Qt.QWidget()
+        widget.setLayout(layout)
+        self.setWidget(widget)
+
+        self.ratio_lineedit.editingFinished.connect(self.apply_filters)
+        self.dimension_combobox.currentIndexChanged.connect(self.apply_filters)
+        self.view.doubleClicked.connect(self.item_activated_handler)
+        self.import_button.clicked.connect(self.import_button_handler)
+        Qt.QApplication.instance().aboutToQuit.connect(self.model.stop_thumbnails)
+
+        self.apply_filters()
+
+    def filters(self):
+        """
+        Фильтры выборки из полей панели
+        :return: dict для PresetStore.query
+        """
+
+        filters = {}
+        text = self.ratio_lineedit.text().strip()
+        if text:
+            try:
+                freq_x, freq_y = (float(value) for value in text.replace('/', ':').split(':'))
+                filters["ratio"] = (freq_x, freq_y)
+            except ValueError:
+                pass
+
+        dimension = self.dimension_combobox.currentIndex()
+        if dimension:
+            filters["is_3d"] = dimension == 2
+        return filters
+
+    def apply_filters(self):
+        self.model.set_filters(**self.filters())
+
+    def item_activated_handler(self, index):
+        self.preset_selected.emit(self.store.to_preset(self.model.record(index.row())))
+
+    def import_button_handler(self):
+        directory = Qt.QFileDialog.getExistingDirectory(self, 'Импорт пресетов', '')
+        if directory:
+            self.import_directory(directory)
+
+    def import_directory(self, directory):
+        """
+        Импорт каталога пресетов в библиотеку и обновление списка.
+        Файлы, которые не удалось прочитать, перечисляются в status_message
+        :return: количество импортированных пресетов
+        """
+
+        imported, errors = self.store.import_directory(directory)
+        self.apply_filters()
+        if errors:
+            names = ', '.join(os.path.basename(path) for path in sorted(errors))
+            self.status_message.emit(f'Импортировано пресетов: {imported}, не удалось прочитать {len(errors)}: '
+                                     f'{names}', 10000)
+            self.import_button.setToolTip('\n'.join(f'{path}: {message}' for path, message in sorted(errors.items())))
+        return imported
@@ -0,0 +1,233 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import glob
+import io
+import os
+import sqlite3
+
+from fractions import Fraction
+
+from presets import load_preset, normalize_preset, preset_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    name TEXT NOT NULL,
+    freq_x REAL NOT NULL,
+    freq_y REAL NOT NULL,
+    freq_z REAL NOT NULL,
+    phase TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    color TEXT NOT NULL,
+    linewidth INTEGER NOT NULL,
+    is_3d INTEGER NOT NULL,
+    ratio_num INTEGER NOT NULL,
+    ratio_den INTEGER NOT NULL,
+    param_hash TEXT NOT NULL,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS presets_ratio ON presets (ratio_num, ratio_den, is_3d);
+CREATE INDEX IF NOT EXISTS presets_freq ON presets (freq_x, freq_y);
+CREATE INDEX IF NOT EXISTS presets_hash ON presets (param_hash);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    param_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    png BLOB NOT NULL,
+    PRIMARY KEY (param_hash, size)
+);
+"""
+
+COLUMNS = ("id", "path", "name", "freq_x", "freq_y", "freq_z", "phase", "length", "color", "linewidth",
+           "is_3d", "ratio_num", "ratio_den", "param_hash")
+
+
+def frequency_ratio(freq_x, freq_y, max_denominator=1000):
+    """
+    Несократимое соотношение частот freq_x:freq_y
+    :return: (числитель, знаменатель); для нулевой freq_y - (1, 0)
+    """
+
+    if not freq_y:
+        return 1, 0
+    ratio = Fraction(freq_x / freq_y).limit_denominator(max_denominator)
+    return ratio.numerator, ratio.denominator
+
+
+class PresetStore:
+    """
+    Библиотека пресетов с индексом SQLite (частоты, фаза, длина, цвет, признак 3D, соотношение частот)
+    и кэшем миниатюр по хэшу параметров
+    """
+
+    def __init__(self, path=':memory:'):
+        """
+        :param path: Путь к файлу базы данных
+            :type path: str
+        """
+
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def _row(self, preset, path=None, name=None, mtime=None):
+        ratio_num, ratio_den = frequency_ratio(preset["freq_x"], preset["freq_y"])
+        name = name or (os.path.splitext(os.path.basename(path))[0] if path else preset_hash(preset)[:8])
+        return (path, name, preset["freq_x"], preset["freq_y"], preset["freq_z"], preset["phase"],
+                preset["length"], preset["color"], preset["linewidth"], int(preset["3D"]),
+                ratio_num, ratio_den, preset_hash(preset), mtime)
+
+    def add(self, preset, path=None, name=None):
+        """
+        Добавление (или обновление по пути файла) пресета
+        :param preset: Словарь пресета
+            :type preset: dict
+        :param path: Путь к файлу пресета
+            :type path: str
+        :param name: Отображаемое имя. По умолчанию - имя файла
+            :type name: str
+        :return: id записи
+        """
+
+        with self._db:
+            cursor = self._db.execute(
+                'INSERT OR REPLACE INTO presets (path, name, freq_x, freq_y, freq_z, phase, length, color, '
+                'linewidth, is_3d, ratio_num, ratio_den, param_hash, mtime) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._row(normalize_preset(preset), path, name))
+        return cursor.lastrowid
+
+    def import_directory(self, directory):
+        """
+        Массовый импорт файлов *.json каталога одной транзакцией.
+        Файлы, не изменившиеся с прошлого импорта, пропускаются; записи удалённых файлов каталога
+        и миниатюры, на которые больше не ссылается ни один пресет, удаляются
+        :param directory: Каталог пресетов
+            :type directory: str
+        :return: (количество импортированных, dict {путь: ошибка})
+        """
+
+        known = dict(self._db.execute('SELECT path, mtime FROM presets WHERE path IS NOT NULL'))
+        paths = [os.path.abspath(path) for path in sorted(glob.glob(os.path.join(directory, '*.json')))]
+        # записи файлов каталога, удалённых с прошлого импорта
+        directory = os.path.abspath(directory)
+        removed = set(path for path in known if os.path.dirname(path) == directory) - set(paths)
+
+        rows, errors = [], {}
+        for path in paths:
+            try:
+                mtime = os.path.getmtime(path)
+                if known.get(path) == mtime:
+                    continue
+                rows.append(self._row(load_preset(path), path, mtime=mtime))
+            except (OSError, ValueError, TypeError) as exc:
+                errors[path] = str(exc)
+
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO presets (path, name, freq_x, freq_y, freq_z, phase, length, color, '
+                'linewidth, is_3d, ratio_num, ratio_den, param_hash, mtime) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            if removed:
+                self._db.executemany('DELETE FROM presets WHERE path = ?', [(path,) for path in removed])
+                self._db.execute('DELETE FROM thumbnails WHERE param_hash NOT IN (SELECT param_hash FROM presets)')
+        return len(rows), errors
+
+    @staticmethod
+    def _where(ratio=None, is_3d=None, color=None):
+        clauses, args = [], []
+        if ratio is not None:
+            clauses.append('ratio_num = ? AND ratio_den = ?')
+            args += list(frequency_ratio(*ratio))
+        if is_3d is not None:
+            clauses.append('is_3d = ?')
+            args.append(int(is_3d))
+        if color is not None:
+            clauses.append('color = ?')
+            args.append(color)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def query(self, ratio=None, is_3d=None, color=None, limit=-1, offset=0):
+        """
+        Поиск пресетов по индексируемым полям
+        :param ratio: Соотношение частот freq_x:freq_y, например (3, 2)
+            :type ratio: tuple
+        :param is_3d: Признак 3D (None - любые)
+            :type is_3d: bool
+        :param color: Название цвета
+            :type color: str
+        :param limit: Максимальное количество записей (-1 - без ограничения)
+            :type limit: int
+        :param offset: Смещение от начала выборки
+            :type offset: int
+        :return: list из dict (поля COLUMNS)
+        """
+
+        where, args = self._where(ratio, is_3d, color)
+        cursor = self._db.execute(f'SELECT {", ".join(COLUMNS)} FROM presets{where} ORDER BY name, id '
+                                  f'LIMIT ? OFFSET ?', args + [limit, offset])
+        return [dict(zip(COLUMNS, row)) for row in cursor]
+
+    def count(self, ratio=None, is_3d=None, color=None):
+        where, args = self._where(ratio, is_3d, color)
+        return self._db.execute(f'SELECT COUNT(*) FROM presets{where}', args).fetchone()[0]
+
+    @staticmethod
+    def to_preset(record):
+        """
+        Преобразование записи query в словарь пресета (формат save_json_button_handler)
+        """
+
+        return {"freq_x": record["freq_x"], "freq_y": record["freq_y"], "freq_z": record["freq_z"],
+                "phase": record["phase"], "length": record["length"], "color": record["color"],
+                "linewidth": record["linewidth"], "3D": bool(record["is_3d"])}
+
+    def cached_thumbnail(self, record, size=96):
+        """
+        Сохранённая миниатюра пресета или None, если она ещё не отрисована
+        :return: bytes
+        """
+
+        row = self._db.execute('SELECT png FROM thumbnails WHERE param_hash = ? AND size = ?',
+                               (record["param_hash"], size)).fetchone()
+        return row[0] if row else None
+
+    def save_thumbnail(self, param_hash, size, png):
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO thumbnails (param_hash, size, png) VALUES (?, ?, ?)',
+                             (param_hash, size, png))
+
+    @classmethod
+    def render_thumbnail(cls, record, size=96, resolution=500):
+        """
+        Отрисовка миниатюры пресета в PNG без обращения к базе (можно вызывать из фонового потока)
+        :return: bytes
+        """
+
+        from render_presets import render_figure
+
+        buffer = io.BytesIO()
+        render_figure(normalize_preset(cls.to_preset(record)), buffer, resolution=resolution,
+                      size=(size / 48, size / 48), dpi=48)
+        return buffer.getvalue()
+
+    def thumbnail(self, record, size=96, resolution=500):
+        """
+        Миниатюра пресета в PNG. Отрисовывается один раз и сохраняется в базе по хэшу параметров
+        :param record: Запись query
+            :type record: dict
+        :param size: Размер стороны в пикселях
+            :type size: int
+        :param resolution: Количество точек кривой
+            :type resolution: int
+        :return: bytes
+        """
+
+        png = self.cached_thumbnail(record, size)
+        if png is None:
+            png = self.render_thumbnail(record, size, resolution)
+            self.save_thumbnail(record["param_hash"], size, png)
+        return png
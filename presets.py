@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+
+from matplotlib import colors
+
+from settings import SETTINGS_MPL
+
+# значения по умолчанию совпадают с LissajousWindow.write_line_edit
+DEFAULTS = {"freq_x": 3., "freq_y": 2., "freq_z": 0., "phase": "2", "length": 10,
+            "color": "Синий", "linewidth": 2, "3D": False}
+
+
+def load_preset(path):
+    """
+    Чтение пресета, сохранённого «Сохранить настройки» (LissajousWindow.save_json_button_handler)
+    :param path: Путь к файлу JSON
+        :type path: str
+    :return: dict с ключами DEFAULTS
+    """
+
+    with open(path, 'r', encoding='utf-8') as open_file:
+        return normalize_preset(json.load(open_file))
+
+
+def normalize_preset(data):
+    """
+    Дополнение пресета значениями по умолчанию и приведение типов
+    :param data: Словарь пресета
+        :type data: dict
+    :return: dict с ключами DEFAULTS
+    """
+
+    preset = dict(DEFAULTS, **{key: value for key, value in data.items() if key in DEFAULTS})
+    for key in ("freq_x", "freq_y", "freq_z"):
+        preset[key] = float(preset[key])
+    preset["phase"] = str(preset["phase"])
+    preset["length"] = int(preset["length"])
+    preset["linewidth"] = int(preset["linewidth"])
+    preset["3D"] = bool(preset["3D"])
+    return preset
+
+
+def figure_params(preset):
+    """
+    Аргументы LissajousGenerator.generate_figure для пресета
+    :param preset: Пресет (normalize_preset)
+        :type preset: dict
+    :return: dict
+    """
+
+    return {"freq_x": preset["freq_x"], "freq_y": preset["freq_y"], "freq_z": preset["freq_z"],
+            "phase": preset["phase"], "length": preset["length"], "mode": ['2d', '3d'][preset["3D"]]}
+
+
+def figure_style(preset, color_map=None):
+    """
+    Параметры отображения линии для пресета (как LissajousWindow.get_settings(params=False))
+    :param preset: Пресет (normalize_preset)
+        :type preset: dict
+    :param color_map: Соответствие названий цветов цветам matplotlib. По умолчанию - из settings.py
+        :type color_map: dict
+    :return: dict с ключами color, linewidth
+    """
+
+    color_map = SETTINGS_MPL["color_map"] if color_map is None else color_map
+    color = color_map.get(preset["color"], preset["color"])
+    if not colors.is_color_like(color):
+        color = color_map.get(DEFAULTS["color"], 'midnightblue')
+    return {"color": color, "linewidth": preset["linewidth"]}
+
+
+def preset_hash(preset):
+    """
+    Хэш параметров пресета, определяющих изображение
+    :param preset: Пресет (normalize_preset)
+        :type preset: dict
+    :return: str, sha1 в шестнадцатеричном виде
+    """
+
+    return hashlib.sha1(json.dumps(preset, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
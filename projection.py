@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+
+def view_matrix(elev, azim, aspect=(1.5, 1.2, 1.2, 1)):
+    """
+    Матрица ортогональной проекции 3D -> 2D (экранные оси вправо и вверх).
+    Углы имеют тот же смысл, что в Axes3D.view_init: elev=90, azim=-90 - вид сверху,
+    X направлен вправо, Y - вверх. Масштабирование осей diag(aspect) применяется до поворота,
+    как в MplCanvas для mplot3d
+    :param elev: Угол возвышения, градусы
+        :type elev: float
+    :param azim: Азимут, градусы
+        :type azim: float
+    :param aspect: Масштабирование (x, y, z, w); w для ортогональной проекции не используется
+        :type aspect: tuple
+    :return: numpy.ndarray формы (2, 3)
+    """
+
+    elev, azim = np.radians(elev), np.radians(azim)
+    right = [-np.sin(azim), np.cos(azim), 0.]
+    up = [-np.sin(elev) * np.cos(azim), -np.sin(elev) * np.sin(azim), np.cos(elev)]
+    return np.array([right, up]) * np.asarray(aspect[:3], dtype=float)
+
+
+class Projector:
+    """
+    Быстрая проекция 3D-кривой для отображения 2D-линией.
+    Координаты хранятся одним массивом (3, N); при изменении вида выполняется одно
+    матричное умножение (2, 3) @ (3, N) в заранее выделенный буфер.
+    Кривая вращается вокруг центра своего ограничивающего параллелепипеда; радиус ограничивающей
+    сферы не зависит от поворота, поэтому пределы осей при вращении не меняются
+    """
+
+    def __init__(self, elev=90., azim=-90., aspect=(1.5, 1.2, 1.2, 1)):
+        self.elev = elev
+        self.azim = azim
+        self.aspect = tuple(aspect)
+        self.zoom = 1.
+        self.points = None
+        self.center = np.zeros(3)
+        self.radius = 1.
+        self._out = None
+
+    def set_data(self, values):
+        """
+        Новая кривая
+        :param values: Массивы координат [x, y, z]
+            :type values: list
+        :return: Проекция - list [x, y]
+        """
+
+        points = np.asarray(values, dtype=float)
+        self.points = points
+        self.center = (points.min(axis=1) + points.max(axis=1)) / 2
+        scaled = (points - self.center[:, None]) * np.asarray(self.aspect[:3])[:, None]
+        self.radius = max(float(np.sqrt(np.max(np.einsum('ij,ij->j', scaled, scaled)))), 1e-12)
+        if self._out is None or self._out.shape[1] != points.shape[1]:
+            self._out = np.empty((2, points.shape[1]))
+        return self.project()
+
+    def project(self):
+        """
+        Проекция кривой для текущего вида
+        :return: list [x, y] - представления одного буфера, перезаписываются при следующей проекции
+        """
+
+        matrix = view_matrix(self.elev, self.azim, self.aspect)
+        np.matmul(matrix, self.points, out=self._out)
+        self._out -= (matrix @ self.center)[:, None]
+        return [self._out[0], self._out[1]]
+
+    def rotate(self, d_azim, d_elev):
+        """
+        Поворот вида (градусы). Возвышение ограничено [-90, 90]
+        """
+
+        self.azim = (self.azim + d_azim + 180.) % 360. - 180.
+        self.elev = float(np.clip(self.elev + d_elev, -90., 90.))
+
+    def limits(self, margin=0.05):
+        """
+        Симметричные пределы осей (x и y) с учётом масштаба zoom
+        """
+
+        half = self.radius * (1 + margin) / self.zoom
+        return (-half, half), (-half, half)
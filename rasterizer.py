@@ -0,0 +1,302 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from matplotlib import colors, image
+
+
+def data_extent(x, y, margin=0.05):
+    """
+    Границы области отображения по данным с полями (как у autoscale matplotlib)
+    :param x: массив координат x
+        :type x: numpy.ndarray
+    :param y: массив координат y
+        :type y: numpy.ndarray
+    :param margin: Доля поля от размаха данных
+        :type margin: float
+    :return: (x_min, x_max, y_min, y_max)
+    """
+
+    extent = []
+    for coord in (x, y):
+        low, high = float(np.min(coord)), float(np.max(coord))
+        pad = (high - low) * margin or 0.5
+        extent += [low - pad, high + pad]
+    return tuple(extent)
+
+
+def _densify(px, py):
+    """
+    Добавление промежуточных точек на отрезках длиннее одного пикселя,
+    чтобы линия была непрерывной при биннинге
+    """
+
+    step_x = np.abs(np.diff(px))
+    step_y = np.abs(np.diff(py))
+    np.maximum(step_x, step_y, out=step_x)
+    if step_x.size == 0 or step_x.max() <= 1:
+        return px, py
+
+    steps = np.maximum(np.ceil(step_x), 1).astype(np.int64)
+    starts = np.repeat(np.arange(steps.size), steps)
+    frac = np.arange(starts.size) - np.repeat(np.cumsum(steps) - steps, steps)
+    frac = frac / np.repeat(steps, steps)
+
+    dense_x = np.empty(starts.size + 1)
+    dense_y = np.empty(starts.size + 1)
+    dense_x[:-1] = px[starts] + (px[starts + 1] - px[starts]) * frac
+    dense_y[:-1] = py[starts] + (py[starts + 1] - py[starts]) * frac
+    dense_x[-1], dense_y[-1] = px[-1], py[-1]
+    return dense_x, dense_y
+
+
+def rasterize(x, y, width, height, extent=None, antialias=False, connect=True, chunk_size=2 ** 15):
+    """
+    Накопление точек кривой в буфер плотности размером height x width пикселей.
+    Строка 0 буфера соответствует нижней границе extent.
+    Точки обрабатываются порциями в заранее выделенных массивах, чтобы промежуточные данные
+    оставались в кэше процессора. Номера пикселей подряд идущих точек плотной кривой совпадают,
+    поэтому каждая серия одинаковых номеров сохраняется одной парой (пиксель, количество),
+    а буфер плотности заполняется редкими вызовами bincount по накопленным сериям
+    :param x: массив координат x
+        :type x: numpy.ndarray
+    :param y: массив координат y
+        :type y: numpy.ndarray
+    :param width: Ширина буфера в пикселях
+        :type width: int
+    :param height: Высота буфера в пикселях
+        :type height: int
+    :param extent: (x_min, x_max, y_min, y_max). По умолчанию - data_extent(x, y)
+        :type extent: tuple
+    :param antialias: Билинейное распределение веса точки между четырьмя соседними пикселями
+        :type antialias: bool
+    :param connect: Соединять соседние точки отрезками (иначе - только сами точки)
+        :type connect: bool
+    :param chunk_size: Количество точек в порции
+        :type chunk_size: int
+    :return: numpy.ndarray (height, width), float32
+    """
+
+    clip = extent is not None
+    x_min, x_max, y_min, y_max = extent or data_extent(x, y)
+    scale_x = (width - 1) / (x_max - x_min)
+    scale_y = (height - 1) / (y_max - y_min)
+    # центр пикселя - целая координата: для ближайшего пикселя к координате добавляется 0.5
+    shift = 0. if antialias else 0.5
+    # при сглаживании буфер дополнен рамкой в 1 пиксель для весов соседей за краем
+    stride, rows = (width + 2, height + 2) if antialias else (width, height)
+
+    accumulator = _Accumulator(stride * rows)
+    buffer_x, buffer_y = np.empty(chunk_size + 1), np.empty(chunk_size + 1)
+    index_x, index_y = np.empty(chunk_size + 1, dtype=np.intp), np.empty(chunk_size + 1, dtype=np.intp)
+    steps = np.empty(chunk_size)
+    for first in range(0, len(x), chunk_size):
+        # порции перекрываются на одну точку, чтобы не терять отрезок на стыке
+        last = min(first + chunk_size + connect, len(x))
+        count = last - first
+        px = np.multiply(x[first:last], scale_x, out=buffer_x[:count])
+        px += shift - x_min * scale_x
+        py = np.multiply(y[first:last], scale_y, out=buffer_y[:count])
+        py += shift - y_min * scale_y
+
+        if connect and count > 1 and _max_step(px, py, steps[:count - 1]) > 1:
+            px, py = _densify(px, py)
+            ix, iy = np.empty(len(px), dtype=np.intp), np.empty(len(px), dtype=np.intp)
+        else:
+            ix, iy = index_x[:count], index_y[:count]
+        if connect and first + chunk_size < len(x):
+            px, py, ix, iy = px[:-1], py[:-1], ix[:-1], iy[:-1]
+
+        if antialias:
+            _accumulate_bilinear(accumulator, px, py, ix, iy, width, height, clip)
+            continue
+
+        np.copyto(ix, px, casting='unsafe')
+        np.copyto(iy, py, casting='unsafe')
+        if clip:
+            inside = (px >= 0) & (ix < width) & (py >= 0) & (iy < height)
+            ix, iy = ix[inside], iy[inside]
+        iy *= width
+        iy += ix
+        accumulator.add_runs(iy)
+
+    density = accumulator.result().reshape(rows, stride)
+    if antialias:
+        density = density[1:-1, 1:-1]
+    return density.astype(np.float32)
+
+
+class _Accumulator:
+    """
+    Буфер плотности с отложенным суммированием: индексы пикселей и веса копятся в списках
+    и суммируются одним bincount, когда их набирается больше flush_size
+    """
+
+    def __init__(self, size, flush_size=2 ** 20):
+        self.density = np.zeros(size)
+        self.flush_size = flush_size
+        self._indices, self._weights = [], []
+        self._pending = 0
+
+    def add(self, indices, weights=None):
+        self._indices.append(indices)
+        self._weights.append(weights)
+        self._pending += len(indices)
+        if self._pending >= self.flush_size:
+            self.flush()
+
+    def add_runs(self, indices):
+        """
+        Индексы подряд идущих точек: серии одинаковых индексов сворачиваются в (индекс, длина)
+        """
+
+        starts = _run_starts(indices)
+        self.add(indices[starts], np.diff(starts, append=len(indices)).astype(float))
+
+    def flush(self):
+        if not self._indices:
+            return
+        weights = None
+        if any(weight is not None for weight in self._weights):
+            weights = np.concatenate([np.ones(len(index)) if weight is None else weight
+                                      for index, weight in zip(self._indices, self._weights)])
+        self.density += np.bincount(np.concatenate(self._indices), weights=weights, minlength=self.density.size)
+        self._indices, self._weights = [], []
+        self._pending = 0
+
+    def result(self):
+        self.flush()
+        return self.density
+
+
+def _max_step(px, py, out):
+    """
+    Наибольшая проекция отрезка между соседними точками, пиксели
+    """
+
+    np.subtract(px[1:], px[:-1], out=out)
+    step = max(-float(out.min()), float(out.max()))
+    np.subtract(py[1:], py[:-1], out=out)
+    return max(step, -float(out.min()), float(out.max()))
+
+
+def _run_starts(indices):
+    """
+    Начала серий одинаковых значений в массиве
+    """
+
+    starts = np.flatnonzero(indices[1:] != indices[:-1])
+    starts += 1
+    return np.concatenate(([0], starts)) if len(indices) else starts
+
+
+def _accumulate_bilinear(accumulator, px, py, ix, iy, width, height, clip):
+    """
+    Билинейное распределение веса точек между соседними пикселями.
+    Буфер накопителя - (height + 2) x (width + 2): пиксель (0, 0) изображения имеет индекс stride + 1,
+    веса соседей за краем изображения попадают в рамку и отбрасываются.
+    Веса точек одной серии (одинаковый левый нижний пиксель) суммируются до накопления
+    """
+
+    fx = np.floor(px)
+    fy = np.floor(py)
+    np.copyto(ix, fx, casting='unsafe')
+    np.copyto(iy, fy, casting='unsafe')
+    np.subtract(px, fx, out=fx)
+    np.subtract(py, fy, out=fy)
+    if clip:
+        inside = (ix >= -1) & (ix < width) & (iy >= -1) & (iy < height)
+        ix, iy, fx, fy = ix[inside], iy[inside], fx[inside], fy[inside]
+
+    stride = width + 2
+    base = iy * stride
+    base += ix
+    base += stride + 1
+    starts = _run_starts(base)
+    base = base[starts]
+    gx, gy = 1 - fx, 1 - fy
+    for offset, weight in ((0, gx * gy), (1, fx * gy), (stride, gx * fy), (stride + 1, fx * fy)):
+        if len(starts):
+            accumulator.add(base + offset, np.add.reduceat(weight, starts))
+
+
+def thicken(density, linewidth):
+    """
+    Утолщение линии до linewidth пикселей (максимум по квадратному окну)
+    :param density: Буфер плотности
+        :type density: numpy.ndarray
+    :param linewidth: Толщина линии в пикселях
+        :type linewidth: int
+    """
+
+    radius = int(linewidth) // 2
+    if radius < 1:
+        return density
+
+    result = density.copy()
+    for axis in (0, 1):
+        source = result.copy()
+        for shift in range(1, radius + 1):
+            for sign in (-1, 1):
+                shifted = np.roll(source, sign * shift, axis=axis)
+                edge = [slice(None)] * 2
+                edge[axis] = slice(None, shift) if sign > 0 else slice(-shift, None)
+                shifted[tuple(edge)] = 0
+                np.maximum(result, shifted, out=result)
+    return result
+
+
+def colorize(density, color='midnightblue', gamma=0.5):
+    """
+    Преобразование буфера плотности в RGBA-изображение: цвет линии постоянный,
+    прозрачность растёт с логарифмом плотности
+    :param density: Буфер плотности
+        :type density: numpy.ndarray
+    :param color: Цвет линии (имя matplotlib или RGB)
+        :type color: str
+    :param gamma: Показатель контраста (< 1 - слабые участки ярче)
+        :type gamma: float
+    :return: numpy.ndarray (height, width, 4), uint8
+    """
+
+    level = np.log1p(density)
+    peak = level.max()
+    if peak > 0:
+        level /= peak
+    np.power(level, gamma, out=level)
+
+    rgba = np.empty(density.shape + (4,), dtype=np.uint8)
+    rgba[..., :3] = np.round(np.array(colors.to_rgb(color)) * 255).astype(np.uint8)
+    rgba[..., 3] = np.round(level * 255).astype(np.uint8)
+    return rgba
+
+
+def shade(density, color='midnightblue', linewidth=1):
+    """
+    Изображение по готовому буферу плотности (thicken -> colorize): смена стиля без повторного биннинга
+    :return: numpy.ndarray (height, width, 4), uint8
+    """
+
+    return colorize(thicken(density, linewidth), color)
+
+
+def render(x, y, width, height, color='midnightblue', linewidth=1, extent=None, antialias=False):
+    """
+    Растеризация кривой в RGBA-изображение (rasterize -> thicken -> colorize)
+    :return: numpy.ndarray (height, width, 4), uint8. Строка 0 - нижняя граница extent
+    """
+
+    density = rasterize(x, y, width, height, extent=extent, antialias=antialias)
+    return shade(density, color, linewidth)
+
+
+def save_png(path, rgba):
+    """
+    Сохранение изображения, полученного render, в PNG
+    :param path: Путь к файлу
+        :type path: str
+    :param rgba: Изображение (строка 0 - низ)
+        :type rgba: numpy.ndarray
+    """
+
+    image.imsave(path, rgba, origin='lower')
@@ -0,0 +1,267 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+Пакетная отрисовка пресетов без графического интерфейса (matplotlib Agg, без QApplication).
+
+Запуск:
+    python render_presets.py files/presets files/pics --format png --workers 4 --size 5 4 --dpi 100
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from lissajousgen import LissajousGenerator
+from presets import figure_params, figure_style, load_preset
+from settings import SETTINGS_MPL
+
+STAGES = ("load", "generate", "draw", "save")
+
+# параметры, с которыми отрисованы изображения каталога: {имя файла: render_key}
+MANIFEST = '.render_params.json'
+
+
+def make_axes(figure, is_3d=False, aspect=None):
+    """
+    Создание осей с тем же видом, что и в окне приложения (MplCanvas)
+    :param figure: Фигура matplotlib
+        :type figure: matplotlib.figure.Figure
+    :param is_3d: Флаг 3D-осей
+        :type is_3d: bool
+    :param aspect: Масштабирование проекции 3D-осей. По умолчанию - из settings.py
+        :type aspect: list
+    """
+
+    if not is_3d:
+        axes = figure.add_subplot(111)
+    else:
+        from mpl_toolkits.mplot3d.axes3d import Axes3D
+
+        scale = np.diag(aspect or SETTINGS_MPL["render"]["aspect_3d"])
+        axes = figure.add_subplot(111, projection='3d')
+        axes.get_proj = lambda: np.dot(Axes3D.get_proj(axes), scale)
+        axes.view_init(elev=90., azim=-90)
+
+    axes.axis("off")
+    return axes
+
+
+def render_figure(preset, path, resolution=1000, size=(5, 4), dpi=100, generator=None, fmt=None):
+    """
+    Отрисовка пресета в файл. Формат определяется расширением (png, svg, pdf, ...)
+    :param preset: Пресет (presets.normalize_preset)
+        :type preset: dict
+    :param path: Путь к файлу изображения
+        :type path: str
+    :param resolution: Количество точек в кривой
+        :type resolution: int
+    :param size: Размер изображения в дюймах
+        :type size: tuple
+    :param dpi: Разрешение растровых форматов
+        :type dpi: int
+    :param generator: Генератор для повторного использования
+        :type generator: LissajousGenerator
+    :param fmt: Формат изображения, если path - файловый объект
+        :type fmt: str
+    :return: dict с длительностью этапов generate, draw, save в секундах
+    """
+
+    timings = {}
+    start = time.perf_counter()
+
+    generator = generator or LissajousGenerator(resolution=resolution, cache_size=0)
+    generator.set_resolution(resolution)
+    generator.generate_figure(**figure_params(preset))
+    values = generator.get_values()
+    timings["generate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    figure = Figure(figsize=size, dpi=dpi, frameon=True)
+    FigureCanvasAgg(figure)
+    axes = make_axes(figure, preset["3D"])
+    axes.plot(*values, **figure_style(preset))
+    figure.tight_layout()
+    timings["draw"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    figure.savefig(path, format=fmt)
+    timings["save"] = time.perf_counter() - start
+    return timings
+
+
+def output_path(preset_path, output_dir, fmt):
+    name = os.path.splitext(os.path.basename(preset_path))[0]
+    return os.path.join(output_dir, f'{name}.{fmt}')
+
+
+def render_key(resolution, size, dpi):
+    """
+    Ключ параметров отрисовки: изображение, отрисованное с другими параметрами, устарело
+    """
+
+    params = json.dumps([int(resolution), [float(value) for value in size], int(dpi)])
+    return hashlib.sha1(params.encode('utf-8')).hexdigest()[:16]
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST), 'r', encoding='utf-8') as open_file:
+            return json.load(open_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output_dir, manifest):
+    with open(os.path.join(output_dir, MANIFEST), 'w', encoding='utf-8') as write_file:
+        json.dump(manifest, write_file, indent=1, sort_keys=True)
+
+
+def is_up_to_date(preset_path, image_path, key=None, manifest=None):
+    """
+    Изображение актуально, если оно существует, не старше файла пресета
+    и отрисовано с теми же параметрами (key из манифеста каталога, если key задан)
+    """
+
+    if key is not None and (manifest or {}).get(os.path.basename(image_path)) != key:
+        return False
+    return os.path.exists(image_path) and os.path.getmtime(image_path) >= os.path.getmtime(preset_path)
+
+
+_worker_generator = None
+
+
+def render_job(job):
+    """
+    Задача для пула процессов: загрузка и отрисовка одного пресета.
+    Генератор создаётся один раз на процесс
+    :param job: (preset_path, image_path, resolution, size, dpi)
+        :type job: tuple
+    :return: (preset_path, timings) или (preset_path, str с ошибкой)
+    """
+
+    global _worker_generator
+
+    preset_path, image_path, resolution, size, dpi = job
+    if _worker_generator is None:
+        _worker_generator = LissajousGenerator(resolution=resolution, cache_size=0)
+
+    try:
+        start = time.perf_counter()
+        preset = load_preset(preset_path)
+        load_time = time.perf_counter() - start
+        timings = render_figure(preset, image_path, resolution=resolution, size=size, dpi=dpi,
+                                generator=_worker_generator)
+    except Exception as exc:
+        return preset_path, f'{type(exc).__name__}: {exc}'
+
+    timings["load"] = load_time
+    return preset_path, timings
+
+
+def render_directory(input_dir, output_dir, fmt='png', workers=None, force=False, resolution=1000,
+                     size=(5, 4), dpi=100):
+    """
+    Отрисовка всех пресетов (*.json) каталога
+    :param input_dir: Каталог пресетов
+        :type input_dir: str
+    :param output_dir: Каталог изображений
+        :type output_dir: str
+    :param fmt: Формат изображений (png, svg, ...)
+        :type fmt: str
+    :param workers: Количество процессов. None - по числу ядер, 1 - в текущем процессе
+        :type workers: int
+    :param force: Перерисовывать актуальные изображения
+        :type force: bool
+    :param resolution: Количество точек в кривой
+        :type resolution: int
+    :param size: Размер изображения в дюймах
+        :type size: tuple
+    :param dpi: Разрешение растровых форматов
+        :type dpi: int
+    :return: dict со сводкой: rendered, skipped, failed, elapsed, stages (суммарное время этапов)
+    """
+
+    os.makedirs(output_dir, exist_ok=True)
+    presets = sorted(glob.glob(os.path.join(input_dir, '*.json')))
+
+    key = render_key(resolution, size, dpi)
+    manifest = load_manifest(output_dir)
+    jobs, skipped = [], 0
+    for preset_path in presets:
+        image_path = output_path(preset_path, output_dir, fmt)
+        if not force and is_up_to_date(preset_path, image_path, key, manifest):
+            skipped += 1
+        else:
+            jobs.append((preset_path, image_path, resolution, tuple(size), dpi))
+
+    start = time.perf_counter()
+    if workers == 1 or len(jobs) <= 1:
+        results = list(map(render_job, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or 4)))))
+    elapsed = time.perf_counter() - start
+
+    stages = dict.fromkeys(STAGES, 0.)
+    failed = {}
+    for (preset_path, timings), job in zip(results, jobs):
+        if isinstance(timings, str):
+            failed[preset_path] = timings
+            manifest.pop(os.path.basename(job[1]), None)
+            continue
+        manifest[os.path.basename(job[1])] = key
+        for stage in STAGES:
+            stages[stage] += timings[stage]
+    if jobs:
+        save_manifest(output_dir, manifest)
+
+    return {"rendered": len(results) - len(failed), "skipped": skipped, "failed": failed,
+            "elapsed": elapsed, "stages": stages}
+
+
+def print_summary(summary):
+    rendered = summary["rendered"]
+    print(f'Отрисовано: {rendered}, пропущено (актуальны): {summary["skipped"]}, '
+          f'ошибок: {len(summary["failed"])}')
+    for preset_path, message in summary["failed"].items():
+        print(f'  {preset_path}: {message}')
+
+    if rendered:
+        print(f'Время: {summary["elapsed"]:.2f} с, {rendered / summary["elapsed"]:.1f} фигур/с')
+        print('Среднее время этапов (на фигуру, в процессе-исполнителе):')
+        for stage, total in summary["stages"].items():
+            print(f'  {stage:<9} {total / rendered * 1000:8.2f} мс')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input_dir', help='каталог пресетов (*.json)')
+    parser.add_argument('output_dir', help='каталог для изображений')
+    parser.add_argument('--format', default='png', choices=['png', 'svg', 'pdf', 'jpg'])
+    parser.add_argument('--workers', type=int, default=None, help='количество процессов (по умолчанию - число ядер)')
+    parser.add_argument('--resolution', type=int, default=SETTINGS_MPL["generation"]["resolution"])
+    parser.add_argument('--size', type=float, nargs=2, default=[5, 4], metavar=('WIDTH', 'HEIGHT'),
+                        help='размер изображения в дюймах')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--force', action='store_true', help='перерисовать актуальные изображения')
+    args = parser.parse_args(argv)
+
+    summary = render_directory(args.input_dir, args.output_dir, fmt=args.format, workers=args.workers,
+                               force=args.force, resolution=args.resolution, size=args.size, dpi=args.dpi)
+    print_summary(summary)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,373 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+HTTP-сервис отрисовки фигур без графического интерфейса (asyncio, только стандартная библиотека).
+
+Запуск:
+    python render_service.py --port 8765 --workers 4
+
+Запросы (параметры - ключи пресета «Сохранить настройки»: freq_x, freq_y, freq_z, phase,
+length, color, linewidth, 3D):
+    GET  /render.png?freq_x=3&freq_y=2&phase=0.5        изображение PNG
+    GET  /render.svg?...                                 изображение SVG
+    GET  /render.json?...&resolution=2000                координаты точек, JSON
+    GET  /render.npy?...                                 координаты точек, numpy .npy
+    POST /render.png                                     пресет в теле запроса (JSON)
+    GET  /metrics                                        задержки, пропускная способность, кэш
+Дополнительные параметры: resolution, width, height (дюймы), dpi.
+Ответы кэшируются по хэшу параметров; ETag - тот же хэш, If-None-Match возвращает 304
+"""
+
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from instrumentation import Instrumentation
+from lissajousgen import LRUCache, parse_phase
+from presets import DEFAULTS, normalize_preset
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml", "json": "application/json",
+                 "npy": "application/octet-stream"}
+
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+LIMITS = {"resolution": (2, 2000000), "width": (0.5, 40.), "height": (0.5, 40.), "dpi": (10, 600)}
+
+# версия формата ответов входит в ключ кэша и ETag
+RENDER_VERSION = 1
+
+# максимальный размер тела запроса, байт
+MAX_BODY = 2 ** 20
+# сколько байт слишком большого тела дочитывается перед закрытием соединения
+MAX_DISCARD = 2 ** 20
+
+
+class RequestError(Exception):
+    """
+    Ошибка запроса с HTTP-статусом
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_request(fmt, params):
+    """
+    Разбор параметров запроса
+    :param fmt: Формат ответа (png, svg, json, npy)
+        :type fmt: str
+    :param params: Параметры: ключи пресета и resolution, width, height, dpi
+        :type params: dict
+    :return: (preset, options) - нормализованный пресет и параметры отрисовки
+    """
+
+    if fmt not in CONTENT_TYPES:
+        raise RequestError(404, f'Неизвестный формат {fmt}, доступны: {", ".join(CONTENT_TYPES)}')
+
+    params = dict(params)
+    if isinstance(params.get("3D"), str):
+        params["3D"] = params["3D"].lower() in ('1', 'true', 'yes', 'on')
+
+    options = {"resolution": 1000, "width": 5., "height": 4., "dpi": 100}
+    try:
+        for key, default in options.items():
+            value = type(default)(params.pop(key, default))
+            low, high = LIMITS[key]
+            if not low <= value <= high:
+                raise RequestError(400, f'{key} вне диапазона [{low}, {high}]')
+            options[key] = value
+        preset = normalize_preset({key: value for key, value in params.items() if key in DEFAULTS})
+        phases = parse_phase(preset["phase"])
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise RequestError(400, f'Некорректные параметры: {exc}')
+    if not np.all(np.isfinite([preset["freq_x"], preset["freq_y"], preset["freq_z"], *phases])):
+        raise RequestError(400, 'Частоты и сдвиги фаз должны быть конечными числами')
+
+    return preset, options
+
+
+def request_key(fmt, preset, options):
+    """
+    Ключ кэша и ETag: хэш формата, пресета и параметров отрисовки
+    """
+
+    data = json.dumps([RENDER_VERSION, fmt, preset, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+_worker_generator = None
+
+
+def render_payload(fmt, preset, options):
+    """
+    Задача для пула процессов: генерация и отрисовка (или сериализация координат)
+    :return: bytes
+    """
+
+    global _worker_generator
+
+    from lissajousgen import LissajousGenerator
+    from presets import figure_params
+
+    if _worker_generator is None:
+        _worker_generator = LissajousGenerator(cache_size=0)
+
+    buffer = io.BytesIO()
+    if fmt in ('png', 'svg'):
+        from render_presets import render_figure
+
+        render_figure(preset, buffer, resolution=options["resolution"], size=(options["width"], options["height"]),
+                      dpi=options["dpi"], generator=_worker_generator, fmt=fmt)
+        return buffer.getvalue()
+
+    _worker_generator.set_resolution(options["resolution"])
+    _worker_generator.generate_figure(**figure_params(preset))
+    values = np.asarray(_worker_generator.get_values())
+    if fmt == 'npy':
+        np.save(buffer, values)
+        return buffer.getvalue()
+    return json.dumps({"preset": preset, "values": values.tolist()}).encode('utf-8')
+
+
+class RenderService:
+    """
+    HTTP-сервис отрисовки. Генерация и отрисовка выполняются в пуле процессов,
+    одинаковые одновременные запросы ожидают одну задачу, готовые ответы хранятся в LRUCache
+    """
+
+    def __init__(self, workers=None, cache_bytes=64 * 2 ** 20, cache_items=1024, executor=None, timeout=30.):
+        """
+        :param workers: Количество процессов пула. None - по числу ядер
+            :type workers: int
+        :param cache_bytes: Максимальный объём кэша ответов, байт
+            :type cache_bytes: int
+        :param cache_items: Максимальное количество ответов в кэше
+            :type cache_items: int
+        :param executor: Готовый пул (concurrent.futures.Executor) вместо собственного
+        :param timeout: Время ожидания строки запроса, заголовков и тела, с. По истечении соединение закрывается
+            :type timeout: float
+        """
+
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self._own_executor = executor is None
+        self.timeout = timeout
+        self.cache = LRUCache(max_items=cache_items, max_bytes=cache_bytes)
+        self.metrics = Instrumentation(enabled=True, history=1024)
+        self.statuses = {}
+        self.renders = 0
+        self._pending = {}
+        self._connections = set()
+        self._server = None
+
+    async def start(self, host='127.0.0.1', port=8765):
+        """
+        Запуск сервера. port=0 - любой свободный порт
+        :return: (host, port)
+        """
+
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._own_executor:
+            self.executor.shutdown()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Обработка соединения: последовательные запросы HTTP/1.1 (keep-alive)
+        """
+
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), self.timeout)
+                if not request_line.strip():
+                    break
+
+                headers = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), self.timeout)
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                length = headers.get('content-length', '0').strip() or '0'
+                if len(parts) != 3 or not (length.isascii() and length.isdigit()):
+                    await self.reject(writer, 400, 'Некорректный запрос')
+                    break
+                length = int(length)
+                if length > MAX_BODY:
+                    await self.reject(writer, 413, f'Тело запроса больше {MAX_BODY} байт')
+                    # непрочитанное тело при закрытии сокета вызывает RST, и клиент может не получить ответ
+                    await self.discard(reader, min(length, MAX_DISCARD))
+                    break
+                body = await asyncio.wait_for(reader.readexactly(length), self.timeout) if length else b''
+
+                method, target, version = parts
+                close = headers.get('connection', '').lower() == 'close' or version == 'HTTP/1.0'
+                await self.handle_request(writer, method, target, headers, body, close)
+                if close:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def reject(self, writer, status, message):
+        """
+        Ответ с ошибкой до разбора запроса; соединение после него закрывается
+        """
+
+        await self.respond(writer, status, message.encode('utf-8'), 'text/plain', close=True)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    async def discard(self, reader, length):
+        """
+        Чтение и отбрасывание length байт тела запроса (не дольше timeout на каждую порцию)
+        """
+
+        while length > 0:
+            chunk = await asyncio.wait_for(reader.read(min(length, 2 ** 16)), self.timeout)
+            if not chunk:
+                break
+            length -= len(chunk)
+
+    async def handle_request(self, writer, method, target, headers, body, close=False):
+        start = time.perf_counter()
+        url = urlsplit(target)
+        endpoint = url.path.strip('/').split('.')[0] or 'root'
+
+        try:
+            if url.path == '/metrics':
+                status, payload, content_type, extra = 200, self.metrics_json(), 'application/json', {}
+            elif endpoint == 'render':
+                status, payload, content_type, extra = await self.render(method, url, headers, body)
+            else:
+                raise RequestError(404, 'Не найдено')
+        except RequestError as exc:
+            status, payload, content_type, extra = exc.status, str(exc).encode('utf-8'), 'text/plain', {}
+        except Exception as exc:
+            status, payload, content_type = 500, f'{type(exc).__name__}: {exc}'.encode('utf-8'), 'text/plain'
+            extra = {}
+
+        await self.respond(writer, status, payload, content_type, extra, close)
+
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.metrics.record(endpoint if endpoint in ('render', 'metrics') else 'other', start, time.perf_counter())
+        self.metrics.frame()
+
+    async def render(self, method, url, headers, body):
+        fmt = url.path.rpartition('.')[2] if '.' in url.path else 'png'
+        if method == 'GET':
+            params = dict(parse_qsl(url.query))
+        elif method == 'POST':
+            try:
+                params = dict(json.loads(body.decode('utf-8') or '{}'), **dict(parse_qsl(url.query)))
+            except (ValueError, TypeError) as exc:
+                raise RequestError(400, f'Некорректный JSON: {exc}')
+        else:
+            raise RequestError(405, 'Поддерживаются GET и POST')
+
+        preset, options = parse_request(fmt, params)
+        key = request_key(fmt, preset, options)
+        etag = f'"{key}"'
+        extra = {"ETag": etag, "Cache-Control": 'public, max-age=31536000, immutable'}
+
+        if etag in (tag.strip() for tag in headers.get('if-none-match', '').split(',')):
+            return 304, b'', CONTENT_TYPES[fmt], extra
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            extra["X-Cache"] = 'hit'
+            return 200, memoryview(cached), CONTENT_TYPES[fmt], extra
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, partial(render_payload, fmt, preset, options))
+            self._pending[key] = future
+            self.renders += 1
+            try:
+                payload = await future
+            finally:
+                del self._pending[key]
+            self.cache.put(key, np.frombuffer(payload, dtype=np.uint8))
+        else:
+            payload = await asyncio.shield(future)
+
+        extra["X-Cache"] = 'miss'
+        return 200, payload, CONTENT_TYPES[fmt], extra
+
+    @staticmethod
+    async def respond(writer, status, payload, content_type, extra=None, close=False):
+        head = [f'HTTP/1.1 {status} {REASONS.get(status, "")}', f'Content-Type: {content_type}',
+                f'Content-Length: {len(payload)}', f'Connection: {"close" if close else "keep-alive"}']
+        head += [f'{name}: {value}' for name, value in (extra or {}).items()]
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+        writer.write(payload)
+        await writer.drain()
+
+    def metrics_json(self):
+        """
+        Метрики: задержка по обработчикам (мс: last/avg/p95), запросов в секунду за последние 10 с,
+        статусы ответов, количество отрисовок и статистика кэша
+        """
+
+        return json.dumps({
+            "latency_ms": self.metrics.stats(),
+            "throughput_rps": self.metrics.fps(window=10.),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "renders": self.renders,
+            "in_flight": len(self._pending),
+            "cache": self.cache.info()
+        }, indent=2).encode('utf-8')
+
+
+async def serve(host, port, workers):
+    service = RenderService(workers=workers)
+    host, port = await service.start(host, port)
+    print(f'Сервис отрисовки: http://{host}:{port}/render.png?freq_x=3&freq_y=2', flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help='количество процессов (по умолчанию - число ядер)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -25,18 +25,90 @@ SETTINGS_MPL = \
             },
 
             "ui": f"{os.path.join(application_path, 'main_window.ui')}",
+            # база библиотеки пресетов - отдельно от каталога JSON-пресетов
+            "library": f"{os.path.join(application_path, 'files', 'library.sqlite3')}",
             # 'start': f"{os.path.join(application_path, 'create.ui')}"
         },
 
         "dirs": {
             "images": [None, "Сохранение изображения",
                        f"{os.path.join(application_path, 'files', 'pics')}",
-                       "PNG(*.png);;JPEG(*.jpg *.jpeg);;All Files(*.*) "],
+                       "PNG(*.png);;JPEG(*.jpg *.jpeg);;SVG(*.svg);;PDF(*.pdf);;All Files(*.*) "],
             "settings": [None, "Сохранение настроек",
                          f"{os.path.join(application_path, 'files', 'presets')}",
                          "JSON(*.json);;All Files(*.*) "],
         },
 
+        "generation": {
+            "resolution": 1000,
+            # начиная с этого количества точек фигура генерируется в фоновом потоке
+            "async_threshold": 200000,
+            # задержка перестроения фигуры после изменения параметров, мс
+            "debounce_ms": 150
+        },
+
+        "render": {
+            # начиная с этого количества точек 2D-фигура растеризуется в изображение, минуя axes.plot
+            "raster_threshold": 2000000,
+            "antialias": False,
+            # масштабирование проекции 3D-осей (x, y, z, w)
+            "aspect_3d": [1.5, 1.2, 1.2, 1],
+            # начиная с этого количества точек 3D-фигура проецируется на 2D-оси (вращение мышью) вместо mplot3d
+            "fast_3d_threshold": 100000
+        },
+
+        "lod": {
+            # упрощение 2D-линии до разрешения холста перед отрисовкой
+            "enabled": True,
+            # количество ячеек сетки упрощения на пиксель
+            "subpixel": 2,
+            # сохранять в файл полную кривую, а не упрощённую
+            "export_full": True
+        },
+
+        "vector": {
+            # упрощение кривой при сохранении в SVG/PDF/EPS
+            "simplify": True,
+            # допустимое отклонение упрощённой кривой, пункты (1/72 дюйма)
+            "tolerance_pt": 0.25,
+            # SVG только из кривой: один путь в относительных координатах, без осей и сетки
+            "compact_svg": False,
+            # дополнительно сохранять фигуру без упрощения в память, чтобы сравнить размер файла
+            "compare": False
+        },
+
+        "comparison": {
+            # размер сетки сравнения (строки - freq_y, столбцы - freq_x) и количество точек в кривой
+            "rows": 8,
+            "cols": 8,
+            "resolution": 500
+        },
+
+        "animation": {
+            "fps": 30,
+            # изменяемый параметр: "phase" - сдвиг фазы X, "frequency" - частота X
+            "sweep": "phase",
+            # приращение параметра за кадр
+            "step": 0.01,
+            # ёмкость буфера заранее сгенерированных кадров и размер пакета генерации
+            "buffer": 64,
+            "batch": 8,
+            # нижняя граница количества точек при автоматическом снижении разрешения
+            "min_resolution": 200,
+            # количество кадров при сохранении анимации в файл
+            "export_frames": 200
+        },
+
+        "profiling": {
+            # замеры этапов обновления фигуры (Ctrl+Shift+P, запуск с ключом --profile)
+            "enabled": False,
+            # период обновления строки состояния, мс
+            "overlay_ms": 500,
+            # этапы, выводимые в строку состояния
+            "stages": ["generate_figure", "generate_async", "animation_batch", "plot", "raster", "check_axes",
+                       "tight_layout", "draw", "blit", "update"]
+        },
+
         "message": "Генератор фигур Лиссажу. Версия {}. CC BY-SA 4.0 Lazarev",
 
         "version": "0.1"
@@ -0,0 +1,68 @@
+import numpy as np
+
+import unittest
+
+import analysis
+
+from lissajousgen import LissajousGenerator
+
+
+class AnalysisTest(unittest.TestCase):
+
+    def test_circle(self):
+        """Тест метрик окружности: площадь pi, длина 2pi, пересечений нет"""
+        t = np.linspace(0, 2 * np.pi, 20001)
+        metrics = analysis.curve_metrics([np.cos(t), np.sin(t)])
+        self.assertEqual(metrics["crossings"], 0)
+        np.testing.assert_allclose(metrics["bbox"], (-1, 1, -1, 1), atol=1e-6)
+        self.assertAlmostEqual(metrics["area"], np.pi, places=4)
+        self.assertAlmostEqual(metrics["length"], 2 * np.pi, places=6)
+
+    def test_winding_area(self):
+        """Тест площади по правилу ненулевого индекса: дважды обойдённая окружность считается один раз,
+        у восьмёрки петли с противоположным обходом не вычитаются"""
+        t = np.linspace(0, 4 * np.pi, 40001)
+        self.assertAlmostEqual(analysis.enclosed_area(np.cos(t), np.sin(t)), np.pi, places=4)
+
+        t = np.linspace(0, 2 * np.pi, 40001)
+        x, y = np.sin(t), np.sin(2 * t)
+        shoelace = 0.5 * abs(np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+        self.assertLess(shoelace, 1e-9)
+        self.assertAlmostEqual(analysis.enclosed_area(x, y), 8 / 3, places=4)
+
+    def test_crossings_formula(self):
+        """Тест количества самопересечений по формуле 2ab - a - b для невырожденных фигур"""
+        results = analysis.analyze_batch(analysis.ratio_table(7), resolution=5001, workers=2, chunk_size=5)
+        for params, metrics in zip(analysis.ratio_table(7), results):
+            self.assertEqual(metrics["crossings"], analysis.expected_crossings(params["freq_x"], params["freq_y"]),
+                             params)
+
+    def test_intersection_points(self):
+        generator = LissajousGenerator(resolution=2001, cache_size=0)
+        x, y = analysis.figure_values({"freq_x": 1., "freq_y": 2., "phase": '0'}, generator)
+        np.testing.assert_allclose(analysis.self_intersections(x, y), [[0., 0.]], atol=1e-9)
+
+    def test_expected_crossings(self):
+        self.assertEqual(analysis.expected_crossings(6., 4.), 7)
+        self.assertIsNone(analysis.expected_crossings(np.sqrt(2), 1.))
+        # 2 * 0.25 = 1/2: фигура 2:1 вырождается в параболу
+        self.assertIsNone(analysis.expected_crossings(1., 2., '0.25'))
+        # нечётные a и b: вырождение при сдвиге 0, а не 1/2
+        self.assertIsNone(analysis.expected_crossings(1., 3., '0'))
+        self.assertIsNone(analysis.expected_crossings(3., 5., '0'))
+        self.assertIsNone(analysis.expected_crossings(1., 1., '0'))
+        self.assertEqual(analysis.expected_crossings(3., 5., '0.1'), 22)
+        self.assertEqual(analysis.expected_crossings(3., 1., '0.5'), 2)
+        self.assertEqual(analysis.expected_crossings(1., 1., '0.5'), 0)
+
+    def test_crossings_odd_ratios(self):
+        """Тест формулы на фигурах с нечётными a и b при сдвигах 0 и 1/2"""
+        generator = LissajousGenerator(resolution=5001, cache_size=0)
+        for freq_x, freq_y, phase in ((3., 5., '0.1'), (3., 1., '0.5'), (1., 1., '0.5'), (1., 3., '0.5')):
+            params = {"freq_x": freq_x, "freq_y": freq_y, "phase": phase}
+            metrics = analysis.curve_metrics(analysis.figure_values(params, generator))
+            self.assertEqual(metrics["crossings"], analysis.expected_crossings(freq_x, freq_y, phase), params)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import sys
+
+import numpy as np
+
+from PyQt5 import QtWidgets
+
+import unittest
+
+import animation
+import lissajousgen
+import main_lissajous
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class FakeClock:
+    """Время, которое идёт только по advance: такты анимации не зависят от нагрузки машины"""
+
+    def __init__(self, step=0.):
+        self.now = 0.
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class FrameRingTest(unittest.TestCase):
+
+    def test_ring_order(self):
+        """Тест порядка кадров и ограничения ёмкости буфера"""
+        ring = animation.FrameRing(4, 2, 3)
+        batch = [np.arange(9.).reshape(3, 3), -np.arange(9.).reshape(3, 3)]
+        self.assertEqual(ring.push_batch(batch), 3)
+        assert np.array_equal(ring.pop()[0], [0., 1., 2.])
+        self.assertEqual(ring.push_batch(batch), 2)
+        self.assertEqual(len(ring), 4)
+        frames = [ring.pop() for _ in range(4)]
+        self.assertIsNone(ring.pop())
+        assert np.array_equal([frame[1][0] for frame in frames], [-3., -6., 0., -3.])
+
+
+class SweepAnimatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = main_lissajous.LissajousWindow()
+
+    def tearDown(self):
+        if self.window._animator is not None:
+            self.window._animator.stop()
+
+    def test_frames_match_generator(self):
+        """Тест совпадения кадров анимации с generate_figure"""
+        animator = animation.SweepAnimator(self.window, step=0.05, batch_size=4)
+        settings = self.window.get_settings()
+        animator.start(settings, resolution=500)
+        animator.stop()
+
+        generator = lissajousgen.LissajousGenerator(resolution=500)
+        for k in range(6):
+            generator.generate_figure(**dict(settings, phase=f'{float(settings["phase"]) + 0.05 * k}'))
+            assert np.allclose(animator.ring.pop(), generator.get_values(), atol=1e-12)
+
+    def test_animation_blits(self):
+        """Тест вывода кадров блиттингом, без полной перерисовки"""
+        line = self.window._fig.line
+        draws = []
+        self.window._fig.mpl_connect('draw_event', lambda event: draws.append(event))
+
+        self.window.animation_button.setChecked(True)
+        animator = self.window._animator
+        self.assertTrue(animator.is_running())
+        for _ in range(5):
+            animator.tick()
+        self.window.animation_button.setChecked(False)
+
+        self.assertEqual(animator.frames, 5)
+        self.assertLess(len(draws), 3)
+        self.assertIs(self.window._fig.line, line)
+        self.assertFalse(animator.is_running())
+
+    def test_adaptive_resolution(self):
+        """Тест снижения разрешения при нехватке времени на кадр"""
+        # каждое обращение к часам - интервал кадра: такт стоит двух кадров, опоздание - двух пропущенных
+        animator = animation.SweepAnimator(self.window, fps=1000, min_resolution=1000, clock=FakeClock(0.001))
+        animator.start(self.window.get_settings(), resolution=200000)
+        animator.stop()
+        for _ in range(5):
+            animator.tick()
+
+        stats = animator.stats()
+        self.assertLess(stats["resolution"], 200000)
+        self.assertEqual(stats["dropped"], 8)
+
+    def test_resolution_changes_keep_frames(self):
+        """Тест нескольких смен разрешения подряд: кадры прежних буферов выводятся по порядку, без потерь"""
+        frames = []
+        self.window.draw_values = frames.append
+        animator = animation.SweepAnimator(self.window, step=0.05, buffer_size=16, batch_size=4, clock=FakeClock())
+        settings = self.window.get_settings()
+        animator.start(settings, resolution=500)
+        animator.stop()
+        animator.set_resolution(400)
+        animator.fill(4)
+        animator.set_resolution(300)
+        for _ in range(40):
+            animator.tick()
+
+        self.assertEqual((animator.frames, animator.dropped), (40, 0))
+        self.assertEqual([len(frame[0]) for frame in frames[15:22]], [500, 400, 400, 400, 400, 300, 300])
+        generator = lissajousgen.LissajousGenerator()
+        for k, frame in enumerate(frames):
+            generator.set_resolution(len(frame[0]))
+            generator.generate_figure(**dict(settings, phase=f'{float(settings["phase"]) + 0.05 * k}'))
+            assert np.allclose(frame, generator.get_values(), atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import sys
+
+import numpy as np
+
+from matplotlib.backend_bases import MouseEvent
+from PyQt5 import QtWidgets
+
+import unittest
+
+import comparison
+import comparison_window
+import lissajousgen
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class ComparisonGridTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = comparison_window.ComparisonWindow({"phase": '0.5'}, {"color": 'crimson', "linewidth": 1},
+                                                         rows=6, cols=5, resolution=200)
+        self.grid = self.window.grid
+
+    def test_single_collection(self):
+        """Тест сетки: одни оси, одна коллекция, кривые совпадают с generate_figure"""
+        self.assertEqual(len(self.window.figure.axes), 1)
+        self.assertEqual(len(self.grid.axes.collections), 1)
+        self.assertEqual(len(self.grid.collection.get_paths()), 30)
+        self.assertEqual(self.grid.generated, 30)
+
+        generator = lissajousgen.LissajousGenerator(resolution=200)
+        generator.generate_figure(4, 3, phase='0.5', length=1)
+        x, y = generator.get_values()
+        index = 2 * 5 + 3
+        assert np.allclose(self.grid.collection.get_paths()[index].vertices, np.column_stack((x, y)) * 0.42)
+        self.assertEqual(self.grid.cell_at(*self.grid.offsets()[index]), (2, 3))
+
+    def test_partial_update(self):
+        """Тест пересчёта только изменившихся ячеек"""
+        self.assertEqual(self.grid.set_cell(1, 1, phase='0.1'), [6])
+        self.assertEqual(self.grid.generated, 31)
+        self.assertEqual(self.grid.set_cell(1, 1, phase='0.1'), [])
+
+        params = [dict(cell, length=2) if cell["freq_y"] == 3 else cell for cell in self.grid.params]
+        self.assertEqual(self.grid.update(params), list(range(10, 15)))
+
+        self.assertEqual(len(self.grid.set_layout(6, 7, comparison.ratio_params(6, 7))), 6 * 2 + 6)
+
+    def test_cell_redraw(self):
+        """Тест перерисовки изменившихся ячеек без полной отрисовки холста"""
+        self.window.show()
+        self.window.canvas.draw()
+        draws = []
+        self.window.canvas.mpl_connect('draw_event', lambda event: draws.append(event))
+
+        changed = self.grid.set_cell(0, 0, phase='1.0')
+        self.window.redraw_cells(changed)
+        self.assertEqual(draws, [])
+
+        selected = []
+        self.window.cell_selected.connect(selected.append)
+        x, y = self.grid.axes.transData.transform(self.grid.offsets()[0])
+        self.window._on_press(MouseEvent('button_press_event', self.window.canvas, x, y, button=1, dblclick=True))
+        self.assertEqual(selected[0]["phase"], '1.0')
+        self.window.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import numpy as np
+
+import unittest
+
+import curves
+
+from lissajousgen import LissajousGenerator
+
+
+class CurvesTest(unittest.TestCase):
+
+    def test_rose(self):
+        """Тест встроенной кривой rose по формуле"""
+        gen = LissajousGenerator(resolution=1000, cache_size=0)
+        gen.generate_figure(3, 2, freq_z=5, phase='0.5 0.25 0.1', a=2, b=3, c=4, length=1, mode='3d', curve='rose')
+        t = np.linspace(-np.pi, np.pi, 1000)
+        x, y, z = gen.get_values()
+        np.testing.assert_allclose(x, 2 * np.cos(3 * t + 0.5 * np.pi) * np.cos(t), atol=1e-12)
+        np.testing.assert_allclose(y, 3 * np.cos(2 * t + 0.25 * np.pi) * np.sin(t), atol=1e-12)
+        np.testing.assert_allclose(z, 4 * np.sin(5 * t + 0.1 * np.pi), atol=1e-12)
+
+    def test_shared_factors(self):
+        """Тест плана: одинаковые гармоники вычисляются один раз, рабочие массивы переиспользуются"""
+        wave = curves.harmonic('sin', 1.)
+        curve = [[curves.term(1., wave, curves.harmonic('cos', 'freq_x')), curves.term(0.5, wave)],
+                 [curves.term('b', curves.harmonic('cos', 1.), wave)]]
+        plan = curves.compile_curve(curve)
+        self.assertEqual(len(plan.factors), 3)
+        self.assertEqual(plan.names, ('b', 'freq_x'))
+        self.assertIs(curves.compile_curve(curve), plan)
+
+        t = np.linspace(0, 2 * np.pi, 101)
+        out = [np.empty(101), np.empty(101)]
+        work = plan.evaluate(t, {"freq_x": 3., "b": 2.}, out)
+        np.testing.assert_allclose(out[0], np.sin(t) * np.cos(3 * t) + 0.5 * np.sin(t), atol=1e-12)
+        np.testing.assert_allclose(out[1], 2 * np.cos(t) * np.sin(t), atol=1e-12)
+        self.assertIs(plan.evaluate(t, {"freq_x": 3., "b": 2.}, out, work), work)
+
+    def test_period_symmetry(self):
+        """Тест половины периода: отражение совпадает с полным вычислением, несимметричная ось - полный расчёт"""
+        for curve in ('rose', [[curves.term(1., curves.harmonic('sin', 'freq_x')),
+                                curves.term(1., curves.harmonic('sin', 'freq_y'))],
+                               [curves.term(1., curves.harmonic('cos', 'freq_y'))]]):
+            gen = LissajousGenerator(resolution=1001, cache_size=0)
+            gen.generate_figure(3, 2, phase='0.3 0.1', sampling='period', curve=curve)
+            t = np.arange(1001) * (2 * np.pi / 1000)
+            reference = [np.empty(1001), np.empty(1001)]
+            curves.compile_curve(curve, 2).evaluate(t, {"freq_x": 3., "freq_y": 2., "phase_x": 0.3 * np.pi,
+                                                        "phase_y": 0.1 * np.pi, "a": 1, "b": 1}, reference)
+            np.testing.assert_allclose(gen.get_values(), reference, atol=1e-12)
+
+    def test_batch_and_iter(self):
+        """Тест пакетной и потоковой генерации произвольной кривой"""
+        gen = LissajousGenerator(resolution=300, cache_size=0)
+        x, y = gen.generate_batch([1, 2], [3, 4], phase=['0.1', '0.2'], curve='rose')
+        for row, (fx, fy, phase) in enumerate(((1, 3, '0.1'), (2, 4, '0.2'))):
+            gen.generate_figure(fx, fy, phase=phase, curve='rose')
+            np.testing.assert_array_equal(gen.get_values(), [x[row], y[row]])
+
+            chunks = list(gen.iter_figure(fx, fy, phase=phase, chunk_size=70, curve='rose'))
+            np.testing.assert_array_equal(np.concatenate(chunks, axis=1), [x[row], y[row]])
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            curves.compile_curve('spiral')
+        with self.assertRaises(ValueError):
+            curves.harmonic('tan', 1.)
+        with self.assertRaises(ValueError):
+            curves.compile_curve([[curves.term(1., curves.harmonic('sin', 1.))]], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from PIL import Image, ImageSequence
+
+import unittest
+
+import export_video
+
+
+class ExportVideoTest(unittest.TestCase):
+
+    settings = {"freq_x": 3., "freq_y": 2., "phase": '0.5', "length": 1, "mode": '2d'}
+    style = {"color": 'crimson', "linewidth": 2}
+
+    def test_gif_export(self):
+        """Тест сохранения анимации в GIF: порядок кадров не зависит от количества процессов"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            frames = []
+            for workers in (1, 2):
+                path = os.path.join(tmp_dir, f'sweep_{workers}.gif')
+                summary = export_video.export_sweep(path, self.settings, self.style, frames=10, step=0.1,
+                                                    resolution=200, size=(1, 1), dpi=50, workers=workers,
+                                                    chunk_frames=3, queue_size=2)
+                self.assertEqual(summary["frames"], 10)
+                with Image.open(path) as image:
+                    self.assertEqual((image.n_frames, image.size), (10, (50, 50)))
+                    frames.append([np.asarray(frame.convert('RGB')) for frame in ImageSequence.Iterator(image)])
+
+        assert not np.array_equal(frames[0][0], frames[0][5])
+        for first, second in zip(*frames):
+            assert np.array_equal(first, second)
+
+    def test_raw_frames(self):
+        """Тест кадров для ffmpeg: RGB без альфа-канала"""
+        frames = export_video.render_frames((self.settings, np.arange(2), 'frequency', 0.1, self.style,
+                                            100, (1, 1), 40, False))
+        self.assertEqual([len(frame) for frame in frames], [40 * 40 * 3] * 2)
+
+    @unittest.skipIf(shutil.which('ffmpeg') is None, 'ffmpeg не найден')
+    def test_mp4_export(self):
+        """Тест сохранения анимации в MP4 через ffmpeg"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'sweep.mp4')
+            summary = export_video.export_sweep(path, self.settings, self.style, frames=6, resolution=200,
+                                                size=(1, 1), dpi=50, workers=2, chunk_frames=2)
+            self.assertEqual(summary["frames"], 6)
+            self.assertGreater(os.path.getsize(path), 0)
+
+    def test_odd_frame_size(self):
+        """Тест понятной ошибки для нечётного размера кадра MP4 (libx264, yuv420p)"""
+        with self.assertRaisesRegex(ValueError, '51x50'):
+            export_video.export_sweep('sweep.mp4', self.settings, self.style, size=(1.02, 1), dpi=50)
+        # 2.01 * 100 и 1.99 * 100 - не целые: размер кадра - как у холста, а не int(size * dpi) = 200x198
+        with self.assertRaisesRegex(ValueError, '201x199'):
+            export_video.export_sweep('sweep.mp4', self.settings, self.style, size=(2.01, 1.99), dpi=100)
+
+    def test_frame_size(self):
+        """Тест размера кадра для кодировщика: совпадает с отрисованным кадром"""
+        for size, dpi in (((2.01, 1.99), 100), ((5.55, 4), 20), ((1, 1), 40)):
+            width, height = export_video.frame_size(size, dpi)
+            frames = export_video.render_frames((self.settings, np.arange(1), 'phase', 0.1, self.style,
+                                                 100, size, dpi, False))
+            self.assertEqual(len(frames[0]), width * height * 3, size)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            export_video.export_sweep('sweep.avi', self.settings, self.style)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import numpy as np
+
+import unittest
+
+import kernels
+
+from lissajousgen import LissajousGenerator
+
+
+class KernelsTest(unittest.TestCase):
+
+    def test_phasor_error(self):
+        """Тест погрешности 'phasor' относительно sin/cos с расширенной точностью (включая неполный блок)"""
+        for points, freq, block in ((10007, 3., None), (5000, 99., 64), (100, 0.5, 7)):
+            t = np.linspace(-10 * np.pi, 10 * np.pi, points)
+            start, stop = np.longdouble(t[0]), np.longdouble(t[-1])
+            exact_t = start + np.arange(points, dtype=np.longdouble) * ((stop - start) / (points - 1))
+            angle = np.longdouble(freq) * exact_t + 1
+            bound = kernels.phasor_error_bound(float(np.max(np.abs(angle))))
+            for func, exact in (('sin', np.sin(angle)), ('cos', np.cos(angle))):
+                out = kernels.phasor_wave(np.empty(points), t, freq, 1., func, block=block)
+                self.assertLessEqual(float(np.max(np.abs(out - exact))), bound, (points, freq, func))
+
+    def test_generator_kernel(self):
+        """Тест выбора способа в generate_figure и generate_batch: результат в пределах погрешности,
+        кэш фигур различает способы"""
+        gen = LissajousGenerator(resolution=20001)
+        bound = 2 * kernels.phasor_error_bound(13 * 10 * np.pi + np.pi)
+        for kwargs in ({}, {"sampling": 'period'}, {"mode": '3d', "freq_z": 5}, {"curve": 'rose'}):
+            gen.generate_figure(13, 7, phase='0.3 0.1', **kwargs)
+            reference = gen.get_values()
+            gen.generate_figure(13, 7, phase='0.3 0.1', kernel='phasor', **kwargs)
+            self.assertIsNot(gen.get_values()[0], reference[0])
+            np.testing.assert_allclose(gen.get_values(), reference, rtol=0, atol=bound)
+
+        batch = gen.generate_batch([1, 2], [3, 4], phase=['0.1', '0.2'], kernel='phasor')
+        np.testing.assert_allclose(batch, gen.generate_batch([1, 2], [3, 4], phase=['0.1', '0.2']), rtol=0, atol=bound)
+
+    def test_float32(self):
+        gen = LissajousGenerator(resolution=10001, dtype=np.float32, cache_size=0)
+        gen.generate_figure(3, 2, kernel='phasor')
+        x, y = gen.get_values()
+        self.assertEqual(x.dtype, np.float32)
+        t = np.linspace(-10 * np.pi, 10 * np.pi, 10001)
+        np.testing.assert_allclose(x, np.sin(3 * t + 0.5 * np.pi), rtol=0,
+                                   atol=kernels.phasor_error_bound(31 * np.pi, np.float32))
+
+    def test_unknown_kernel(self):
+        with self.assertRaises(ValueError):
+            LissajousGenerator().generate_figure(3, 2, kernel='table')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,16 @@
+import json
 import numpy as np
 import os
 import sys
+import tempfile
 
 from PyQt5 import QtCore, QtWidgets, QtTest
 
 import unittest
 from unittest.mock import patch, call
 
+from matplotlib.backend_bases import MouseEvent
+
 import lissajousgen
 import main_lissajous
 
@@ -40,7 +44,7 @@ class GlobalEngineTest(unittest.TestCase):
         values_2 = self.test_func.get_values()
         assert np.allclose(values_1, values_2)
 
-    @patch('lissajousgen.LissajousGenerator.get_values', return_value=(1, 1))
+    @patch('lissajousgen.LissajousGenerator.get_values', return_value=([0., 1.], [1., 0.]))
     @patch('lissajousgen.LissajousGenerator.generate_figure')
     @patch('matplotlib.axes.Axes.plot')
     def test_form(self, mock_plt, mock_gen, mock_val):
@@ -54,7 +58,318 @@ class GlobalEngineTest(unittest.TestCase):
         QtTest.QTest.mouseClick(self.test_img.plot_button, QtCore.Qt.LeftButton)
         mock_gen.assert_has_calls([call(freq_x=3.0, freq_y=2.0, freq_z=0.0, phase='1', length=10)])
 
-        mock_plt.assert_has_calls([call(1, 1, color='crimson', linewidth=3)])
+        mock_plt.assert_not_called()
+        line = self.test_img._fig.line
+        assert np.array_equal(line.get_xdata(), [0., 1.])
+        self.assertEqual((line.get_color(), line.get_linewidth()), ('crimson', 3))
+
+    def test_redraw_reuses_line(self):
+        """Тест обновления фигуры без пересоздания линии"""
+        line = self.test_img._fig.line
+        self.test_img.phase_lineedit.setText('0.25')
+        QtTest.QTest.mouseClick(self.test_img.plot_button, QtCore.Qt.LeftButton)
+        assert self.test_img._fig.line is line
+        self.assertEqual(len(self.test_img._fig.axes.lines), 1)
+
+        self.test_img.checkBox_3D.setChecked(True)
+        self.test_img.update_plt()
+        assert self.test_img._fig.line is not line
+        self.assertEqual(len(self.test_img.generator.get_values()), 3)
+
+    def test_background_generation(self):
+        """Тест фоновой генерации с отбрасыванием устаревших запросов"""
+        self.test_img.settings["generation"]["async_threshold"] = 0
+        self.test_img.generator.set_resolution(5000)
+        settings = self.test_img.get_settings()
+        try:
+            self.test_img.plot_lissajous_figure(dict(settings, phase='0.1'))
+            self.test_img.plot_lissajous_figure(dict(settings, phase='0.7'))
+            self.test_img._thread_pool.waitForDone()
+            QtWidgets.QApplication.processEvents()
+        finally:
+            self.test_img.settings["generation"]["async_threshold"] = 200000
+
+        self.test_func.set_resolution(5000)
+        self.test_func.generate_figure(**dict(settings, phase='0.7'))
+        assert np.array_equal(self.test_img._fig.line.get_xdata(), self.test_func.get_values()[0])
+        self.assertIsNone(self.test_img._worker)
+
+    def test_raster_render(self):
+        """Тест отображения больших фигур растровым изображением"""
+        render_settings = self.test_img.settings["render"]
+        render_settings["raster_threshold"] = 500
+        try:
+            self.test_img.plot_lissajous_figure()
+            self.assertIsNotNone(self.test_img._fig.image)
+            self.assertFalse(self.test_img._fig.line.get_visible())
+        finally:
+            render_settings["raster_threshold"] = 2000000
+
+        self.test_img.plot_lissajous_figure()
+        self.assertIsNone(self.test_img._fig.image)
+        self.assertTrue(self.test_img._fig.line.get_visible())
+
+    def test_lod_display(self):
+        """Тест упрощения линии для экрана и сохранения полной кривой"""
+        self.test_img.generator.set_resolution(200000)
+        self.test_img.settings["generation"]["async_threshold"] = float('inf')
+        try:
+            self.test_img.plot_lissajous_figure(dict(self.test_img.get_settings(), length=1))
+        finally:
+            self.test_img.settings["generation"]["async_threshold"] = 200000
+
+        line = self.test_img._fig.line
+        shown = len(line.get_xdata())
+        self.assertLess(shown, 200000)
+
+        saved = []
+        self.test_img._fig.mpl_connect('draw_event', lambda event: saved.append(len(line.get_xdata())))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.test_img._fig.print_figure(os.path.join(tmp_dir, 'figure.png'))
+        self.assertEqual(set(saved), {200000})
+        self.assertEqual(len(line.get_xdata()), shown)
+
+    def test_lod_callbacks_once(self):
+        """Тест однократного подключения пересчёта вида к пределам осей (в том числе после axes.cla())"""
+        canvas = self.test_img._fig
+        connected = canvas._limit_callbacks
+        canvas.reset_artists()
+        self.assertEqual(canvas._limit_callbacks, connected)
+
+        canvas.axes.cla()
+        canvas.reset_artists()
+        canvas.reset_artists()
+        self.assertIs(canvas._limit_callbacks[0], canvas.axes.callbacks)
+        for signal in ('xlim_changed', 'ylim_changed'):
+            self.assertEqual(len(canvas.axes.callbacks.callbacks[signal]), 1)
+
+    def test_profiling(self):
+        """Тест замеров этапов и экспорта трассы"""
+        profiler = main_lissajous.PROFILER
+        self.test_img.set_profiling(True)
+        try:
+            self.test_img.plot_lissajous_figure()
+            self.test_img.plot_lissajous_figure(dict(self.test_img.get_settings(), phase='0.3'))
+            stats = profiler.stats()
+            self.assertLessEqual({'generate_figure', 'plot', 'update'}, set(stats))
+            self.assertEqual(stats['generate_figure']['count'], 2)
+            self.assertEqual(profiler.counters['points'], 1000)
+            self.test_img.show_profiling()
+            self.assertIn('points 1000', self.test_img.statusBar().currentMessage())
+
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                # действие экспорта: выбран формат Chrome trace, расширение дописывается
+                path = os.path.join(tmp_dir, 'profile')
+                with patch('PyQt5.QtWidgets.QFileDialog.getSaveFileName',
+                           return_value=(path, 'Chrome trace(*.trace.json)')):
+                    self.test_img.export_profiling_handler()
+                with open(path + '.trace.json', encoding='utf-8') as read_file:
+                    events = json.load(read_file)["traceEvents"]
+                profiler.export(os.path.join(tmp_dir, 'profile.json'))
+                with open(os.path.join(tmp_dir, 'profile.json'), encoding='utf-8') as read_file:
+                    self.assertIn('update', json.load(read_file)["stages"])
+            self.assertIn('update', {event["name"] for event in events if event["ph"] == 'X'})
+        finally:
+            self.test_img.set_profiling(False)
+
+        events = len(profiler.events)
+        self.test_img.plot_lissajous_figure()
+        self.assertEqual(len(profiler.events), events)
+
+    def test_fast_3d(self):
+        """Тест быстрой 3D-проекции: вращение мышью без полной перерисовки"""
+        self.test_img.settings["render"]["fast_3d_threshold"] = 0
+        try:
+            self.test_img.checkBox_3D.setChecked(True)
+            self.test_img.update_plt()
+        finally:
+            self.test_img.settings["render"]["fast_3d_threshold"] = 100000
+
+        canvas = self.test_img._fig
+        self.assertEqual(canvas.axes.name, 'rectilinear')
+        self.assertEqual(len(canvas.full_values), 2)
+        QtWidgets.QApplication.processEvents()
+
+        draws = []
+        canvas.mpl_connect('draw_event', lambda event: draws.append(event))
+        before = canvas.line.get_xdata().copy()
+        canvas._on_press(MouseEvent('button_press_event', canvas, 100, 100, button=1))
+        canvas._on_motion(MouseEvent('motion_notify_event', canvas, 130, 90, button=1))
+        self.assertEqual(draws, [])
+        self.assertNotEqual(canvas.projector.azim, -90.)
+        self.assertFalse(np.array_equal(before, canvas.line.get_xdata()))
+
+        xlim = canvas.axes.get_xlim()
+        canvas._on_scroll(MouseEvent('scroll_event', canvas, 100, 100, step=1))
+        self.assertLess(canvas.axes.get_xlim()[1], xlim[1])
+
+
+class BatchGeneratorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.test_func = lissajousgen.LissajousGenerator(resolution=200)
+
+    def test_batch_matches_single(self):
+        """Тест совпадения пакетной генерации с последовательной"""
+        freq_x = np.array([1., 2., 3.5, 4.])
+        freq_y = np.array([2., 3., 1., 5.])
+        phases = ['0.5', '0.25 0.1', '1', '0.0 0.5 0.3']
+        lengths = [10, 5, 3, 1]
+
+        batch = self.test_func.generate_batch(freq_x, freq_y, freq_z=2, phase=phases, length=lengths,
+                                              mode='3d', chunk_size=3)
+        self.assertEqual(batch[0].shape, (4, 200))
+
+        for i in range(4):
+            self.test_func.generate_figure(freq_x[i], freq_y[i], freq_z=2, phase=phases[i],
+                                           length=lengths[i], mode='3d')
+            for batch_values, values in zip(batch, self.test_func.get_values()):
+                assert np.array_equal(batch_values[i], values)
+
+    def test_batch_float32(self):
+        """Тест пакетной генерации в одинарной точности: результат совпадает с generate_figure побитово"""
+        gen = lissajousgen.LissajousGenerator(resolution=300, dtype=np.float32, cache_size=0)
+        freq_x, amplitudes, lengths = [3., 1.5, 2.7], [1., 2.5, 0.7], [1, 3, 10]
+        phases = ['0.5', '0.13 0.2', '1 0.3 0.7']
+        batch = gen.generate_batch(freq_x, 2., 1.3, phases, a=amplitudes, c=1.5, length=lengths, mode='3d')
+        self.assertEqual(batch[0].dtype, np.float32)
+        for i in range(3):
+            gen.generate_figure(freq_x[i], 2., 1.3, phases[i], a=amplitudes[i], c=1.5, length=lengths[i], mode='3d')
+            for batch_values, values in zip(batch, gen.get_values()):
+                assert np.array_equal(batch_values[i], values)
+
+    def test_batch_numeric_phase(self):
+        """Тест пакетной генерации с числовыми фазами"""
+        batch = self.test_func.generate_batch([1, 2], 3, phase=[0.5, 0.25])
+        self.assertEqual(len(batch), 2)
+        self.test_func.generate_figure(2, 3, phase='0.25')
+        assert np.array_equal(batch[0][1], self.test_func.get_values()[0])
+
+    def test_batch_phase_count(self):
+        """Тест пакета, длину которого задают только фазы: скалярные параметры дополняются до числа фаз"""
+        batch = self.test_func.generate_batch(3, 2, phase=['0.1', '0.2 0.3', '0.4'])
+        self.assertEqual(batch[0].shape, (3, 200))
+        self.test_func.generate_figure(3, 2, phase='0.2 0.3')
+        for batch_values, values in zip(batch, self.test_func.get_values()):
+            assert np.array_equal(batch_values[1], values)
+
+        batch = self.test_func.generate_batch(3, 2, phase=np.array([[0.1, 0.], [0.2, 0.5]]))
+        self.assertEqual(batch[1].shape, (2, 200))
+        with self.assertRaises(ValueError):
+            self.test_func.generate_batch([1, 2, 3], 2, phase=['0.1', '0.2'])
+
+
+class FigureCacheTest(unittest.TestCase):
+
+    def test_cache_hits(self):
+        """Тест повторного использования сгенерированных фигур"""
+        gen = lissajousgen.LissajousGenerator(resolution=100, cache_size=2)
+        gen.generate_figure(3, 2)
+        first = gen.get_values()
+        gen.generate_figure(3, 2)
+        assert first[0] is gen.get_values()[0]
+        assert not first[0].flags.writeable
+
+        info = gen.cache_info()
+        self.assertEqual((info["figures"]["hits"], info["figures"]["misses"]), (1, 1))
+        self.assertEqual(info["time"]["hits"], 0)
+
+        gen.generate_figure(3, 2, phase='0.25')
+        self.assertEqual(gen.cache_info()["time"]["hits"], 1)
+
+    def test_lru_eviction(self):
+        """Тест вытеснения по количеству записей и объёму"""
+        cache = lissajousgen.LRUCache(max_items=2, max_bytes=2000)
+        cache.put('a', np.zeros(100))
+        cache.put('b', np.zeros(100))
+        cache.get('a')
+        cache.put('c', np.zeros(100))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+
+        cache.put('d', np.zeros(200))
+        self.assertEqual(cache.info()["items"], 1)
+        self.assertEqual(cache.info()["evictions"], 3)
+
+
+class BufferReuseTest(unittest.TestCase):
+
+    def test_reuse_buffers(self):
+        """Тест заполнения предвыделенных массивов на месте"""
+        gen = lissajousgen.LissajousGenerator(resolution=500, reuse_buffers=True, track_memory=True)
+        reference = lissajousgen.LissajousGenerator(resolution=500)
+
+        gen.generate_figure(3, 2, phase='0.3 0.1')
+        x = gen.get_values()[0]
+        gen.generate_figure(5, 4, freq_z=2, mode='3d')
+        assert gen.get_values()[0] is x
+        self.assertLess(gen.last_peak_bytes, x.nbytes)
+
+        reference.generate_figure(5, 4, freq_z=2, mode='3d')
+        for values, expected in zip(gen.get_values(), reference.get_values()):
+            assert np.array_equal(values, expected)
+
+    def test_float32(self):
+        """Тест генерации в одинарной точности"""
+        gen = lissajousgen.LissajousGenerator(resolution=500, dtype=np.float32)
+        gen.generate_figure(3, 2, sampling='period')
+        values = gen.get_values()
+        self.assertEqual(values[0].dtype, np.float32)
+
+        reference = lissajousgen.LissajousGenerator(resolution=500)
+        reference.generate_figure(3, 2, sampling='period')
+        assert np.allclose(values, reference.get_values(), atol=1e-5)
+
+
+class StreamingTest(unittest.TestCase):
+
+    def test_iter_figure(self):
+        """Тест совпадения потоковой генерации с обычной"""
+        gen = lissajousgen.LissajousGenerator(resolution=1001)
+        gen.generate_figure(3.3, 2.1, freq_z=1.7, phase='0.2 0.4', length=7, mode='3d')
+        chunks = list(gen.iter_figure(3.3, 2.1, freq_z=1.7, phase='0.2 0.4', length=7, mode='3d', chunk_size=100))
+        self.assertEqual(len(chunks), 11)
+        for i, values in enumerate(gen.get_values()):
+            assert np.array_equal(np.concatenate([chunk[i] for chunk in chunks]), values)
+
+    def test_export_figure(self):
+        """Тест записи фигуры в .npy и открытия без копирования"""
+        gen = lissajousgen.LissajousGenerator(resolution=1001)
+        gen.generate_figure(3, 2)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = gen.export_figure(os.path.join(tmp_dir, 'figure.npy'), 3, 2, chunk_size=64)
+            values = lissajousgen.load_figure(path)
+            self.assertIsInstance(values[0], np.memmap)
+            assert np.array_equal(values, gen.get_values())
+            del values
+
+
+class PeriodSamplingTest(unittest.TestCase):
+
+    def test_find_period(self):
+        """Тест определения периода по соотношению частот"""
+        period, harmonics = lissajousgen.find_period([3, 2])
+        self.assertAlmostEqual(period, 2 * np.pi)
+        self.assertEqual(harmonics, (3, 2))
+        self.assertEqual(lissajousgen.find_period([3.5, 2])[1], (7, 4))
+        self.assertIsNone(lissajousgen.find_period([np.pi, 1]))
+
+    def test_period_figure(self):
+        """Тест генерации одного периода с отражением половины"""
+        gen = lissajousgen.LissajousGenerator(resolution=1001)
+        gen.generate_figure(3, 2, freq_z=1, phase='0.25 0.1', mode='3d', sampling='period')
+        t = np.linspace(0, 2 * np.pi, 1001)
+        expected = [np.sin(3 * t + np.pi * 0.25), np.sin(2 * t + np.pi * 0.1), np.sin(t)]
+        for values, reference in zip(gen.get_values(), expected):
+            assert np.allclose(values, reference, atol=1e-12)
+
+    def test_period_fallback(self):
+        """Тест перехода к фиксированному отрезку для иррациональных соотношений"""
+        gen = lissajousgen.LissajousGenerator(resolution=100, cache_size=0)
+        gen.generate_figure(np.pi, 2, sampling='period')
+        values = gen.get_values()
+        gen.generate_figure(np.pi, 2)
+        assert np.array_equal(values, gen.get_values())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+from PyQt5 import QtCore, QtWidgets
+
+import unittest
+
+import preset_browser
+import preset_store
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+class PresetStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        for i, (freq_x, freq_y) in enumerate([(3, 2), (6, 4), (1, 2), (1.5, 1)] * 30):
+            with open(os.path.join(self.tmp_dir.name, f'preset_{i:03}.json'), 'w', encoding='utf-8') as write_file:
+                json.dump({"freq_x": freq_x, "freq_y": freq_y, "phase": "0.5", "3D": i % 2 == 1}, write_file)
+        self.store = preset_store.PresetStore(os.path.join(self.tmp_dir.name, 'library.sqlite3'))
+        self.browser = None
+
+    def tearDown(self):
+        if self.browser is not None:
+            # задача миниатюры не должна выполняться при удалении пула
+            self.browser.model.stop_thumbnails()
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def make_browser(self):
+        self.browser = preset_browser.PresetBrowser(self.store)
+        return self.browser
+
+    def test_import_and_query(self):
+        """Тест массового импорта и поиска по соотношению частот"""
+        self.assertEqual(self.store.import_directory(self.tmp_dir.name), (120, {}))
+        self.assertEqual(self.store.import_directory(self.tmp_dir.name), (0, {}))
+
+        self.assertEqual(self.store.count(ratio=(3, 2)), 90)
+        self.assertEqual(self.store.count(ratio=(3, 2), is_3d=False), 30)
+        records = self.store.query(ratio=(1, 2), limit=5, offset=5)
+        self.assertEqual(len(records), 5)
+        self.assertEqual({(record["freq_x"], record["freq_y"]) for record in records}, {(1., 2.)})
+
+    def test_import_unreadable(self):
+        """Тест импорта с нечитаемым файлом: ошибка попадает в список, остальные файлы импортируются"""
+        # каталог с именем *.json не открывается как файл (IsADirectoryError или PermissionError)
+        os.mkdir(os.path.join(self.tmp_dir.name, 'locked.json'))
+        imported, errors = self.store.import_directory(self.tmp_dir.name)
+        self.assertEqual(imported, 120)
+        self.assertEqual([os.path.basename(path) for path in errors], ['locked.json'])
+
+    def test_import_prunes_removed(self):
+        """Тест удаления записей и миниатюр пресетов, файлы которых удалены из каталога"""
+        self.store.import_directory(self.tmp_dir.name)
+        record = self.store.query(ratio=(1, 2), limit=1)[0]
+        self.store.thumbnail(record, size=16, resolution=50)
+        for i in range(2, 120, 4):
+            os.remove(os.path.join(self.tmp_dir.name, f'preset_{i:03}.json'))
+
+        self.assertEqual(self.store.import_directory(self.tmp_dir.name), (0, {}))
+        self.assertEqual(self.store.count(), 90)
+        self.assertEqual(self.store.count(ratio=(1, 2)), 0)
+        self.assertIsNone(self.store.cached_thumbnail(record, size=16))
+
+    def test_thumbnail_cache(self):
+        """Тест однократной отрисовки миниатюр"""
+        self.store.import_directory(self.tmp_dir.name)
+        first, second = self.store.query(ratio=(3, 2), limit=2)
+        png = self.store.thumbnail(first, size=32, resolution=100)
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertEqual(self.store.thumbnail(first, size=32), png)
+        count = self.store._db.execute('SELECT COUNT(*) FROM thumbnails').fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_browser_lazy_loading(self):
+        """Тест постраничной подгрузки списка"""
+        self.store.import_directory(self.tmp_dir.name)
+        browser = self.make_browser()
+        model = browser.model
+        self.assertEqual(model.rowCount(), 0)
+        self.assertTrue(model.canFetchMore())
+        model.fetchMore()
+        self.assertEqual(model.rowCount(), model.page_size)
+
+        browser.ratio_lineedit.setText('3:2')
+        browser.apply_filters()
+        while model.canFetchMore():
+            model.fetchMore()
+        self.assertEqual(model.rowCount(), 90)
+
+    def test_browser_thumbnails_async(self):
+        """Тест отрисовки миниатюр в фоне: data() не ждёт отрисовки, готовая миниатюра обновляет строки"""
+        self.store.import_directory(self.tmp_dir.name)
+        browser = self.make_browser()
+        model = browser.model
+        model.fetchMore()
+        changed = []
+        model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+
+        index = model.index(0)
+        self.assertIsNone(model.data(index, QtCore.Qt.DecorationRole))
+        self.assertIsNone(self.store.cached_thumbnail(model.record(0), size=model.thumbnail_size))
+        finish = time.perf_counter() + 30
+        while not changed and time.perf_counter() < finish:
+            QtWidgets.QApplication.processEvents()
+            time.sleep(0.01)
+
+        self.assertIn(0, changed)
+        self.assertFalse(model.data(index, QtCore.Qt.DecorationRole).isNull())
+        self.assertIsNotNone(self.store.cached_thumbnail(model.record(0), size=model.thumbnail_size))
+
+    def test_browser_import_errors(self):
+        """Тест вывода ошибок импорта"""
+        with open(os.path.join(self.tmp_dir.name, 'broken.json'), 'w', encoding='utf-8') as write_file:
+            write_file.write('{"freq_x": ')
+        browser = self.make_browser()
+        messages = []
+        browser.status_message.connect(lambda text, timeout: messages.append(text))
+        self.assertEqual(browser.import_directory(self.tmp_dir.name), 120)
+        self.assertEqual(len(messages), 1)
+        self.assertIn('broken.json', messages[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
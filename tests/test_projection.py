@@ -0,0 +1,41 @@
+import numpy as np
+
+import unittest
+
+import lissajousgen
+import projection
+
+
+class ProjectorTest(unittest.TestCase):
+
+    def setUp(self):
+        generator = lissajousgen.LissajousGenerator(resolution=5000)
+        generator.generate_figure(3, 2, 5, mode='3d')
+        self.values = generator.get_values()
+
+    def test_top_view(self):
+        """Тест вида сверху (как Axes3D.view_init(elev=90, azim=-90)) с масштабированием aspect"""
+        projector = projection.Projector(aspect=(1.5, 1.2, 1.2, 1))
+        x, y = projector.set_data(self.values)
+        center = projector.center
+        assert np.allclose(x, 1.5 * (self.values[0] - center[0]))
+        assert np.allclose(y, 1.2 * (self.values[1] - center[1]))
+
+    def test_rotation(self):
+        """Тест вращения: проекция ортогональна, пределы осей не зависят от вида"""
+        projector = projection.Projector()
+        projector.set_data(self.values)
+        limits = projector.limits()
+        for _ in range(5):
+            projector.rotate(37., -23.)
+            x, y = projector.project()
+            self.assertLessEqual(np.max(np.hypot(x, y)), projector.radius + 1e-9)
+            self.assertEqual(projector.limits(), limits)
+            self.assertTrue(-90. <= projector.elev <= 90.)
+
+        matrix = projection.view_matrix(30., 40., aspect=(1, 1, 1, 1))
+        assert np.allclose(matrix @ matrix.T, np.eye(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
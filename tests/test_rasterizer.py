@@ -0,0 +1,59 @@
+import numpy as np
+import os
+import tempfile
+
+import unittest
+
+import rasterizer
+
+
+class RasterizerTest(unittest.TestCase):
+
+    def test_rasterize_points(self):
+        """Тест биннинга точек в буфер плотности"""
+        x = np.array([0., 1., 1., 0.5])
+        y = np.array([0., 0., 1., 0.5])
+        density = rasterizer.rasterize(x, y, 3, 3, extent=(0, 1, 0, 1), connect=False)
+        self.assertEqual(density.shape, (3, 3))
+        self.assertEqual((density[0, 0], density[0, 2], density[2, 2], density[1, 1]), (1, 1, 1, 1))
+        self.assertEqual(density.sum(), 4)
+
+        antialiased = rasterizer.rasterize(x, y, 3, 3, extent=(0, 1, 0, 1), connect=False, antialias=True)
+        self.assertAlmostEqual(float(antialiased.sum()), 4, places=5)
+
+    def test_rasterize_segments(self):
+        """Тест непрерывности линии между редкими точками"""
+        density = rasterizer.rasterize(np.array([0., 1.]), np.array([0., 0.]), 10, 1, extent=(0, 1, -1, 1))
+        assert (density[0] > 0).all()
+
+        chunked = rasterizer.rasterize(np.linspace(0, 1, 50), np.zeros(50), 10, 1, extent=(0, 1, -1, 1),
+                                       chunk_size=7)
+        self.assertEqual(chunked.sum(), 50)
+
+    def test_chunks_and_runs(self):
+        """Тест независимости результата от размера порции (серии точек, сглаживание, обрезка)"""
+        t = np.linspace(0, 2 * np.pi, 20011)
+        x, y = np.sin(3 * t), np.sin(2 * t)
+        for kwargs in ({}, {"antialias": True}, {"extent": (-0.5, 1, -1.2, 0.3), "antialias": True},
+                       {"extent": (-0.5, 1, -1.2, 0.3)}):
+            whole = rasterizer.rasterize(x, y, 40, 30, chunk_size=len(x), **kwargs)
+            chunked = rasterizer.rasterize(x, y, 40, 30, chunk_size=997, **kwargs)
+            np.testing.assert_allclose(chunked, whole, rtol=1e-6)
+
+        sparse = rasterizer.rasterize(x[::500], y[::500], 400, 300, antialias=True, chunk_size=5)
+        self.assertAlmostEqual(float(sparse.sum()), float(rasterizer.rasterize(
+            x[::500], y[::500], 400, 300, antialias=True).sum()), places=2)
+
+    def test_save_png(self):
+        """Тест сохранения растра в PNG"""
+        t = np.linspace(0, 2 * np.pi, 10000)
+        rgba = rasterizer.render(np.sin(3 * t), np.sin(2 * t), 64, 48, color='crimson', linewidth=3)
+        self.assertEqual(rgba.shape, (48, 64, 4))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'figure.png')
+            rasterizer.save_png(path, rgba)
+            self.assertGreater(os.path.getsize(path), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
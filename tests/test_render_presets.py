@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+
+import unittest
+
+import presets
+import render_presets
+
+
+class RenderPresetsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, 'presets')
+        self.output_dir = os.path.join(self.tmp_dir.name, 'pics')
+        os.makedirs(self.input_dir)
+        for name, data in (('flat', {"freq_x": 3, "freq_y": 2, "phase": "0.5", "color": "Красный"}),
+                           ('volume', {"freq_x": 1, "freq_y": 2, "freq_z": 3, "3D": True, "linewidth": 3})):
+            with open(os.path.join(self.input_dir, f'{name}.json'), 'w', encoding='utf-8') as write_file:
+                json.dump(data, write_file, ensure_ascii=False)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_preset_params(self):
+        """Тест разбора пресета"""
+        preset = presets.load_preset(os.path.join(self.input_dir, 'flat.json'))
+        self.assertEqual(presets.figure_params(preset)["mode"], '2d')
+        self.assertEqual(presets.figure_style(preset), {"color": "crimson", "linewidth": 2})
+
+    def test_render_directory(self):
+        """Тест пакетной отрисовки и пропуска актуальных изображений"""
+        summary = render_presets.render_directory(self.input_dir, self.output_dir, workers=1, resolution=200)
+        self.assertEqual((summary["rendered"], summary["skipped"], summary["failed"]), (2, 0, {}))
+        self.assertEqual(sorted(os.listdir(self.output_dir)), [render_presets.MANIFEST, 'flat.png', 'volume.png'])
+
+        summary = render_presets.render_directory(self.input_dir, self.output_dir, workers=1, resolution=200)
+        self.assertEqual((summary["rendered"], summary["skipped"]), (0, 2))
+
+        # другие параметры отрисовки - изображения устарели
+        summary = render_presets.render_directory(self.input_dir, self.output_dir, workers=1, resolution=300)
+        self.assertEqual((summary["rendered"], summary["skipped"]), (2, 0))
+        summary = render_presets.render_directory(self.input_dir, self.output_dir, workers=1, resolution=300,
+                                                  size=(3, 2), dpi=50)
+        self.assertEqual(summary["rendered"], 2)
+        summary = render_presets.render_directory(self.input_dir, self.output_dir, workers=1, resolution=300,
+                                                  size=[3., 2.], dpi=50)
+        self.assertEqual((summary["rendered"], summary["skipped"]), (0, 2))
+
+        summary = render_presets.render_directory(self.input_dir, self.output_dir, fmt='svg', workers=2,
+                                                  resolution=200)
+        self.assertEqual(summary["rendered"], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'volume.svg')))
+
+
+if __name__ == '__main__':
+    unittest.main()
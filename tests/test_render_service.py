@@ -0,0 +1,161 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+
+import unittest
+
+import render_service
+
+
+class RenderServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.service = render_service.RenderService(workers=1)
+        self.host, self.port = self.loop.run_until_complete(self.service.start('127.0.0.1', 0))
+
+    def tearDown(self):
+        self.loop.run_until_complete(self.service.close())
+        self.loop.close()
+
+    def request(self, target, method='GET', body=b'', headers=None):
+        """
+        Запросы по одному соединению (keep-alive): список (status, headers, body)
+        """
+
+        async def exchange(targets):
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            responses = []
+            for path in targets:
+                head = [f'{method} {path} HTTP/1.1', f'Host: {self.host}', f'Content-Length: {len(body)}']
+                head += [f'{name}: {value}' for name, value in (headers or {}).items()]
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+                status = int((await reader.readline()).split()[1])
+                response_headers = {}
+                while True:
+                    line = (await reader.readline()).decode('latin-1').strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(':')
+                    response_headers[name.lower()] = value.strip()
+                data = await reader.readexactly(int(response_headers["content-length"]))
+                responses.append((status, response_headers, data))
+            writer.close()
+            await writer.wait_closed()
+            return responses
+
+        targets = target if isinstance(target, list) else [target]
+        responses = self.loop.run_until_complete(exchange(targets))
+        return responses if isinstance(target, list) else responses[0]
+
+    def test_png_cache(self):
+        """Тест кэша: повторный запрос не отрисовывается заново, ETag совпадает, If-None-Match - 304"""
+        target = '/render.png?freq_x=3&freq_y=2&phase=0.5&resolution=200&width=2&height=2&dpi=50'
+        (status, headers, data), (status_2, headers_2, data_2) = self.request([target, target])
+        self.assertEqual((status, status_2), (200, 200))
+        self.assertEqual(headers["content-type"], 'image/png')
+        self.assertEqual(data[:8], b'\x89PNG\r\n\x1a\n')
+        self.assertEqual((headers["x-cache"], headers_2["x-cache"]), ('miss', 'hit'))
+        self.assertEqual(headers["etag"], headers_2["etag"])
+        self.assertEqual(data, data_2)
+        self.assertEqual(self.service.renders, 1)
+
+        status, _, data = self.request(target, headers={"If-None-Match": headers["etag"]})
+        self.assertEqual((status, data), (304, b''))
+
+        # другой порядок параметров - тот же ключ
+        status, headers_3, _ = self.request('/render.png?dpi=50&phase=0.5&height=2&width=2&resolution=200'
+                                            '&freq_y=2&freq_x=3')
+        self.assertEqual((headers_3["etag"], headers_3["x-cache"]), (headers["etag"], 'hit'))
+
+    def test_coordinates(self):
+        """Тест координат: JSON (POST пресета) и npy совпадают с генератором"""
+        preset = {"freq_x": 1, "freq_y": 2, "phase": '0', "length": 1, "3D": False}
+        status, _, data = self.request('/render.json?resolution=50', method='POST',
+                                       body=json.dumps(preset).encode('utf-8'))
+        self.assertEqual(status, 200)
+        values = np.array(json.loads(data)["values"])
+        self.assertEqual(values.shape, (2, 50))
+
+        query = '&'.join(f'{key}={value}' for key, value in preset.items())
+        status, _, data = self.request(f'/render.npy?{query}&resolution=50')
+        self.assertEqual(status, 200)
+        np.testing.assert_allclose(np.load(io.BytesIO(data)), values)
+
+    def test_errors_and_metrics(self):
+        self.assertEqual(self.request('/render.png?freq_x=abc')[0], 400)
+        self.assertEqual(self.request('/render.png?resolution=1')[0], 400)
+        self.assertEqual(self.request('/render.gif')[0], 404)
+        self.assertEqual(self.request('/render.png', method='DELETE')[0], 405)
+
+        status, headers, data = self.request('/metrics')
+        self.assertEqual((status, headers["content-type"]), (200, 'application/json'))
+        metrics = json.loads(data)
+        self.assertEqual(metrics["statuses"], {"400": 2, "404": 1, "405": 1})
+        self.assertEqual(metrics["latency_ms"]["render"]["count"], 4)
+        self.assertGreater(metrics["throughput_rps"], 0)
+        self.assertEqual(metrics["renders"], 0)
+
+        self.assertEqual(set(metrics["cache"]), {"hits", "misses", "evictions", "items", "bytes"})
+
+    def send_raw(self, data):
+        """
+        Отправка произвольных байт: строка статуса ответа. Сервер должен закрыть соединение
+        """
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            writer.write(data)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), 5)
+            # ответ дочитывается до закрытия соединения сервером
+            await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return status_line.decode('latin-1').strip()
+
+        return self.loop.run_until_complete(exchange())
+
+    def test_malformed_requests(self):
+        """Тест ответа 400 на некорректную строку запроса и Content-Length, 413 - на слишком большое тело"""
+        self.assertTrue(self.send_raw(b'GARBAGE\r\n\r\n').startswith('HTTP/1.1 400'))
+        self.assertTrue(self.send_raw(b'GET /metrics HTTP/1.1\r\nContent-Length: x\r\n\r\n')
+                        .startswith('HTTP/1.1 400'))
+
+        length = render_service.MAX_BODY + 1
+        status_line = self.send_raw(f'POST /render.png HTTP/1.1\r\nContent-Length: {length}\r\n\r\n'
+                                    .encode('latin-1') + b'{' * length)
+        self.assertTrue(status_line.startswith('HTTP/1.1 413'))
+        # заявлено 1 ГБ: дочитывается не больше MAX_DISCARD, затем соединение закрывается без ожидания остального
+        status_line = self.send_raw(b'POST /render.png HTTP/1.1\r\nContent-Length: 1073741824\r\n\r\n'
+                                    + b'{' * render_service.MAX_DISCARD)
+        self.assertTrue(status_line.startswith('HTTP/1.1 413'))
+        self.assertEqual(self.service.statuses, {400: 2, 413: 2})
+
+    def test_invalid_values(self):
+        """Тест ответа 400 на некорректный сдвиг фаз и нечисловые (NaN, inf) частоты и длину"""
+        for query in ('phase=abc', 'phase=0.1+nan', 'freq_x=nan', 'freq_y=inf', 'freq_z=-inf', 'length=inf',
+                      'phase=0.5%20inf'):
+            self.assertEqual(self.request(f'/render.json?{query}&resolution=50')[0], 400, query)
+        status, _, data = self.request('/render.json?resolution=50', method='POST',
+                                       body=b'{"freq_x": NaN, "length": Infinity}')
+        self.assertEqual(status, 400)
+        self.assertEqual(self.service.renders, 0)
+
+    def test_read_timeout(self):
+        """Тест закрытия соединения, не присылающего заголовки"""
+        self.service.timeout = 0.2
+
+        async def exchange():
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            writer.write(b'GET /metrics HTTP/1.1\r\n')
+            data = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return data
+
+        self.assertEqual(self.loop.run_until_complete(exchange()), b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import os
+import re
+import sys
+import tempfile
+
+import numpy as np
+
+from PyQt5 import QtWidgets
+
+import unittest
+
+import lissajousgen
+import lod
+import main_lissajous
+import vector_export
+
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+
+def max_deviation(x, y, index):
+    """Наибольшее расстояние от точек исходной ломаной до отрезков упрощённой"""
+    segment = np.clip(np.searchsorted(index, np.arange(len(x)), side='right') - 1, 0, len(index) - 2)
+    x0, y0 = x[index[segment]], y[index[segment]]
+    dx, dy = x[index[segment + 1]] - x0, y[index[segment + 1]] - y0
+    length_sq = dx * dx + dy * dy
+    t = np.clip(((x - x0) * dx + (y - y0) * dy) / np.where(length_sq > 0, length_sq, 1), 0, 1)
+    return np.max(np.hypot(x - x0 - t * dx, y - y0 - t * dy))
+
+
+def parse_path(d):
+    numbers = np.array(re.findall(r'-?\d+(?:\.\d+)?', d), dtype=float)
+    return np.cumsum(numbers[0::2]), np.cumsum(numbers[1::2])
+
+
+class SimplifyTest(unittest.TestCase):
+
+    def test_error_bound(self):
+        """Тест упрощения Дугласа-Пекера: отклонение не больше допуска"""
+        generator = lissajousgen.LissajousGenerator(resolution=100000)
+        generator.generate_figure(5, 4, phase='0.3')
+        x, y = (coord * 200 for coord in generator.get_values())
+        for tolerance in (0.05, 0.5):
+            xs, ys, index = lod.simplify(x, y, tolerance)
+            self.assertLess(len(index), len(x) // 10)
+            self.assertLessEqual(max_deviation(x, y, index), tolerance)
+            self.assertEqual((index[0], index[-1]), (0, len(x) - 1))
+
+    def test_decimate_outside(self):
+        """Тест LOD: точки за пределами видимой области по x и y схлопываются в пограничные ячейки"""
+        t = np.linspace(0., 1., 1000)
+        for x, y in ((2. + t, np.full_like(t, 0.5)), (-1. - t, np.full_like(t, 0.5)), (np.full_like(t, 0.5), 2. + t)):
+            _, _, index = lod.decimate(x, y, (0., 1., 0., 1.), 100, 100)
+            self.assertEqual(list(index), [0, len(t) - 1])
+
+    def test_svg_path(self):
+        """Тест компактного пути SVG: относительные координаты без накопления ошибки округления"""
+        rng = np.random.default_rng(1)
+        x, y = np.cumsum(rng.normal(size=(2, 5000)), axis=1)
+        d = vector_export.svg_path(x, y, precision=0.01)
+        self.assertTrue(d.startswith('M') and d.count('l') == 1)
+        px, py = parse_path(d)
+        self.assertLessEqual(np.max(np.abs(px - x)), 0.005 + 1e-9)
+        self.assertLessEqual(np.max(np.abs(py - y)), 0.005 + 1e-9)
+
+
+class VectorExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.window = main_lissajous.LissajousWindow()
+        self.window.generator.set_resolution(100000)
+        self.window.plot_lissajous_figure()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_export_formats(self):
+        """Тест сохранения SVG/PDF с упрощением и отчётом о размере"""
+        shown = self.window._fig.line.get_xdata().copy()
+        for name in ('figure.svg', 'figure.pdf'):
+            path = os.path.join(self.tmp_dir.name, name)
+            report = vector_export.export_vector(self.window._fig, path, tolerance=0.25, compare=True)
+            self.assertEqual(report["points"], 100000)
+            self.assertLess(report["saved_points"], 10000)
+            self.assertLess(report["bytes"], report["raw_bytes"])
+            self.assertEqual(report["bytes"], os.path.getsize(path))
+        assert np.array_equal(self.window._fig.line.get_xdata(), shown)
+
+    def test_compact_svg(self):
+        """Тест компактного SVG: отклонение кривой в пунктах не больше допуска"""
+        path = os.path.join(self.tmp_dir.name, 'figure.svg')
+        canvas = self.window._fig
+        report = vector_export.export_vector(canvas, path, tolerance=0.25, compact=True)
+
+        with open(path, encoding='utf-8') as read_file:
+            svg = read_file.read()
+        self.assertEqual(svg.count('<path'), 1)
+        px, py = parse_path(re.search(r' d="([^"]+)"', svg).group(1))
+        self.assertEqual(len(px), report["saved_points"])
+
+        height = canvas.figure.get_size_inches()[1] * 72
+        x, y = vector_export.to_points(canvas.axes, *canvas.full_values)
+        _, _, index = lod.simplify(x, y, 0.25 - 0.01)
+        assert np.allclose(px, x[index], atol=0.01) and np.allclose(py, height - y[index], atol=0.01)
+        self.assertLessEqual(max_deviation(x, y, index), 0.25)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import io
+import math
+import os
+
+import numpy as np
+
+from matplotlib import colors, rc_context
+
+from lod import simplify
+
+VECTOR_FORMATS = ('.svg', '.pdf', '.eps', '.ps')
+
+
+def to_points(axes, x, y):
+    """
+    Перевод координат данных в пункты (1/72 дюйма) от левого нижнего угла фигуры -
+    единицы векторного файла. Раскладка фигуры при сохранении та же, что на экране
+    """
+
+    display = axes.transData.transform(np.column_stack((x, y)))
+    display *= 72. / axes.figure.dpi
+    return display[:, 0], display[:, 1]
+
+
+def format_number(value, digits=3):
+    text = f'{value:.{digits}f}'.rstrip('0').rstrip('.')
+    return '0' if text in ('', '-0') else text
+
+
+def svg_path(x, y, precision=0.01):
+    """
+    Компактная запись ломаной одним путём SVG в относительных координатах: "M x0 y0 l dx dy dx dy ...".
+    Координаты округляются к сетке precision до вычисления разностей, поэтому ошибки округления
+    не накапливаются: отклонение любой вершины не больше precision / 2
+    :param x: Координаты x в единицах SVG
+        :type x: numpy.ndarray
+    :param y: Координаты y в единицах SVG
+        :type y: numpy.ndarray
+    :param precision: Шаг сетки округления
+        :type precision: float
+    :return: str, значение атрибута d
+    """
+
+    digits = max(0, -math.floor(math.log10(precision)))
+    grid_x = np.rint(np.asarray(x) / precision).astype(np.int64)
+    grid_y = np.rint(np.asarray(y) / precision).astype(np.int64)
+    steps = np.empty(2 * (len(grid_x) - 1), dtype=np.int64)
+    steps[0::2] = np.diff(grid_x)
+    steps[1::2] = np.diff(grid_y)
+
+    numbers = ' '.join(format_number(step * precision, digits) for step in steps)
+    start = f'M{format_number(grid_x[0] * precision, digits)} {format_number(grid_y[0] * precision, digits)}'
+    return f'{start}l{numbers}' if numbers else start
+
+
+def write_svg(path, x, y, width, height, color, linewidth, precision=0.01):
+    """
+    Сохранение кривой в SVG из одного элемента path (без осей и сетки)
+    :param x: Координаты x в пунктах от левого нижнего угла
+    :param y: Координаты y в пунктах от левого нижнего угла
+    :param width: Ширина изображения в пунктах
+    :param height: Высота изображения в пунктах
+    :param color: Цвет линии (любой цвет matplotlib)
+    :param linewidth: Толщина линии в пунктах
+    """
+
+    d = svg_path(x, height - np.asarray(y), precision)
+    with open(path, 'w', encoding='utf-8') as write_file:
+        write_file.write(
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{format_number(width)}pt" '
+            f'height="{format_number(height)}pt" viewBox="0 0 {format_number(width)} {format_number(height)}">'
+            f'<path d="{d}" fill="none" stroke="{colors.to_hex(color)}" stroke-width="{format_number(linewidth)}" '
+            f'stroke-linejoin="round" stroke-linecap="round"/></svg>\n')
+
+
+def export_vector(canvas, path, tolerance=0.25, compact=False, compare=False):
+    """
+    Сохранение фигуры холста в векторный формат с упрощением кривой (lod.simplify).
+    Упрощение выполняется в пунктах выходного файла, поэтому видимое отклонение не превышает tolerance.
+    Упрощается полная кривая (full_values) 2D-линии, в том числе проекция режима fast3d;
+    линии mplot3d и растровое отображение сохраняются без упрощения
+    :param canvas: Холст окна
+        :type canvas: MplCanvas
+    :param path: Путь к файлу (*.svg, *.pdf, *.eps, *.ps)
+        :type path: str
+    :param tolerance: Допустимое отклонение в пунктах (1/72 дюйма)
+        :type tolerance: float
+    :param compact: Для SVG - записать только кривую одним путём в относительных координатах
+        :type compact: bool
+    :param compare: Дополнительно сохранить неупрощённую фигуру в память для сравнения размера
+        :type compare: bool
+    :return: dict - points (исходное количество точек), saved_points, bytes, raw_bytes (при compare)
+    """
+
+    values = canvas.full_values
+    line = canvas.line
+    if line is None or values is None or len(values) != 2 or canvas.image is not None:
+        canvas.print_figure(path)
+        count = len(values[0]) if values is not None else 0
+        return {"points": count, "saved_points": count, "bytes": os.path.getsize(path)}
+
+    report = {"points": len(values[0])}
+    if compare:
+        raw = io.BytesIO()
+        canvas.print_figure(raw, format=os.path.splitext(path)[1][1:].lower() or 'svg')
+        report["raw_bytes"] = raw.tell()
+
+    compact = compact and path.lower().endswith('.svg')
+    # округление координат компактного SVG входит в общий допуск
+    precision = min(tolerance / 10, 0.01)
+
+    x_pt, y_pt = to_points(canvas.axes, values[0], values[1])
+    x_pt, y_pt, index = simplify(x_pt, y_pt, tolerance - precision if compact else tolerance)
+    report["saved_points"] = len(index)
+
+    if compact:
+        width, height = canvas.figure.get_size_inches() * 72
+        write_svg(path, x_pt, y_pt, width, height, line.get_color(), line.get_linewidth(), precision)
+    else:
+        display = line.get_data()
+        line.set_data(values[0][index], values[1][index])
+        try:
+            # собственное упрощение путей matplotlib добавило бы отклонение сверх tolerance
+            with rc_context({'path.simplify': False}):
+                canvas.print_figure(path, full_resolution=False)
+        finally:
+            line.set_data(*display)
+
+    report["bytes"] = os.path.getsize(path)
+    return report
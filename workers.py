@@ -0,0 +1,164 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from PyQt5 import QtCore
+
+from instrumentation import PROFILER
+from lissajousgen import LissajousGenerator
+
+
+class FigureWorkerSignals(QtCore.QObject):
+    """
+    Сигналы фоновой генерации. QRunnable не наследуется от QObject,
+    поэтому сигналы вынесены в отдельный объект
+    """
+
+    finished = QtCore.pyqtSignal(int, object)
+    failed = QtCore.pyqtSignal(int, str)
+
+
+class FigureWorker(QtCore.QRunnable):
+    """
+    Задача генерации фигуры для QThreadPool.
+    Каждая задача использует собственный LissajousGenerator, поэтому не разделяет состояние с окном.
+    Фигура генерируется порциями (iter_figure), отмена проверяется между порциями.
+    Результат отменённой задачи не отправляется
+    """
+
+    chunk_size = 2 ** 18
+
+    def __init__(self, request_id, resolution, settings, mode='2d'):
+        """
+        :param request_id: Номер запроса. По нему окно отбрасывает устаревшие результаты
+            :type request_id: int
+        :param resolution: Количество точек в кривой
+            :type resolution: int
+        :param settings: Параметры фигуры (аргументы generate_figure)
+            :type settings: dict
+        :param mode: Режим - 2D/3D
+            :type mode: str
+        """
+
+        super().__init__()
+        self.request_id = request_id
+        self.resolution = resolution
+        self.settings = dict(settings)
+        self.mode = mode
+        self.signals = FigureWorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        """
+        Отмена задачи. Если генерация уже идёт, её результат будет отброшен
+        """
+
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        if self._cancelled:
+            return
+
+        try:
+            generator = LissajousGenerator(resolution=self.resolution, cache_size=0, time_cache_size=0)
+            values = np.empty((2 + (self.mode == '3d'), self.resolution))
+
+            first = 0
+            with PROFILER.stage('generate_async'):
+                for chunk in generator.iter_figure(**self.settings, mode=self.mode, chunk_size=self.chunk_size):
+                    if self._cancelled:
+                        return
+                    values[:, first:first + chunk[0].shape[0]] = chunk
+                    first += chunk[0].shape[0]
+        except Exception as exc:
+            if not self._cancelled:
+                self.signals.failed.emit(self.request_id, str(exc))
+            return
+
+        if not self._cancelled:
+            self.signals.finished.emit(self.request_id, list(values))
+
+
+class VideoExportWorker(QtCore.QRunnable):
+    """
+    Задача экспорта анимации (export_video.export_sweep) для QThreadPool.
+    Кадры отрисовываются в пуле процессов, поток только передаёт их кодировщику
+    """
+
+    def __init__(self, request_id, path, settings, style, **options):
+        """
+        :param request_id: Номер запроса
+            :type request_id: int
+        :param path: Путь к файлу (*.mp4, *.gif)
+            :type path: str
+        :param settings: Параметры фигуры (аргументы generate_figure, в том числе mode)
+            :type settings: dict
+        :param style: Параметры отображения (color, linewidth)
+            :type style: dict
+        :param options: Остальные аргументы export_sweep
+        """
+
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.settings = dict(settings)
+        self.style = dict(style)
+        self.options = options
+        self.signals = FigureWorkerSignals()
+
+    def run(self):
+        from export_video import export_sweep
+
+        try:
+            summary = export_sweep(self.path, self.settings, self.style, **self.options)
+        except Exception as exc:
+            self.signals.failed.emit(self.request_id, str(exc))
+            return
+
+        self.signals.finished.emit(self.request_id, summary)
+
+
+class ThumbnailWorkerSignals(QtCore.QObject):
+    """
+    Сигналы отрисовки миниатюры: хэш параметров пресета и PNG (или текст ошибки)
+    """
+
+    finished = QtCore.pyqtSignal(str, bytes)
+    failed = QtCore.pyqtSignal(str, str)
+
+
+class ThumbnailWorker(QtCore.QRunnable):
+    """
+    Задача отрисовки миниатюры пресета (PresetStore.render_thumbnail) для QThreadPool.
+    База не используется: сохраняет миниатюру получатель сигнала в потоке интерфейса
+    """
+
+    def __init__(self, record, size, resolution=500):
+        """
+        :param record: Запись PresetStore.query
+            :type record: dict
+        :param size: Размер стороны в пикселях
+            :type size: int
+        :param resolution: Количество точек кривой
+            :type resolution: int
+        """
+
+        super().__init__()
+        self.record = dict(record)
+        self.size = size
+        self.resolution = resolution
+        self.signals = ThumbnailWorkerSignals()
+
+    def run(self):
+        from preset_store import PresetStore
+
+        try:
+            png = PresetStore.render_thumbnail(self.record, self.size, self.resolution)
+        except Exception as exc:
+            self.signals.failed.emit(self.record["param_hash"], str(exc))
+            return
+
+        self.signals.finished.emit(self.record["param_hash"], png)